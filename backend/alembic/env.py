@@ -13,7 +13,11 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from src.core.database import Base
-from src.models import User, Observation
+from src.models import (
+    User, Station, Observation, ArchiveSegment, EvaporationInterval, DailyEvaporation, ClimatologyBaseline,
+    ScheduledJobRun, ExportJob, ExportMonthVersion, Device, SensorReading, ChangeSequence, ObservationTombstone,
+    QCFlag
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,48 @@
+"""Add full-text search over observation notes
+
+Revision ID: 022959bd59d8
+Revises: 041228aa7a62
+Create Date: 2026-10-19 12:33:43.357637
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '022959bd59d8'
+down_revision = '041228aa7a62'
+branch_labels = None
+depends_on = None
+
+
+from src.services import search
+
+
+def upgrade() -> None:
+    op.add_column('observations', sa.Column('notes_search', sa.Text(), nullable=True))
+
+    # Backfill the pre-tokenized notes before the index is built over them
+    bind = op.get_bind()
+    observations = sa.table('observations', sa.column('id'), sa.column('notes'), sa.column('notes_search'))
+    rows = bind.execute(sa.select(observations.c.id, observations.c.notes).where(observations.c.notes.isnot(None))).all()
+    for id_, notes in rows:
+        bind.execute(
+            observations.update().where(observations.c.id == id_).values(notes_search=search.search_text(notes))
+        )
+
+    search.create_search_structures(bind)
+    if bind.dialect.name == 'sqlite':
+        op.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_observations_notes_tsv")
+        op.drop_column('observations', 'notes_tsv')
+    else:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {search.FTS_TABLE}_{suffix}")
+        search.drop_search_structures(bind)
+    op.drop_column('observations', 'notes_search')
@@ -0,0 +1,43 @@
+"""Add climatology_baselines table
+
+Revision ID: 041228aa7a62
+Revises: 2966cd9ff46e
+Create Date: 2026-10-19 09:42:41.142187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '041228aa7a62'
+down_revision = '2966cd9ff46e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'climatology_baselines',
+        sa.Column('variable', sa.String(length=32), nullable=False),
+        sa.Column('day_of_year', sa.Integer(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('mean', sa.Float(), nullable=True),
+        sa.Column('minimum', sa.Float(), nullable=True),
+        sa.Column('maximum', sa.Float(), nullable=True),
+        sa.Column('p10', sa.Float(), nullable=True),
+        sa.Column('p25', sa.Float(), nullable=True),
+        sa.Column('p50', sa.Float(), nullable=True),
+        sa.Column('p75', sa.Float(), nullable=True),
+        sa.Column('p90', sa.Float(), nullable=True),
+        sa.Column('is_stale', sa.Boolean(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('variable', 'day_of_year')
+    )
+    op.create_index(op.f('ix_climatology_baselines_is_stale'), 'climatology_baselines', ['is_stale'], unique=False)
+    # Baselines for existing history are computed with POST /observations/climatology/rebuild
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_climatology_baselines_is_stale'), table_name='climatology_baselines')
+    op.drop_table('climatology_baselines')
@@ -0,0 +1,43 @@
+"""Add observation_archive_segments table
+
+Revision ID: 095779674b6e
+Revises: 2faf2489c50c
+Create Date: 2026-10-19 09:12:41.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '095779674b6e'
+down_revision = '2faf2489c50c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'observation_archive_segments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('range_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('range_end', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('checksum', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_observation_archive_segments_id'), 'observation_archive_segments', ['id'], unique=False)
+    op.create_index(op.f('ix_observation_archive_segments_month'), 'observation_archive_segments', ['month'], unique=False)
+    op.create_index(op.f('ix_observation_archive_segments_range_start'), 'observation_archive_segments', ['range_start'], unique=False)
+    op.create_index(op.f('ix_observation_archive_segments_range_end'), 'observation_archive_segments', ['range_end'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_observation_archive_segments_range_end'), table_name='observation_archive_segments')
+    op.drop_index(op.f('ix_observation_archive_segments_range_start'), table_name='observation_archive_segments')
+    op.drop_index(op.f('ix_observation_archive_segments_month'), table_name='observation_archive_segments')
+    op.drop_index(op.f('ix_observation_archive_segments_id'), table_name='observation_archive_segments')
+    op.drop_table('observation_archive_segments')
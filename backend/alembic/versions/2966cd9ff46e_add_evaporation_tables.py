@@ -0,0 +1,57 @@
+"""Add evaporation_intervals and daily_evaporation tables
+
+Revision ID: 2966cd9ff46e
+Revises: 848cfa38ddc4
+Create Date: 2026-10-19 11:20:44.912305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2966cd9ff46e'
+down_revision = '848cfa38ddc4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'evaporation_intervals',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('start_observation_id', sa.Integer(), nullable=False),
+        sa.Column('end_observation_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('start_level', sa.Float(), nullable=True),
+        sa.Column('end_level', sa.Float(), nullable=True),
+        sa.Column('precipitation', sa.Float(), nullable=True),
+        sa.Column('evaporation', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_evaporation_intervals_id'), 'evaporation_intervals', ['id'], unique=False)
+    op.create_index(op.f('ix_evaporation_intervals_start_observation_id'), 'evaporation_intervals', ['start_observation_id'], unique=False)
+    op.create_index(op.f('ix_evaporation_intervals_end_observation_id'), 'evaporation_intervals', ['end_observation_id'], unique=True)
+    op.create_index(op.f('ix_evaporation_intervals_end_time'), 'evaporation_intervals', ['end_time'], unique=False)
+    op.create_index(op.f('ix_evaporation_intervals_day'), 'evaporation_intervals', ['day'], unique=False)
+    op.create_table(
+        'daily_evaporation',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('evaporation', sa.Float(), nullable=True),
+        sa.Column('interval_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+    # Existing history is computed with POST /observations/evaporation/rebuild
+
+
+def downgrade() -> None:
+    op.drop_table('daily_evaporation')
+    op.drop_index(op.f('ix_evaporation_intervals_day'), table_name='evaporation_intervals')
+    op.drop_index(op.f('ix_evaporation_intervals_end_time'), table_name='evaporation_intervals')
+    op.drop_index(op.f('ix_evaporation_intervals_end_observation_id'), table_name='evaporation_intervals')
+    op.drop_index(op.f('ix_evaporation_intervals_start_observation_id'), table_name='evaporation_intervals')
+    op.drop_index(op.f('ix_evaporation_intervals_id'), table_name='evaporation_intervals')
+    op.drop_table('evaporation_intervals')
@@ -0,0 +1,54 @@
+"""Add observation change sequence and tombstones
+
+Revision ID: 4d700d340e8b
+Revises: ef4d1b951c65
+Create Date: 2026-10-19 15:27:03.228174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d700d340e8b'
+down_revision = 'ef4d1b951c65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_sequences',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('purged_through', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Existing observations count as change 1, so a first sync (no token) returns them
+    op.execute("INSERT INTO change_sequences (name, value, purged_through) VALUES ('observations', 1, 0)")
+
+    op.add_column('observations', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.execute("UPDATE observations SET change_seq = 1")
+    op.create_index('ix_observations_station_change_seq', 'observations', ['station_id', 'change_seq'], unique=False)
+
+    op.create_table(
+        'observation_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('observation_id', sa.Integer(), nullable=False),
+        sa.Column('station_id', sa.Integer(), nullable=False),
+        sa.Column('observation_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_observation_tombstones_station_change_seq', 'observation_tombstones', ['station_id', 'change_seq'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_observation_tombstones_station_change_seq', table_name='observation_tombstones')
+    op.drop_table('observation_tombstones')
+    op.drop_index('ix_observations_station_change_seq', table_name='observations')
+    op.drop_column('observations', 'change_seq')
+    op.drop_table('change_sequences')
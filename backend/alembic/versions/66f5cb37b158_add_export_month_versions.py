@@ -0,0 +1,29 @@
+"""Add export month version table
+
+Revision ID: 66f5cb37b158
+Revises: 35b8c778c1a0
+Create Date: 2026-10-19 18:16:27.824502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '66f5cb37b158'
+down_revision = '35b8c778c1a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'export_month_versions',
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('month')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('export_month_versions')
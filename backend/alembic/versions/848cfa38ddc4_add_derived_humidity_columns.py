@@ -0,0 +1,92 @@
+"""Add cached derived humidity columns to observations
+
+Revision ID: 848cfa38ddc4
+Revises: 095779674b6e
+Create Date: 2026-10-19 10:02:17.481930
+
+"""
+import math
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '848cfa38ddc4'
+down_revision = '095779674b6e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('observations', sa.Column('relative_humidity', sa.Float(), nullable=True))
+    op.add_column('observations', sa.Column('dew_point', sa.Float(), nullable=True))
+    op.add_column('observations', sa.Column('vapour_pressure', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_observations_relative_humidity'), 'observations', ['relative_humidity'], unique=False)
+
+    # Backfill existing rows with the configured station pressure
+    _backfill(float(os.getenv("STATION_PRESSURE_HPA", "1013.25")))
+
+
+def _saturation(t):
+    """Magnus saturation vapour pressure over water (hPa), as of this revision"""
+    return 6.112 * math.exp(17.62 * t / (243.12 + t))
+
+
+def _derive(t, tw, p):
+    """Psychrometer equation, frozen here so later changes to the app do not alter this migration"""
+    e = _saturation(tw) - 6.53e-4 * (1 + 0.000944 * tw) * p * (t - tw)
+    if e <= 0:
+        return {'relative_humidity': None, 'dew_point': None, 'vapour_pressure': None}
+    gamma = math.log(e / 6.112)
+    return {
+        'relative_humidity': round(min(max(100 * e / _saturation(t), 0.0), 100.0), 1),
+        'dew_point': round(243.12 * gamma / (17.62 - gamma), 2),
+        'vapour_pressure': round(e, 2),
+    }
+
+
+def _backfill(pressure, batch_size=5000):
+    bind = op.get_bind()
+    observations = sa.table(
+        'observations',
+        sa.column('id', sa.Integer),
+        sa.column('temperature', sa.Float),
+        sa.column('wet_bulb_temperature', sa.Float),
+        sa.column('relative_humidity', sa.Float),
+        sa.column('dew_point', sa.Float),
+        sa.column('vapour_pressure', sa.Float),
+    )
+    update = (
+        observations.update()
+        .where(observations.c.id == sa.bindparam('row_id'))
+        .values(
+            relative_humidity=sa.bindparam('relative_humidity'),
+            dew_point=sa.bindparam('dew_point'),
+            vapour_pressure=sa.bindparam('vapour_pressure'),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(observations.c.id, observations.c.temperature, observations.c.wet_bulb_temperature)
+            .where(
+                observations.c.id > last_id,
+                observations.c.temperature.isnot(None),
+                observations.c.wet_bulb_temperature.isnot(None),
+            )
+            .order_by(observations.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [{'row_id': row_id, **_derive(t, tw, pressure)} for row_id, t, tw in rows])
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_observations_relative_humidity'), table_name='observations')
+    op.drop_column('observations', 'vapour_pressure')
+    op.drop_column('observations', 'dew_point')
+    op.drop_column('observations', 'relative_humidity')
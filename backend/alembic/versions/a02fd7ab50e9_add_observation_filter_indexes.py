@@ -0,0 +1,41 @@
+"""Add indexes for typed observation filters
+
+Revision ID: a02fd7ab50e9
+Revises: 022959bd59d8
+Create Date: 2026-10-19 16:11:38.676880
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a02fd7ab50e9'
+down_revision = '022959bd59d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_observations_weather_code_time', 'observations', ['current_weather_code', 'observation_time'],
+        unique=False,
+        postgresql_where=sa.text('current_weather_code IS NOT NULL'),
+        sqlite_where=sa.text('current_weather_code IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_observations_total_cloud_time', 'observations', ['total_cloud_amount', 'observation_time'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_observations_low_cloud_type_time', 'observations', ['low_cloud_type_code', 'observation_time'],
+        unique=False,
+        postgresql_where=sa.text('low_cloud_type_code IS NOT NULL'),
+        sqlite_where=sa.text('low_cloud_type_code IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_observations_low_cloud_type_time', table_name='observations')
+    op.drop_index('ix_observations_total_cloud_time', table_name='observations')
+    op.drop_index('ix_observations_weather_code_time', table_name='observations')
@@ -0,0 +1,158 @@
+"""Add stations
+
+Revision ID: a21d498f656f
+Revises: 66f5cb37b158
+Create Date: 2026-10-19 16:45:25.207394
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a21d498f656f'
+down_revision = '66f5cb37b158'
+branch_labels = None
+depends_on = None
+
+
+from src.core.config import settings
+
+# Tables whose existing rows all belong to the default station
+_BACKFILLED = ('observations', 'evaporation_intervals', 'daily_evaporation', 'climatology_baselines', 'export_jobs')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=32), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stations_id'), 'stations', ['id'], unique=False)
+    op.create_index(op.f('ix_stations_code'), 'stations', ['code'], unique=True)
+    op.execute(
+        sa.text("INSERT INTO stations (code, name, is_active) VALUES (:code, 'Main station', true)")
+        .bindparams(code=settings.default_station_code)
+    )
+
+    for table in _BACKFILLED:
+        op.add_column(table, sa.Column('station_id', sa.Integer(), nullable=True))
+        op.execute(
+            sa.text(f"UPDATE {table} SET station_id = (SELECT id FROM stations WHERE code = :code)")
+            .bindparams(code=settings.default_station_code)
+        )
+        op.alter_column(table, 'station_id', nullable=False)
+        op.create_foreign_key(f'{table}_station_id_fkey', table, 'stations', ['station_id'], ['id'])
+
+    # Observation indexes now lead with the station every read filters on
+    op.drop_index('ix_observations_low_cloud_type_time', table_name='observations')
+    op.drop_index('ix_observations_total_cloud_time', table_name='observations')
+    op.drop_index('ix_observations_weather_code_time', table_name='observations')
+    op.drop_index(op.f('ix_observations_relative_humidity'), table_name='observations')
+    op.create_index('ix_observations_station_time', 'observations', ['station_id', 'observation_time'], unique=False)
+    op.create_index(
+        'ix_observations_station_weather_code_time', 'observations',
+        ['station_id', 'current_weather_code', 'observation_time'],
+        unique=False,
+        postgresql_where=sa.text('current_weather_code IS NOT NULL'),
+        sqlite_where=sa.text('current_weather_code IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_observations_station_total_cloud_time', 'observations',
+        ['station_id', 'total_cloud_amount', 'observation_time'],
+        unique=False,
+    )
+    op.create_index('ix_observations_station_humidity', 'observations', ['station_id', 'relative_humidity'], unique=False)
+    op.create_index(
+        'ix_observations_station_low_cloud_type_time', 'observations',
+        ['station_id', 'low_cloud_type_code', 'observation_time'],
+        unique=False,
+        postgresql_where=sa.text('low_cloud_type_code IS NOT NULL'),
+        sqlite_where=sa.text('low_cloud_type_code IS NOT NULL'),
+    )
+
+    op.drop_index(op.f('ix_evaporation_intervals_day'), table_name='evaporation_intervals')
+    op.drop_index(op.f('ix_evaporation_intervals_end_time'), table_name='evaporation_intervals')
+    op.create_index(
+        'ix_evaporation_intervals_station_end_time', 'evaporation_intervals', ['station_id', 'end_time'], unique=False
+    )
+    op.create_index('ix_evaporation_intervals_station_day', 'evaporation_intervals', ['station_id', 'day'], unique=False)
+
+    op.drop_constraint('daily_evaporation_pkey', 'daily_evaporation', type_='primary')
+    op.create_primary_key('daily_evaporation_pkey', 'daily_evaporation', ['station_id', 'day'])
+    op.drop_constraint('climatology_baselines_pkey', 'climatology_baselines', type_='primary')
+    op.create_primary_key(
+        'climatology_baselines_pkey', 'climatology_baselines', ['station_id', 'variable', 'day_of_year']
+    )
+
+    # Month versions only retire cached files, so start the per-station counters afresh
+    op.drop_table('export_month_versions')
+    op.create_table(
+        'export_month_versions',
+        sa.Column('station_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('station_id', 'month')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('export_month_versions')
+    op.create_table(
+        'export_month_versions',
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('month')
+    )
+
+    # Only the default station's derived rows fit the single-station keys
+    default_station = "(SELECT id FROM stations WHERE code = :code)"
+    for table in ('climatology_baselines', 'daily_evaporation', 'evaporation_intervals'):
+        op.execute(
+            sa.text(f"DELETE FROM {table} WHERE station_id <> {default_station}")
+            .bindparams(code=settings.default_station_code)
+        )
+    op.drop_constraint('climatology_baselines_pkey', 'climatology_baselines', type_='primary')
+    op.create_primary_key('climatology_baselines_pkey', 'climatology_baselines', ['variable', 'day_of_year'])
+    op.drop_constraint('daily_evaporation_pkey', 'daily_evaporation', type_='primary')
+    op.create_primary_key('daily_evaporation_pkey', 'daily_evaporation', ['day'])
+
+    op.drop_index('ix_evaporation_intervals_station_day', table_name='evaporation_intervals')
+    op.drop_index('ix_evaporation_intervals_station_end_time', table_name='evaporation_intervals')
+    op.create_index(op.f('ix_evaporation_intervals_end_time'), 'evaporation_intervals', ['end_time'], unique=False)
+    op.create_index(op.f('ix_evaporation_intervals_day'), 'evaporation_intervals', ['day'], unique=False)
+
+    op.drop_index('ix_observations_station_low_cloud_type_time', table_name='observations')
+    op.drop_index('ix_observations_station_humidity', table_name='observations')
+    op.drop_index('ix_observations_station_total_cloud_time', table_name='observations')
+    op.drop_index('ix_observations_station_weather_code_time', table_name='observations')
+    op.drop_index('ix_observations_station_time', table_name='observations')
+    op.create_index(op.f('ix_observations_relative_humidity'), 'observations', ['relative_humidity'], unique=False)
+    op.create_index(
+        'ix_observations_weather_code_time', 'observations', ['current_weather_code', 'observation_time'],
+        unique=False,
+        postgresql_where=sa.text('current_weather_code IS NOT NULL'),
+        sqlite_where=sa.text('current_weather_code IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_observations_total_cloud_time', 'observations', ['total_cloud_amount', 'observation_time'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_observations_low_cloud_type_time', 'observations', ['low_cloud_type_code', 'observation_time'],
+        unique=False,
+        postgresql_where=sa.text('low_cloud_type_code IS NOT NULL'),
+        sqlite_where=sa.text('low_cloud_type_code IS NOT NULL'),
+    )
+
+    for table in reversed(_BACKFILLED):
+        op.drop_constraint(f'{table}_station_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'station_id')
+
+    op.drop_index(op.f('ix_stations_code'), table_name='stations')
+    op.drop_index(op.f('ix_stations_id'), table_name='stations')
+    op.drop_table('stations')
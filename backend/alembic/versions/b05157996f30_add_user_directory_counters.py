@@ -0,0 +1,101 @@
+"""Add user observation counters and directory index
+
+Revision ID: b05157996f30
+Revises: a02fd7ab50e9
+Create Date: 2026-10-19 14:14:12.920574
+
+"""
+import gzip
+import json
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b05157996f30'
+down_revision = 'a02fd7ab50e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('observation_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('first_observation_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('last_observation_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_observations_observer_time', 'observations', ['observer_id', 'observation_time'], unique=False)
+
+    # Backfill the counters from the observations still in the table, then
+    # add the archived ones, which are disjoint from them
+    op.execute(
+        "UPDATE users SET "
+        "observation_count = (SELECT count(*) FROM observations WHERE observations.observer_id = users.id), "
+        "first_observation_at = (SELECT min(observation_time) FROM observations WHERE observations.observer_id = users.id), "
+        "last_observation_at = (SELECT max(observation_time) FROM observations WHERE observations.observer_id = users.id)"
+    )
+    _add_archived_observations()
+
+
+def _utc(value):
+    """Naive UTC datetime of a stored or archived timestamp"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _add_archived_observations() -> None:
+    bind = op.get_bind()
+    segments = sa.table('observation_archive_segments', sa.column('payload', sa.LargeBinary))
+    users = sa.table(
+        'users',
+        sa.column('id', sa.Integer),
+        sa.column('observation_count', sa.Integer),
+        sa.column('first_observation_at', sa.DateTime(timezone=True)),
+        sa.column('last_observation_at', sa.DateTime(timezone=True)),
+    )
+
+    # observer id -> [count, first, last]
+    archived = {}
+    for (payload,) in bind.execute(sa.select(segments.c.payload)):
+        for line in gzip.decompress(payload).decode('utf-8').splitlines():
+            row = json.loads(line)
+            observer_id, observed_at = row.get('observer_id'), _utc(row.get('observation_time'))
+            if observer_id is None or observed_at is None:
+                continue
+            tally = archived.setdefault(observer_id, [0, observed_at, observed_at])
+            tally[0] += 1
+            tally[1] = min(tally[1], observed_at)
+            tally[2] = max(tally[2], observed_at)
+    if not archived:
+        return
+
+    current = bind.execute(
+        sa.select(users.c.id, users.c.observation_count, users.c.first_observation_at, users.c.last_observation_at)
+        .where(users.c.id.in_(list(archived)))
+    ).all()
+    for user_id, count, first, last in current:
+        archived_count, archived_first, archived_last = archived[user_id]
+        first, last = _utc(first), _utc(last)
+        bind.execute(
+            users.update().where(users.c.id == user_id).values(
+                observation_count=count + archived_count,
+                first_observation_at=(min(archived_first, first) if first else archived_first).replace(tzinfo=timezone.utc),
+                last_observation_at=(max(archived_last, last) if last else archived_last).replace(tzinfo=timezone.utc),
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_observations_observer_time', table_name='observations')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_column('users', 'last_login_at')
+    op.drop_column('users', 'last_observation_at')
+    op.drop_column('users', 'first_observation_at')
+    op.drop_column('users', 'observation_count')
@@ -0,0 +1,24 @@
+"""Add column selection to export jobs
+
+Revision ID: d58dd00e458f
+Revises: 4d700d340e8b
+Create Date: 2026-10-19 18:40:42.282768
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd58dd00e458f'
+down_revision = '4d700d340e8b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('export_jobs', sa.Column('fields', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('export_jobs', 'fields')
@@ -0,0 +1,35 @@
+"""Add scheduled job run table
+
+Revision ID: deb1ba998f57
+Revises: b05157996f30
+Create Date: 2026-10-19 10:50:44.929721
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'deb1ba998f57'
+down_revision = 'b05157996f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scheduled_job_runs',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('scheduled_for', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('duration_seconds', sa.Float(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('failure_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduled_job_runs')
@@ -0,0 +1,37 @@
+"""Add QC flags
+
+Revision ID: e1355a6ed224
+Revises: d58dd00e458f
+Create Date: 2026-10-19 15:02:44.882018
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1355a6ed224'
+down_revision = 'd58dd00e458f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing observations are flagged by the first POST /observations/qc/scan
+    op.create_table(
+        'qc_flags',
+        sa.Column('observation_id', sa.Integer(), nullable=False),
+        sa.Column('rule', sa.String(length=32), nullable=False),
+        sa.Column('station_id', sa.Integer(), nullable=False),
+        sa.Column('observation_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('detail', sa.String(), nullable=True),
+        sa.Column('flagged_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['observation_id'], ['observations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('observation_id', 'rule')
+    )
+    op.create_index('ix_qc_flags_station_rule_time', 'qc_flags', ['station_id', 'rule', 'observation_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_qc_flags_station_rule_time', table_name='qc_flags')
+    op.drop_table('qc_flags')
@@ -0,0 +1,57 @@
+"""Add devices and sensor readings
+
+Revision ID: ef4d1b951c65
+Revises: a21d498f656f
+Create Date: 2026-10-19 12:37:44.899979
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ef4d1b951c65'
+down_revision = 'a21d498f656f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'devices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('station_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('token_prefix', sa.String(length=12), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['station_id'], ['stations.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_devices_id'), 'devices', ['id'], unique=False)
+    op.create_index(op.f('ix_devices_token_hash'), 'devices', ['token_hash'], unique=True)
+
+    op.create_table(
+        'sensor_readings',
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('station_id', sa.Integer(), nullable=False),
+        sa.Column('temperature', sa.Float(), nullable=True),
+        sa.Column('relative_humidity', sa.Float(), nullable=True),
+        sa.Column('pressure', sa.Float(), nullable=True),
+        sa.Column('precipitation', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['station_id'], ['stations.id']),
+        sa.PrimaryKeyConstraint('device_id', 'time')
+    )
+    op.create_index('ix_sensor_readings_station_time', 'sensor_readings', ['station_id', 'time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sensor_readings_station_time', table_name='sensor_readings')
+    op.drop_table('sensor_readings')
+    op.drop_index(op.f('ix_devices_token_hash'), table_name='devices')
+    op.drop_index(op.f('ix_devices_id'), table_name='devices')
+    op.drop_table('devices')
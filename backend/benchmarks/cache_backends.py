@@ -0,0 +1,66 @@
+"""Get/set latency of each cache backend.
+
+Run from backend/ with the usual environment (.env) in place:
+
+    python -m benchmarks.cache_backends --operations 20000
+    python -m benchmarks.cache_backends --redis-url redis://localhost:6379/15
+
+The Redis-protocol backend is measured only when --redis-url is given; the
+benchmark flushes that database, so point it at a scratch one.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.core.cache import Cache, MemoryBackend, RedisBackend, SQLiteBackend
+
+PAYLOAD = b"x" * 2048  # roughly one serialized dashboard response
+
+
+def _timed(operation, count: int) -> np.ndarray:
+    samples = np.empty(count)
+    for index in range(count):
+        started = time.perf_counter()
+        operation(index)
+        samples[index] = time.perf_counter() - started
+    return samples * 1e6
+
+
+def _report(name: str, label: str, samples: np.ndarray) -> None:
+    p50, p99 = np.percentile(samples, (50, 99))
+    print(f"  {name:<8} {label:<14} p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+
+
+def run(name: str, backend, operations: int) -> None:
+    backend.clear()
+    keys = [f"bench:{index % 1000}" for index in range(operations)]
+    _report(name, "set", _timed(lambda index: backend.set(keys[index], PAYLOAD, 60), operations))
+    _report(name, "get (hit)", _timed(lambda index: backend.get(keys[index]), operations))
+    _report(name, "get (miss)", _timed(lambda index: backend.get(f"missing:{index}"), operations))
+
+    cache = Cache(backend)
+    cache.get_or_set("bench", "value", lambda: {"payload": "x" * 2048}, depends_on=("observations", "users"))
+    _report(name, "get_or_set", _timed(
+        lambda index: cache.get_or_set("bench", "value", dict, depends_on=("observations", "users")), operations
+    ))
+    backend.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    print(f"{args.operations} operations per measurement, {len(PAYLOAD)} byte values")
+    run("memory", MemoryBackend(), args.operations)
+    run("sqlite", SQLiteBackend(os.path.join(tempfile.mkdtemp(), "cache.db")), args.operations)
+    if args.redis_url:
+        run("redis", RedisBackend.from_url(args.redis_url), args.operations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Full-history CSV export time: cold, warm, and after one write.
+
+Run from backend/ with the usual environment (.env) in place:
+
+    python -m benchmarks.export_segments --years 5 --per-day 4
+
+Uses a fresh on-disk SQLite database and export directory. "cold" builds
+every month segment, "warm" streams them all from disk and "one write"
+regenerates only the month that was touched. The raw disk read of the
+assembled file is printed for comparison.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import settings
+from src.core.database import Base
+from src.models.observation_model import Observation
+from src.models.user_model import User
+from src.services import exports, stations
+
+
+def _timed(session_factory) -> tuple:
+    with session_factory() as db:
+        started = time.perf_counter()
+        body = exports.build_export(db, stations.default_station(db), None, None)
+        size = sum(len(chunk) for chunk in body)
+        return time.perf_counter() - started, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--per-day", type=int, default=4)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    settings.export_storage_dir = os.path.join(directory, "exports")
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    start = datetime(2020, 1, 1)
+    with session_factory() as db:
+        user = User(google_id="benchmark", email="benchmark@example.com", google_name="Benchmark")
+        db.add(user)
+        db.commit()
+        step = timedelta(days=1) / args.per_day
+        rows = [
+            {
+                "observation_time": start + step * index,
+                "observer_id": user.id,
+                "temperature": 20 + index % 10,
+                "wet_bulb_temperature": 18 + index % 7,
+                "total_cloud_amount": index % 9,
+                "notes": "routine observation",
+            }
+            for index in range(args.years * 365 * args.per_day)
+        ]
+        db.execute(insert(Observation), rows)
+        db.commit()
+
+    cold, size = _timed(session_factory)
+    warm, _ = _timed(session_factory)
+    with session_factory() as db:
+        exports.mark_dirty(db, [(stations.default_station(db).id, start + timedelta(days=400))])
+        db.commit()
+    touched, _ = _timed(session_factory)
+
+    segments = os.path.join(settings.export_storage_dir, "segments")
+    started = time.perf_counter()
+    for name in os.listdir(segments):
+        with open(os.path.join(segments, name), "rb") as segment:
+            segment.read()
+    disk = time.perf_counter() - started
+
+    print(f"{len(rows)} observations, {size / 1e6:.1f} MB of CSV")
+    print(f"  cold:      {cold * 1000:8.1f} ms")
+    print(f"  warm:      {warm * 1000:8.1f} ms")
+    print(f"  one write: {touched * 1000:8.1f} ms")
+    print(f"  disk read: {disk * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Inserts per second: one commit per create versus group commit.
+
+Run from backend/ with the usual environment (.env) in place:
+
+    python -m benchmarks.group_commit --rows 2000 --concurrency 64
+
+Both modes write to a fresh on-disk SQLite database with synchronous=FULL,
+so every commit pays for a real fsync. Pass --database-url to run against
+Postgres instead; observations and evaporation tables there are cleared.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.models.evaporation_model import DailyEvaporation, EvaporationInterval
+from src.models.observation_model import Observation
+from src.models.user_model import User
+from src.services.group_commit import GroupCommitWriter
+from src.services.observation_events import ObservationChange, observations_changed
+
+START = datetime(2024, 1, 1)
+
+
+def _rows(count: int, observer_id: int, offset: int = 0):
+    return [
+        {
+            "observation_time": START + timedelta(minutes=offset + index),
+            "observer_id": observer_id,
+            "temperature": 25.0,
+            "wet_bulb_temperature": 22.0,
+            "precipitation": 0.0,
+        }
+        for index in range(count)
+    ]
+
+
+def single_commits(session_factory, rows) -> float:
+    """What create_observation does without group commit"""
+    started = time.perf_counter()
+    for row in rows:
+        db = session_factory()
+        observation = Observation(**row)
+        db.add(observation)
+        db.flush()
+        observations_changed(db, [ObservationChange(observation.id, new_time=observation.observation_time)])
+        db.commit()
+        db.refresh(observation)
+        db.close()
+    return time.perf_counter() - started
+
+
+def grouped_commits(session_factory, rows, concurrency: int, window_ms: float) -> float:
+    writer = GroupCommitWriter(session_factory, window_ms, max_items=concurrency)
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def submit(row):
+            async with semaphore:
+                await writer.submit(row)
+
+        await asyncio.gather(*(submit(row) for row in rows))
+        await writer.close()
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _full_sync(connection, record):
+            connection.execute("PRAGMA synchronous=FULL")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with session_factory() as db:
+        user = User(google_id="benchmark", email="benchmark@example.com", google_name="Benchmark")
+        db.add(user)
+        db.commit()
+        observer_id = user.id
+
+    def reset():
+        with session_factory() as db:
+            for model in (Observation, EvaporationInterval, DailyEvaporation):
+                db.execute(delete(model))
+            db.commit()
+
+    reset()
+    single = single_commits(session_factory, _rows(args.rows, observer_id))
+    reset()
+    grouped = grouped_commits(session_factory, _rows(args.rows, observer_id), args.concurrency, args.window_ms)
+
+    print(f"{args.rows} inserts on {engine.dialect.name}")
+    print(f"  single commits: {args.rows / single:10.1f} inserts/s")
+    print(f"  group commit:   {args.rows / grouped:10.1f} inserts/s "
+          f"(concurrency {args.concurrency}, window {args.window_ms} ms)")
+
+
+if __name__ == "__main__":
+    main()
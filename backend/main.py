@@ -1,9 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from src.core.config import settings
 from src.core.database import engine, Base, init_default_admin
-from src.api import auth_router, observations_router, users_router
+from src.api import (
+    auth_router,
+    observations_router,
+    users_router,
+    evaporation_router,
+    climatology_router,
+    series_router,
+    admin_router,
+    exports_router,
+    stations_router,
+    health_router,
+    ingest_router,
+    quality_router,
+    coverage_router,
+)
+from src.core import health
+from src.middleware.admission import AdmissionMiddleware
+from src.middleware.request_context import RequestContextMiddleware
+from src.services import exports, google_oauth, group_commit, ingestion, maintenance
 
 load_dotenv()
 
@@ -13,7 +32,27 @@ Base.metadata.create_all(bind=engine)
 # Initialize default admin user
 init_default_admin()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    health.get_loop_monitor().start()
+    # Loading the TLS trust store blocks, so do it before the first login
+    google_oauth.get_http_client()
+    if settings.scheduler_enabled:
+        maintenance.get_scheduler().start()
+    # Exports queued when the previous process stopped
+    exports.get_export_pool().resume()
+    yield
+    await maintenance.get_scheduler().stop()
+    exports.shutdown()
+    # Commit creates still waiting in the group-commit window
+    await group_commit.shutdown()
+    # Sensor readings still waiting for the next flush
+    await ingestion.shutdown()
+    await health.get_loop_monitor().stop()
+    await google_oauth.close_http_client()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Weather Observation Logger API",
     description="API for manual weather observation logging system with Chinese UI support",
     version="1.0.0",
@@ -21,18 +60,33 @@ app = FastAPI(
     redoc_url="/redoc" if settings.debug else None,
 )
 
+# Inside CORS, so refusals still carry the CORS headers browsers need to read them
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Location", "Accept-Ranges", "Content-Range", "Retry-After"],
 )
+app.add_middleware(RequestContextMiddleware)
 
 # Include routers
+# Fixed /observations/<name> routes must come before /observations/{observation_id}
 app.include_router(auth_router)
+app.include_router(climatology_router)
+app.include_router(series_router)
+app.include_router(exports_router)
+app.include_router(quality_router)
+app.include_router(coverage_router)
 app.include_router(observations_router)
 app.include_router(users_router)
+app.include_router(evaporation_router)
+app.include_router(admin_router)
+app.include_router(stations_router)
+app.include_router(health_router)
+app.include_router(ingest_router)
 
 @app.get("/")
 async def root():
@@ -42,10 +96,6 @@ async def root():
         "environment": settings.environment
     }
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "environment": settings.environment}
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
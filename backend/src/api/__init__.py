@@ -1,5 +1,29 @@
 from .auth import router as auth_router
 from .observations import router as observations_router
 from .users import router as users_router
+from .evaporation import router as evaporation_router
+from .climatology import router as climatology_router
+from .series import router as series_router
+from .admin import router as admin_router
+from .exports import router as exports_router
+from .stations import router as stations_router
+from .health import router as health_router
+from .ingest import router as ingest_router
+from .quality import router as quality_router
+from .coverage import router as coverage_router
 
-__all__ = ["auth_router", "observations_router", "users_router"]
\ No newline at end of file
+__all__ = [
+    "auth_router",
+    "observations_router",
+    "users_router",
+    "evaporation_router",
+    "climatology_router",
+    "series_router",
+    "admin_router",
+    "exports_router",
+    "stations_router",
+    "health_router",
+    "ingest_router",
+    "quality_router",
+    "coverage_router"
+]
\ No newline at end of file
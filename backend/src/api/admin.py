@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List
+from datetime import datetime, timezone
+from ..core import metrics, slow_queries
+from ..core.database import get_db
+from ..models.job_model import ScheduledJobRun
+from ..models.user_model import User
+from ..schemas.admin_schemas import MetricsSnapshot, SlowQuery, ScheduledJobStatus
+from ..services.maintenance import get_scheduler
+from ..middleware.auth_middleware import get_current_admin_user
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/metrics", response_model=MetricsSnapshot)
+async def get_metrics(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get this process's metrics (group commit window sizes, job durations and failures, ...)"""
+    return metrics.snapshot()
+
+@router.get("/slow-queries", response_model=List[SlowQuery])
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get this process's recent slow statements, newest first (admin only)"""
+    return slow_queries.get_log().recent(limit)
+
+@router.get("/jobs", response_model=List[ScheduledJobStatus])
+async def get_scheduled_jobs(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get the maintenance jobs and their latest run on any replica (admin only)"""
+    runs = {run.name: run for run in db.query(ScheduledJobRun).all()}
+    now = datetime.now(timezone.utc)
+    result = []
+    for job in get_scheduler().jobs:
+        run = runs.get(job.name)
+        result.append(ScheduledJobStatus(
+            name=job.name,
+            schedule=str(job.schedule),
+            next_run_at=job.next_run_at or job.schedule.next_after(now),
+            last_scheduled_for=run.scheduled_for if run else None,
+            last_started_at=run.started_at if run else None,
+            last_finished_at=run.finished_at if run else None,
+            last_duration_seconds=run.duration_seconds if run else None,
+            last_status=run.status if run else None,
+            last_error=run.error if run else None,
+            failure_count=run.failure_count if run else 0
+        ))
+    return result
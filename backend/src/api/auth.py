@@ -4,52 +4,43 @@ from sqlalchemy.orm import Session
 from authlib.integrations.requests_client import OAuth2Session
 from typing import Dict, Any
 import httpx
+from ..core.cache import get_cache
 from ..core.database import get_db
 from ..core.config import settings
 from ..core.security import create_access_token, verify_password, get_password_hash
 from ..models.user_model import User
 from ..schemas.user_schemas import UserResponse, AdminLogin
+from ..services import google_oauth
+from ..services.user_stats import record_login
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.get("/google")
 async def google_login():
     """Initiate Google OAuth2 login"""
+    # Only builds the URL; no request is made here
     oauth = OAuth2Session(
         client_id=settings.google_client_id,
         redirect_uri=settings.google_redirect_uri,
         scope="openid email profile"
     )
     
-    authorization_url, state = oauth.authorization_url(
-        "https://accounts.google.com/o/oauth2/auth"
-    )
+    authorization_url, state = oauth.create_authorization_url(settings.google_authorize_url)
     
     return {"authorization_url": authorization_url, "state": state}
 
 @router.get("/google/callback")
-async def google_callback(code: str, state: str, db: Session = Depends(get_db)):
+async def google_callback(
+    code: str,
+    state: str,
+    db: Session = Depends(get_db),
+    http: httpx.AsyncClient = Depends(google_oauth.get_http_client)
+):
     """Handle Google OAuth2 callback"""
     try:
-        # Exchange code for token
-        oauth = OAuth2Session(
-            client_id=settings.google_client_id,
-            redirect_uri=settings.google_redirect_uri,
-        )
-        
-        token = oauth.fetch_token(
-            "https://oauth2.googleapis.com/token",
-            code=code,
-            client_secret=settings.google_client_secret,
-        )
-        
-        # Get user info from Google
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {token['access_token']}"}
-            )
-            user_info = response.json()
+        # Exchange code for token and get user info from Google, on the shared pooled client
+        token = await google_oauth.exchange_code(http, code)
+        user_info = await google_oauth.fetch_userinfo(http, token["access_token"])
         
         # Check if user exists or create new user
         user = db.query(User).filter(User.google_id == user_info["id"]).first()
@@ -64,14 +55,18 @@ async def google_callback(code: str, state: str, db: Session = Depends(get_db)):
                 is_admin=False,
                 is_active=True
             )
+            record_login(user)
             db.add(user)
             db.commit()
+            get_cache().invalidate("users")
             db.refresh(user)
         else:
             # Update user info from Google
             user.google_name = user_info["name"]
             user.profile_picture = user_info.get("picture")
+            record_login(user)
             db.commit()
+            get_cache().invalidate("users")
             db.refresh(user)
         
         # Create access token
@@ -120,14 +115,18 @@ async def verify_google_token(token_data: Dict[str, str], db: Session = Depends(
                 is_admin=False,
                 is_active=True
             )
+            record_login(user)
             db.add(user)
             db.commit()
+            get_cache().invalidate("users")
             db.refresh(user)
         else:
             # Update user info
             user.google_name = name
             user.profile_picture = picture
+            record_login(user)
             db.commit()
+            get_cache().invalidate("users")
             db.refresh(user)
         
         # Create access token
@@ -181,6 +180,11 @@ async def admin_login(login_data: AdminLogin, db: Session = Depends(get_db)):
                 detail="Account is inactive"
             )
         
+        record_login(user)
+        db.commit()
+        get_cache().invalidate("users")
+        db.refresh(user)
+        
         # Create access token
         access_token = create_access_token(subject=user.id)
         
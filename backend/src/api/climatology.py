@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from ..core.database import get_db
+from ..models.climatology_model import ClimatologyBaseline
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.climatology_schemas import ClimatologyDay, ClimatologyRanking, ClimatologyResponse
+from ..middleware.auth_middleware import get_current_active_user, get_current_admin_user
+from ..services import climatology, dashboard
+from .stations import get_current_station
+
+router = APIRouter(prefix="/observations/climatology", tags=["climatology"])
+
+@router.get("", response_model=ClimatologyResponse)
+async def get_climatology(
+    variable: Optional[Literal["temperature", "precipitation"]] = None,
+    start_day: int = Query(1, ge=1, le=366, description="First day of year (wraps past 366 when greater than end_day)"),
+    end_day: int = Query(366, ge=1, le=366),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a station's per-day-of-year baselines and how its latest dashboard values rank against them"""
+    query = db.query(ClimatologyBaseline).filter(ClimatologyBaseline.station_id == station.id)
+    if variable:
+        query = query.filter(ClimatologyBaseline.variable == variable)
+    if start_day <= end_day:
+        query = query.filter(ClimatologyBaseline.day_of_year.between(start_day, end_day))
+    else:
+        query = query.filter(
+            (ClimatologyBaseline.day_of_year >= start_day) | (ClimatologyBaseline.day_of_year <= end_day)
+        )
+    baselines = query.order_by(ClimatologyBaseline.variable, ClimatologyBaseline.day_of_year).all()
+    
+    days = []
+    for baseline in baselines:
+        day = climatology.calendar_day(baseline.day_of_year)
+        days.append(ClimatologyDay(
+            variable=baseline.variable,
+            day_of_year=baseline.day_of_year,
+            month=day.month,
+            day=day.day,
+            **{field: getattr(baseline, field) for field in (
+                "sample_count", "mean", "minimum", "maximum", "p10", "p25", "p50", "p75", "p90"
+            )}
+        ))
+    
+    # Rank the latest dashboard values against today's baseline
+    latest = None
+    dashboard_data = dashboard.build_dashboard(db, station)
+    if dashboard_data:
+        doy = climatology.day_of_year(dashboard_data.observation_time)
+        baselines_today = {
+            baseline.variable: baseline
+            for baseline in db.query(ClimatologyBaseline).filter(
+                ClimatologyBaseline.station_id == station.id, ClimatologyBaseline.day_of_year == doy
+            )
+        }
+        latest = ClimatologyRanking(
+            observation_time=dashboard_data.observation_time,
+            day_of_year=doy,
+            temperature=dashboard_data.temperature,
+            temperature_percentile=climatology.percentile_rank(
+                baselines_today.get("temperature"), dashboard_data.temperature
+            ),
+            precipitation_24h=dashboard_data.precipitation_24h,
+            precipitation_percentile=climatology.percentile_rank(
+                baselines_today.get("precipitation"), dashboard_data.precipitation_24h
+            )
+        )
+    
+    return ClimatologyResponse(days=days, latest=latest)
+
+@router.post("/rebuild")
+async def rebuild_climatology(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Recompute the baselines for every day of the year at every station (admin only)"""
+    days = climatology.rebuild(db)
+    return {"message": "Climatology rebuilt successfully", "days": days}
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, timedelta
+from ..core.config import settings
+from ..core.database import get_db
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.coverage_schemas import CoverageDay, CoverageObserver, CoverageResponse, ObserverSlots
+from ..middleware.auth_middleware import get_current_active_user
+from ..services import coverage, exports
+from .stations import get_current_station
+
+router = APIRouter(prefix="/observations/coverage", tags=["coverage"])
+
+@router.get("", response_model=CoverageResponse)
+async def get_coverage(
+    start_date: date = Query(..., description="First station-local day"),
+    end_date: date = Query(..., description="Last station-local day, inclusive"),
+    slots: Optional[str] = Query(None, description="Comma-separated local times, e.g. 08:00,14:00,20:00"),
+    tolerance_minutes: Optional[int] = Query(None, ge=0, le=180),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Which scheduled observation slots were observed each day, and by whom"""
+    tolerance = settings.coverage_tolerance_minutes if tolerance_minutes is None else tolerance_minutes
+    try:
+        slot_minutes = coverage.parse_slots(slots or settings.coverage_slots)
+        rows = coverage.daily_coverage(db, station, start_date, end_date, slot_minutes, tolerance)
+    except coverage.CoverageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+    by_day = {}
+    covered = {}
+    for day, observer_id, mask in rows:
+        by_day.setdefault(day, []).append(ObserverSlots(observer_id=observer_id, mask=mask))
+        covered[observer_id] = covered.get(observer_id, 0) + bin(mask).count("1")
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        observers = by_day.get(day.isoformat(), [])
+        mask = 0
+        for entry in observers:
+            mask |= entry.mask
+        days.append(CoverageDay(date=day, mask=mask, observers=observers))
+        day += timedelta(days=1)
+
+    names = exports.observer_names(db, covered)
+    return CoverageResponse(
+        start_date=start_date,
+        end_date=end_date,
+        slots=[coverage.format_slot(minutes) for minutes in slot_minutes],
+        tolerance_minutes=tolerance,
+        expected=len(days) * len(slot_minutes),
+        observed=sum(bin(entry.mask).count("1") for entry in days),
+        days=days,
+        observers=[
+            CoverageObserver(observer_id=observer_id, observer_name=names.get(observer_id), slots=count)
+            for observer_id, count in sorted(covered.items())
+        ]
+    )
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+from ..core.database import get_db
+from ..models.evaporation_model import EvaporationInterval, DailyEvaporation
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.evaporation_schemas import EvaporationIntervalResponse, DailyEvaporationResponse
+from ..middleware.auth_middleware import get_current_active_user, get_current_admin_user
+from ..services import evaporation
+from .stations import get_current_station
+
+router = APIRouter(prefix="/observations/evaporation", tags=["evaporation"])
+
+@router.get("/daily", response_model=List[DailyEvaporationResponse])
+async def get_daily_evaporation(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(366, ge=1, le=5000),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a station's daily pan evaporation, newest day first"""
+    query = db.query(DailyEvaporation).filter(DailyEvaporation.station_id == station.id)
+    if start_date:
+        query = query.filter(DailyEvaporation.day >= start_date)
+    if end_date:
+        query = query.filter(DailyEvaporation.day <= end_date)
+    return query.order_by(DailyEvaporation.day.desc()).limit(limit).all()
+
+@router.get("/intervals", response_model=List[EvaporationIntervalResponse])
+async def get_evaporation_intervals(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a station's evaporation between consecutive observations, newest first"""
+    query = db.query(EvaporationInterval).filter(EvaporationInterval.station_id == station.id)
+    if start_date:
+        query = query.filter(EvaporationInterval.day >= start_date)
+    if end_date:
+        query = query.filter(EvaporationInterval.day <= end_date)
+    return query.order_by(EvaporationInterval.end_time.desc()).limit(limit).all()
+
+@router.post("/rebuild")
+async def rebuild_evaporation(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Recompute evaporation for the full observation history (admin only)"""
+    intervals = evaporation.rebuild(db)
+    return {"message": "Evaporation rebuilt successfully", "intervals": intervals}
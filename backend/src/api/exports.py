@@ -0,0 +1,105 @@
+from fastapi import APIRouter, HTTPException, Depends, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+import os
+from ..core.database import get_db
+from ..models.export_model import ExportJob
+from ..models.user_model import User
+from ..schemas.export_schemas import ExportJobCreate, ExportJobResponse
+from ..middleware.auth_middleware import get_current_active_user
+from ..services import exports, fieldsets, filters
+from ..services.exports import ExportWorkerPool, get_export_pool
+from .stations import resolve_station
+
+router = APIRouter(prefix="/observations/export/jobs", tags=["observations"])
+
+def _job_response(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=job.id,
+        status=job.status,
+        station_id=job.station_id,
+        start_date=job.start_date,
+        end_date=job.end_date,
+        filters=exports.request_filters(job),
+        fields=exports.request_fields(job),
+        row_count=job.row_count,
+        size_bytes=job.size_bytes,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        download_url=f"{router.prefix}/{job.id}/download" if job.status == "succeeded" else None,
+    )
+
+def _get_job(db: Session, job_id: str) -> ExportJob:
+    job = db.get(ExportJob, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    return job
+
+@router.post("/", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    request: ExportJobCreate,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    pool: ExportWorkerPool = Depends(get_export_pool)
+):
+    """Queue a CSV export; an identical export still in progress is returned instead"""
+    try:
+        filters.compile_filters(request.filters)
+        if request.fields is not None:
+            fieldsets.select(request.fields, exports.EXPORT_FIELDS)
+    except (filters.FilterError, fieldsets.FieldsetError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    station = resolve_station(db, request.station_id)
+    exports.purge_expired(db)
+    job, created = exports.enqueue(
+        db, current_user, station, request.start_date, request.end_date, request.filters, request.fields
+    )
+    result = _job_response(job)
+    if created:
+        pool.submit(job.id)
+    response.headers["Location"] = f"{router.prefix}/{job.id}"
+    return result
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get an export job's status; every user may export all observations, so any job id is readable"""
+    return _job_response(_get_job(db, job_id))
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Download a finished export; supports Range and If-Range to resume partial downloads"""
+    job = _get_job(db, job_id)
+    if job.status != "succeeded":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status}"
+        )
+    path = exports.file_path(job.id)
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export file has expired"
+        )
+    return FileResponse(
+        path,
+        media_type="text/csv; charset=utf-8",
+        filename=exports.export_filename(job.start_date, job.end_date),
+    )
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from ..core.config import settings
+from ..core.health import ReadinessCheck, get_readiness
+from ..schemas.health_schemas import ReadinessReport
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("")
+@router.get("/live")
+async def liveness():
+    """Liveness: the process is up and serving; never touches the database"""
+    return {"status": "healthy", "environment": settings.environment}
+
+@router.get(
+    "/ready",
+    response_model=ReadinessReport,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessReport}},
+)
+async def readiness(check: ReadinessCheck = Depends(get_readiness)):
+    """Readiness: 503 while the database is unreachable, the pool is saturated or the event loop lags"""
+    report = await check.check()
+    return JSONResponse(
+        content=jsonable_encoder(report),
+        status_code=status.HTTP_200_OK if report["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,176 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import List
+import math
+import zlib
+from ..core.config import settings
+from ..core.database import get_db
+from ..models.sensor_model import Device
+from ..models.user_model import User
+from ..schemas.ingest_schemas import DeviceCreate, DeviceUpdate, DeviceResponse, DeviceCreated, IngestResult
+from ..middleware.auth_middleware import get_current_admin_user
+from ..services import ingestion
+from ..services.ingestion import IngestBuffer, get_ingest_buffer
+from .stations import resolve_station
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+
+device_security = HTTPBearer()
+
+_PAYLOAD_TOO_LARGE = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail=f"Payload exceeds {settings.ingest_max_body_bytes} bytes"
+)
+
+def get_current_device(
+    credentials: HTTPAuthorizationCredentials = Depends(device_security),
+    db: Session = Depends(get_db)
+) -> Device:
+    """Dependency authenticating a sensor by its device token"""
+    device = ingestion.authenticate(db, credentials.credentials)
+    if device is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or inactive device token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return device
+
+async def _read_body(request: Request) -> str:
+    """The request body, gunzipped when sent with Content-Encoding: gzip, capped at the ingest limit"""
+    limit = settings.ingest_max_body_bytes
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise _PAYLOAD_TOO_LARGE
+    encoding = request.headers.get("content-encoding", "identity").lower()
+    if encoding not in ("identity", "gzip"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Encoding must be gzip or identity"
+        )
+    decoder = zlib.decompressobj(wbits=31) if encoding == "gzip" else None
+    chunks = []
+    size = 0
+    try:
+        async for chunk in request.stream():
+            if decoder is not None:
+                # Bound the output too, so a small gzip bomb cannot expand past the limit
+                chunk = decoder.decompress(chunk, limit + 1 - size)
+            size += len(chunk)
+            if size > limit:
+                raise _PAYLOAD_TOO_LARGE
+            chunks.append(chunk)
+        if decoder is not None and not decoder.eof:
+            raise zlib.error("truncated stream")
+        return b"".join(chunks).decode("utf-8")
+    except (zlib.error, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body is not valid gzip-compressed UTF-8" if decoder is not None else "Body is not valid UTF-8"
+        )
+
+@router.post("/readings", response_model=IngestResult)
+async def ingest_readings(
+    request: Request,
+    precision: str = Query("s", pattern="^(s|ms|us|ns)$", description="Unit of line-protocol timestamps"),
+    device: Device = Depends(get_current_device),
+    buffer: IngestBuffer = Depends(get_ingest_buffer),
+    db: Session = Depends(get_db)
+):
+    """Store a batch of sensor readings as line protocol (text/plain) or NDJSON (application/x-ndjson)
+
+    Answers once the readings are committed. A 503 means the ingest buffer
+    is full; retry the same batch after Retry-After seconds.
+    """
+    content_type = request.headers.get("content-type", "text/plain").split(";")[0].strip().lower()
+    if content_type not in ("text/plain", "application/x-ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send line protocol as text/plain or NDJSON as application/x-ndjson"
+        )
+    body = await _read_body(request)
+    try:
+        if content_type == "text/plain":
+            readings = ingestion.parse_line_protocol(body, precision)
+        else:
+            readings = ingestion.parse_ndjson(body)
+    except ingestion.IngestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    if len(readings) > buffer.max_pending_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {buffer.max_pending_rows} readings"
+        )
+
+    rows = [{**reading, "device_id": device.id, "station_id": device.station_id} for reading in readings]
+    # The flush writes with its own session; do not hold a pooled connection while waiting for it
+    db.close()
+    try:
+        accepted = await buffer.submit(rows) if rows else 0
+    except ingestion.IngestBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ingest buffer is full",
+            headers={"Retry-After": str(max(1, math.ceil(settings.ingest_flush_interval_ms / 1000)))},
+        )
+    return IngestResult(received=len(rows), accepted=accepted)
+
+@router.get("/devices", response_model=List[DeviceResponse])
+async def get_devices(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """List sensor devices (admin only)"""
+    return db.query(Device).order_by(Device.id).all()
+
+@router.post("/devices", response_model=DeviceCreated)
+async def create_device(
+    device: DeviceCreate,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Register a sensor device at a station and issue its token (admin only)
+
+    The token is only returned here; issue a new device to replace a lost one.
+    """
+    station = resolve_station(db, device.station_id)
+    if not station.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Station is inactive"
+        )
+    token = ingestion.new_token()
+    db_device = Device(
+        station_id=station.id,
+        name=device.name,
+        token_hash=ingestion.hash_token(token),
+        token_prefix=token[:12],
+        is_active=True
+    )
+    db.add(db_device)
+    db.commit()
+    db.refresh(db_device)
+    return DeviceCreated(**DeviceResponse.model_validate(db_device).dict(), token=token)
+
+@router.put("/devices/{device_id}", response_model=DeviceResponse)
+async def update_device(
+    device_id: int,
+    device_update: DeviceUpdate,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Rename a device or revoke its token by deactivating it (admin only)"""
+    device = db.get(Device, device_id)
+    if device is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device not found"
+        )
+    for field, value in device_update.dict(exclude_unset=True).items():
+        setattr(device, field, value)
+    db.commit()
+    db.refresh(device)
+    return device
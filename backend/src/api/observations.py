@@ -1,13 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, func
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import desc, exists
 from typing import List, Optional
-from datetime import datetime, timedelta
-import csv
-import io
+from datetime import datetime
+from ..core.cache import get_cache
 from ..core.database import get_db
 from ..models.observation_model import Observation
+from ..models.quality_model import QCFlag
+from ..models.station_model import Station
 from ..models.user_model import User
 from ..schemas.observation_schemas import (
     ObservationCreate, 
@@ -16,23 +17,67 @@ from ..schemas.observation_schemas import (
     ObservationSummary,
     DashboardData
 )
+from ..schemas.archive_schemas import ArchiveSegmentResponse, ArchiveRunResult
+from ..schemas.sync_schemas import DeletedObservation, ObservationChanges
 from ..middleware.auth_middleware import get_current_active_user, get_current_admin_user
+from ..services import archive, dashboard, exports, fieldsets, filters, observation_writes, psychrometrics, quality, search, sync
+from ..services.group_commit import GroupCommitWriter, get_group_writer
+from ..services.observation_events import ObservationChange, observations_changed
+from .stations import get_current_station, resolve_station
 
 router = APIRouter(prefix="/observations", tags=["observations"])
 
+def _compile_filters(expressions: Optional[List[str]]) -> filters.CompiledFilters:
+    """Validate `filter` query parameters, reporting mistakes as 422"""
+    try:
+        return filters.compile_filters(expressions)
+    except filters.FilterError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+def _parse_fields(raw: Optional[str], allowed=None) -> Optional[tuple]:
+    """Validate a `fields` query parameter, reporting mistakes as 422"""
+    try:
+        return fieldsets.response_fields(raw) if allowed is None else fieldsets.parse(raw, allowed)
+    except fieldsets.FieldsetError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
 @router.post("/", response_model=ObservationResponse)
 async def create_observation(
     observation: ObservationCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    writer: Optional[GroupCommitWriter] = Depends(get_group_writer)
 ):
     """Create a new weather observation"""
-    db_observation = Observation(
-        **observation.dict(),
-        observer_id=current_user.id
-    )
+    station = resolve_station(db, observation.station_id)
+    if not station.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Station is not active"
+        )
+    values = dict(observation.dict(), observer_id=current_user.id, station_id=station.id)
+    
+    if writer is not None:
+        # Committed together with other creates arriving in the same window
+        stored = await writer.submit(values)
+        get_cache().invalidate("observations")
+        return ObservationResponse(**stored)
+    
+    db_observation = Observation(**values)
     db.add(db_observation)
+    db.flush()
+    observations_changed(db, [ObservationChange(
+        db_observation.id, new_time=db_observation.observation_time,
+        observer_id=db_observation.observer_id, station_id=db_observation.station_id
+    )])
     db.commit()
+    get_cache().invalidate("observations")
     db.refresh(db_observation)
     return db_observation
 
@@ -43,11 +88,41 @@ async def get_observations(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     observer_id: Optional[int] = None,
+    min_humidity: Optional[float] = Query(None, ge=0, le=100),
+    max_humidity: Optional[float] = Query(None, ge=0, le=100),
+    q: Optional[str] = Query(None, min_length=1, max_length=200, description="Full-text search in notes"),
+    filter_expressions: Optional[List[str]] = Query(
+        None, alias="filter", description="Column filters as field:op[:value], e.g. total_cloud_amount:gte:6"
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. observation_time,temperature"),
+    qc_flag: Optional[str] = Query(None, description="Only observations failing this QC rule, or 'any' rule"),
+    station: Station = Depends(get_current_station),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get list of observations with filtering"""
-    query = db.query(Observation).join(User, Observation.observer_id == User.id)
+    """Get list of observations at one station with filtering"""
+    column_filters = _compile_filters(filter_expressions)
+    # An empty MATCH / to_tsquery is a database error, not an empty result
+    if q is not None and not search.tokens(q):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="q must contain at least one word"
+        )
+    if qc_flag is not None and qc_flag != "any" and qc_flag not in quality.RULES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown QC rule '{qc_flag}'. Choose from: any, {', '.join(quality.RULES)}"
+        )
+    fields = _parse_fields(fields)
+    query = (
+        db.query(Observation)
+        .join(User, Observation.observer_id == User.id)
+        .filter(Observation.station_id == station.id)
+    )
+    if fields:
+        # Archived rows merge by time; snippets are cut from the notes
+        extra = ["observation_time"] + (["notes"] if q and "search_snippet" in fields else [])
+        query = query.options(load_only(*fieldsets.load_columns(fields, *extra)))
     
     # Filter by date range if provided
     if start_date:
@@ -59,75 +134,206 @@ async def get_observations(
     if observer_id:
         query = query.filter(Observation.observer_id == observer_id)
     
-    observations = query.order_by(desc(Observation.observation_time)).offset(skip).limit(limit).all()
+    # Filter by derived relative humidity (indexed cached column)
+    if min_humidity is not None:
+        query = query.filter(Observation.relative_humidity >= min_humidity)
+    if max_humidity is not None:
+        query = query.filter(Observation.relative_humidity <= max_humidity)
+    
+    # Typed column filters (cloud amounts, weather code ranges, ...)
+    query = column_filters.apply(query)
+    
+    # QC flags live in their own indexed table
+    if qc_flag is not None:
+        flagged = QCFlag.observation_id == Observation.id
+        if qc_flag != "any":
+            flagged = flagged & (QCFlag.rule == qc_flag)
+        query = query.filter(exists().where(flagged))
+    
+    # Full-text search ranks matches by relevance, newest first among equals
+    if q:
+        query, rank = search.apply_search(query, q)
+        query = query.add_columns(rank.label("search_rank"))
+        query = query.order_by(desc("search_rank"), desc(Observation.observation_time))
+    else:
+        query = query.order_by(desc(Observation.observation_time))
+    
+    # Read through to archived segments when the range reaches past the horizon;
+    # archived rows are not QC-checked, so they never match a QC filter
+    segments = [] if qc_flag is not None else archive.segments_in_range(db, start_date, end_date)
+    if segments:
+        def predicate(row):
+            if observer_id and row.observer_id != observer_id:
+                return False
+            if min_humidity is not None and (row.relative_humidity is None or row.relative_humidity < min_humidity):
+                return False
+            if max_humidity is not None and (row.relative_humidity is None or row.relative_humidity > max_humidity):
+                return False
+            if q and not search.matches(row, q):
+                return False
+            return column_filters.matches(row)
+        
+        hot_rows = query.limit(skip + limit).all()
+        archived_rows = archive.load_observations(
+            segments, start_date, end_date, predicate, limit=skip + limit, station=station
+        )
+        if q:
+            # Archived matches are unranked and follow the ranked hot matches
+            rows = hot_rows + [(row, None) for row in archived_rows]
+        else:
+            rows = archive.merge_newest_first(hot_rows, archived_rows)
+        rows = rows[skip:skip + limit]
+    else:
+        rows = query.offset(skip).limit(limit).all()
+    if not q:
+        rows = [(row, None) for row in rows]
     
     # Add observer name to each observation
+    observer_names = {}
+    if fieldsets.wants_observer_name(fields):
+        observer_names = exports.observer_names(db, (observation.observer_id for observation, _ in rows))
     result = []
-    for observation in observations:
+    for observation, search_rank in rows:
         obs_dict = observation.__dict__.copy()
-        observer = db.query(User).filter(User.id == observation.observer_id).first()
-        obs_dict['observer_name'] = observer.formal_name or observer.display_name or observer.google_name if observer else None
-        result.append(ObservationResponse(**obs_dict))
+        obs_dict['observer_name'] = observer_names.get(obs_dict.get('observer_id'))
+        if q:
+            obs_dict['search_rank'] = search_rank
+            if fields is None or "search_snippet" in fields:
+                obs_dict['search_snippet'] = search.snippet(observation.notes, q)
+        result.append(obs_dict if fields else ObservationResponse(**obs_dict))
     
+    if fields:
+        return fieldsets.render(fields, result)
     return result
 
 @router.get("/dashboard", response_model=DashboardData)
 async def get_dashboard_data(
+    station: Station = Depends(get_current_station),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get latest observation data for dashboard"""
-    # Get the most recent observation
-    latest_observation = (
-        db.query(Observation)
-        .order_by(desc(Observation.observation_time))
-        .first()
-    )
-    
-    if not latest_observation:
+    """Get a station's latest observation data for dashboard"""
+    dashboard_data = dashboard.cached_dashboard(db, station)
+    if dashboard_data is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No observations found"
         )
+    return dashboard_data
+
+@router.get("/changes", response_model=ObservationChanges)
+async def get_observation_changes(
+    since: Optional[str] = Query(None, description="next_token of the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=5000),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get observations created, updated or deleted at a station since a sync token
+
+    Repeat with `next_token` while `has_more` is true. A 410 means the token
+    is older than the remembered deletions; sync again without `since`.
+    Only observations in the hot table are listed: archived ones are left
+    out, even from a full sync, until their segment is restored.
+    """
+    try:
+        changed, deleted, next_token, has_more = sync.changes_since(db, station, since, limit)
+    except sync.SyncError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except sync.SyncExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; sync again without since"
+        )
     
-    # Calculate 24-hour precipitation
-    observation_time = latest_observation.observation_time
-    twenty_four_hours_ago = observation_time - timedelta(hours=24)
-    
-    precipitation_24h = (
-        db.query(func.sum(Observation.precipitation))
-        .filter(
-            and_(
-                Observation.observation_time >= twenty_four_hours_ago,
-                Observation.observation_time <= observation_time,
-                Observation.precipitation.isnot(None)
+    observer_names = exports.observer_names(db, (observation.observer_id for observation in changed))
+    return ObservationChanges(
+        changed=[
+            ObservationResponse(**observation.__dict__, observer_name=observer_names.get(observation.observer_id))
+            for observation in changed
+        ],
+        deleted=[
+            DeletedObservation(
+                id=tombstone.observation_id,
+                station_id=tombstone.station_id,
+                observation_time=tombstone.observation_time,
+                deleted_at=tombstone.deleted_at
             )
-        )
-        .scalar()
+            for tombstone in deleted
+        ],
+        next_token=next_token,
+        has_more=has_more
     )
-    
-    # Get observer name (prioritize formal_name set by user)
-    observer = db.query(User).filter(User.id == latest_observation.observer_id).first()
-    observer_name = observer.formal_name or observer.display_name or observer.google_name if observer else None
-    
-    return DashboardData(
-        observation_time=latest_observation.observation_time,
-        temperature=latest_observation.temperature,
-        wet_bulb_temperature=latest_observation.wet_bulb_temperature,
-        precipitation_24h=precipitation_24h,
-        current_evaporation_level=latest_observation.current_evaporation_level,
-        evaporation_pan_temp=latest_observation.evaporation_pan_temp,
-        observer_name=observer_name
+
+@router.post("/derived/recompute")
+async def recompute_derived_humidity(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Recompute cached relative humidity, dew point and vapour pressure (admin only)"""
+    updated = psychrometrics.recompute_cached(db)
+    exports.invalidate_all(db)
+    sync.touch_all(db)
+    db.commit()
+    get_cache().invalidate("observations")
+    return {"message": "Derived humidity recomputed successfully", "observations_updated": updated}
+
+@router.post("/archive", response_model=ArchiveRunResult)
+async def run_archive(
+    before: Optional[datetime] = None,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Move observations older than the archive horizon into cold storage (admin only)"""
+    cutoff = before or archive.archive_cutoff()
+    segments = archive.archive_observations(db, cutoff)
+    get_cache().invalidate("observations")
+    return ArchiveRunResult(
+        cutoff=cutoff,
+        segments_created=len(segments),
+        observations_archived=sum(segment.row_count for segment in segments)
     )
 
+@router.get("/archive/segments", response_model=List[ArchiveSegmentResponse])
+async def get_archive_segments(
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """List the archived month segments and their time ranges (admin only)"""
+    return archive.segments_in_range(db)
+
+@router.post("/archive/segments/{segment_id}/restore")
+async def restore_archive_segment(
+    segment_id: int,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Move an archived segment back into the hot table so its rows can be edited (admin only)"""
+    restored = archive.restore_segment(db, segment_id)
+    get_cache().invalidate("observations")
+    if not restored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archive segment not found"
+        )
+    return {"message": "Archive segment restored successfully", "observations_restored": restored}
+
 @router.get("/{observation_id}", response_model=ObservationResponse)
 async def get_observation(
     observation_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. observation_time,temperature"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific observation by ID"""
-    observation = db.query(Observation).filter(Observation.id == observation_id).first()
+    fields = _parse_fields(fields)
+    query = db.query(Observation).filter(Observation.id == observation_id)
+    if fields:
+        query = query.options(load_only(*fieldsets.load_columns(fields)))
+    observation = query.first()
     
     if not observation:
         raise HTTPException(
@@ -139,11 +345,26 @@ async def get_observation(
     
     # Add observer name
     obs_dict = observation.__dict__.copy()
-    observer = db.query(User).filter(User.id == observation.observer_id).first()
-    obs_dict['observer_name'] = observer.formal_name or observer.display_name or observer.google_name if observer else None
+    if fieldsets.wants_observer_name(fields):
+        observer = db.query(User).filter(User.id == observation.observer_id).first()
+        obs_dict['observer_name'] = observer.formal_name or observer.display_name or observer.google_name if observer else None
     
+    if fields:
+        return fieldsets.render(fields, obs_dict)
     return ObservationResponse(**obs_dict)
 
+def _missing_or_forbidden(db: Session, observation_id: int) -> HTTPException:
+    """Explain why a guarded write matched no row"""
+    if not observation_writes.exists(db, observation_id):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Observation not found"
+        )
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not enough permissions"
+    )
+
 @router.put("/{observation_id}", response_model=ObservationResponse)
 async def update_observation(
     observation_id: int,
@@ -152,35 +373,16 @@ async def update_observation(
     db: Session = Depends(get_db)
 ):
     """Update a specific observation"""
-    observation = db.query(Observation).filter(Observation.id == observation_id).first()
-    
-    if not observation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Observation not found"
-        )
-    
-    # Check permissions - admin can edit all, users can only edit their own
-    if not current_user.is_admin and observation.observer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    # Update fields
-    update_data = observation_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(observation, field, value)
-    
+    # Admin can edit all, users can only edit their own
+    row = observation_writes.update_observation(
+        db, observation_id, current_user, observation_update.dict(exclude_unset=True)
+    )
+    if row is None:
+        raise _missing_or_forbidden(db, observation_id)
     db.commit()
-    db.refresh(observation)
+    get_cache().invalidate("observations")
     
-    # Add observer name
-    obs_dict = observation.__dict__.copy()
-    observer = db.query(User).filter(User.id == observation.observer_id).first()
-    obs_dict['observer_name'] = observer.formal_name or observer.display_name or observer.google_name if observer else None
-    
-    return ObservationResponse(**obs_dict)
+    return ObservationResponse(**row._mapping)
 
 @router.delete("/{observation_id}")
 async def delete_observation(
@@ -189,23 +391,11 @@ async def delete_observation(
     db: Session = Depends(get_db)
 ):
     """Delete a specific observation"""
-    observation = db.query(Observation).filter(Observation.id == observation_id).first()
-    
-    if not observation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Observation not found"
-        )
-    
-    # Check permissions - admin can delete all, users can only delete their own
-    if not current_user.is_admin and observation.observer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    db.delete(observation)
+    # Admin can delete all, users can only delete their own
+    if not observation_writes.delete_observation(db, observation_id, current_user):
+        raise _missing_or_forbidden(db, observation_id)
     db.commit()
+    get_cache().invalidate("observations")
     return {"message": "Observation deleted successfully"}
 
 @router.get("/user/{user_id}", response_model=List[ObservationSummary])
@@ -213,6 +403,7 @@ async def get_user_observations(
     user_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    station_id: Optional[int] = Query(None, description="Only this station; every station when omitted"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -223,9 +414,11 @@ async def get_user_observations(
             detail="Not enough permissions"
         )
     
+    query = db.query(Observation).filter(Observation.observer_id == user_id)
+    if station_id is not None:
+        query = query.filter(Observation.station_id == station_id)
     observations = (
-        db.query(Observation)
-        .filter(Observation.observer_id == user_id)
+        query
         .order_by(desc(Observation.observation_time))
         .offset(skip)
         .limit(limit)
@@ -238,105 +431,29 @@ async def get_user_observations(
 async def export_observations_csv(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    filter_expressions: Optional[List[str]] = Query(
+        None, alias="filter", description="Column filters as field:op[:value], e.g. total_cloud_amount:gte:6"
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated CSV columns, e.g. observation_time,temperature"),
+    station: Station = Depends(get_current_station),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Export observations as CSV file"""
+    """Export one station's observations as CSV file"""
+    _compile_filters(filter_expressions)
+    fields = _parse_fields(fields, exports.EXPORT_FIELDS)
     try:
-        # Build query without join first, then get observations
-        query = db.query(Observation)
-        
-        # Filter by date range if provided
-        if start_date:
-            query = query.filter(Observation.observation_time >= start_date)
-        if end_date:
-            query = query.filter(Observation.observation_time <= end_date)
-        
-        # Remove user filtering - all authenticated users can access all data
-        # No filtering by observer_id for any user
-        
-        observations = query.order_by(desc(Observation.observation_time)).all()
-        
-        # Create CSV data
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header (Chinese field names for UI display)
-        writer.writerow([
-            '觀測時間',
-            '觀測人員', 
-            '現在溫度 (°C)',
-            '濕球溫度 (°C)',
-            '降水量 (mm)',
-            '蒸發皿水溫 (°C)',
-            '現蒸發皿水位高 (mm)',
-            '現在天氣代碼',
-            '總雲量 (0-8)',
-            '高雲雲種代碼 (0-9)',
-            '高雲雲量 (0-8)',
-            '中雲雲種代碼 (0-9)',
-            '中雲雲量 (0-8)',
-            '低雲雲種代碼 (0-9)',
-            '低雲雲量 (0-8)',
-            '洗蒸發皿後水位高 (mm)',
-            '洗蒸發皿後水溫 (°C)',
-            '加蒸發皿水位後水位高 (mm)',
-            '加蒸發皿水位後水溫 (°C)',
-            '減蒸發皿水位後水位高 (mm)',
-            '減蒸發皿水位後水溫 (°C)',
-            '備註'
-        ])
-        
-        # Write data rows
-        for observation in observations:
-            observer = db.query(User).filter(User.id == observation.observer_id).first()
-            observer_name = observer.formal_name or observer.display_name or observer.google_name if observer else None
-            
-            writer.writerow([
-                observation.observation_time.strftime('%Y-%m-%d %H:%M:%S') if observation.observation_time else '',
-                observer_name or '',
-                observation.temperature if observation.temperature is not None else '',
-                observation.wet_bulb_temperature if observation.wet_bulb_temperature is not None else '',
-                observation.precipitation if observation.precipitation is not None else '',
-                observation.evaporation_pan_temp if observation.evaporation_pan_temp is not None else '',
-                observation.current_evaporation_level if observation.current_evaporation_level is not None else '',
-                observation.current_weather_code if observation.current_weather_code is not None else '',
-                observation.total_cloud_amount if observation.total_cloud_amount is not None else '',
-                observation.high_cloud_type_code if observation.high_cloud_type_code is not None else '',
-                observation.high_cloud_amount if observation.high_cloud_amount is not None else '',
-                observation.middle_cloud_type_code if observation.middle_cloud_type_code is not None else '',
-                observation.middle_cloud_amount if observation.middle_cloud_amount is not None else '',
-                observation.low_cloud_amount if observation.low_cloud_amount is not None else '',
-                observation.cleaned_evaporation_level if observation.cleaned_evaporation_level is not None else '',
-                observation.cleaned_evaporation_temp if observation.cleaned_evaporation_temp is not None else '',
-                observation.added_evaporation_level if observation.added_evaporation_level is not None else '',
-                observation.added_evaporation_temp if observation.added_evaporation_temp is not None else '',
-                observation.reduced_evaporation_level if observation.reduced_evaporation_level is not None else '',
-                observation.reduced_evaporation_temp if observation.reduced_evaporation_temp is not None else '',
-                observation.notes or ''
-            ])
-        
-        output.seek(0)
-        
-        # Generate filename with date range
-        if start_date and end_date:
-            filename = f"weather_observations_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"
-        elif start_date:
-            filename = f"weather_observations_from_{start_date.strftime('%Y%m%d')}.csv"
-        elif end_date:
-            filename = f"weather_observations_until_{end_date.strftime('%Y%m%d')}.csv"
-        else:
-            filename = f"weather_observations_{datetime.now().strftime('%Y%m%d')}.csv"
-        
-        # Create the response with proper headers
-        response_content = output.getvalue().encode('utf-8-sig')  # UTF-8 BOM for Excel compatibility
+        # All authenticated users can export all data, so there is no observer filter
+        body = exports.build_export(db, station, start_date, end_date, filter_expressions, fields)
+        filename = exports.export_filename(start_date, end_date)
         
+        # Cached month segments are streamed from disk
         return StreamingResponse(
-            io.BytesIO(response_content),
+            iter(body),
             media_type="text/csv; charset=utf-8",
             headers={
                 "Content-Disposition": f"attachment; filename=\"{filename}\"",
-                "Content-Length": str(len(response_content))
+                "Content-Length": str(body.size)
             }
         )
     
@@ -344,4 +461,4 @@ async def export_observations_csv(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"CSV export failed: {str(e)}"
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy import desc
+from typing import List, Optional
+from ..core.database import get_db
+from ..models.quality_model import QCFlag
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.quality_schemas import QCFlagResponse, QCScanResult
+from ..middleware.auth_middleware import get_current_active_user, get_current_admin_user
+from ..services import quality
+from .stations import get_current_station, resolve_station
+
+router = APIRouter(prefix="/observations/qc", tags=["quality"])
+
+@router.get("/flags", response_model=List[QCFlagResponse])
+async def get_qc_flags(
+    rule: Optional[str] = Query(None, description="Only flags of this rule"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List the QC flags raised at one station, newest observation first"""
+    query = db.query(QCFlag).filter(QCFlag.station_id == station.id)
+    if rule is not None:
+        if rule not in quality.RULES:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown QC rule '{rule}'. Choose from: {', '.join(quality.RULES)}"
+            )
+        query = query.filter(QCFlag.rule == rule)
+    return query.order_by(desc(QCFlag.observation_time), QCFlag.rule).offset(skip).limit(limit).all()
+
+@router.post("/scan", response_model=QCScanResult)
+async def scan_observations(
+    station_id: Optional[int] = None,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Re-check every observation, or one station's, against the QC rules (admin only)"""
+    if station_id is not None:
+        station_id = resolve_station(db, station_id).id
+    return QCScanResult(**quality.scan(db, station_id))
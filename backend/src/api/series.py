@@ -0,0 +1,116 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Float, Integer
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+import numpy as np
+from ..core.cache import get_cache
+from ..core.database import get_db
+from ..models.observation_model import Observation
+from ..models.sensor_model import SensorReading
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.series_schemas import SeriesResponse
+from ..middleware.auth_middleware import get_current_active_user
+from ..services import archive, ingestion
+from ..services.downsampling import lttb
+from .stations import get_current_station
+
+router = APIRouter(prefix="/observations/series", tags=["series"])
+
+EPOCH = datetime(1970, 1, 1)
+
+# Numeric measurement columns that can be charted
+SERIES_FIELDS = {
+    column.name: column
+    for column in Observation.__table__.columns
+    if isinstance(column.type, (Float, Integer)) and column.name not in ("id", "observer_id", "station_id", "change_seq")
+}
+
+SOURCES = {
+    "manual": SERIES_FIELDS.keys(),
+    "sensor": set(ingestion.SENSOR_FIELDS),
+    "all": SERIES_FIELDS.keys() | set(ingestion.SENSOR_FIELDS),
+}
+
+@router.get("", response_model=SeriesResponse)
+async def get_series(
+    field: str = Query(..., description="Numeric observation field, e.g. temperature"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    points: int = Query(500, ge=3, le=5000, description="Maximum number of points to return"),
+    source: str = Query("manual", pattern="^(manual|sensor|all)$", description="Manual observations, sensor readings or both"),
+    station: Station = Depends(get_current_station),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get one field of a station as columnar time/value arrays, downsampled with LTTB"""
+    if field not in SOURCES[source]:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown {source} series field '{field}'. Choose one of: {', '.join(sorted(SOURCES[source]))}"
+        )
+    column = SERIES_FIELDS.get(field) if source != "sensor" else None
+    sensor_column = getattr(SensorReading, field) if source != "manual" and field in ingestion.SENSOR_FIELDS else None
+    
+    def build():
+        times = []
+        values = []
+        # Narrow two-column queries, streamed in chunks instead of loading ORM objects
+        if column is not None:
+            query = db.query(Observation.observation_time, column).filter(
+                Observation.station_id == station.id, column.isnot(None)
+            )
+            if start_date:
+                query = query.filter(Observation.observation_time >= start_date)
+            if end_date:
+                query = query.filter(Observation.observation_time <= end_date)
+            for observation_time, value in query.order_by(Observation.observation_time).yield_per(5000):
+                times.append(observation_time)
+                values.append(value)
+        
+        if sensor_column is not None:
+            query = db.query(SensorReading.time, sensor_column).filter(
+                SensorReading.station_id == station.id, sensor_column.isnot(None)
+            )
+            if start_date:
+                query = query.filter(SensorReading.time >= start_date)
+            if end_date:
+                query = query.filter(SensorReading.time <= end_date)
+            sensor_points = list(query.order_by(SensorReading.time).yield_per(5000))
+            if sensor_points:
+                merged = sorted(list(zip(times, values)) + sensor_points, key=lambda point: archive.normalize_time(point[0]))
+                times = [point[0] for point in merged]
+                values = [point[1] for point in merged]
+        
+        segments = archive.segments_in_range(db, start_date, end_date) if column is not None else []
+        if segments:
+            archived = [
+                (row.observation_time, getattr(row, field))
+                for row in archive.load_observations(segments, start_date, end_date, station=station)
+                if getattr(row, field) is not None
+            ]
+            merged = sorted(
+                list(zip(times, values)) + archived,
+                key=lambda point: archive.normalize_time(point[0])
+            )
+            times = [point[0] for point in merged]
+            values = [point[1] for point in merged]
+        
+        x = np.array([(archive.normalize_time(time) - EPOCH).total_seconds() for time in times], dtype=float)
+        y = np.array(values, dtype=float)
+        kept = lttb(x, y, points)
+        
+        return jsonable_encoder(SeriesResponse(
+            field=field,
+            start_date=start_date,
+            end_date=end_date,
+            source_points=len(times),
+            times=[times[index] for index in kept],
+            values=[float(y[index]) for index in kept]
+        ))
+    
+    key = f"{station.id}|{source}|{field}|{start_date}|{end_date}|{points}"
+    depends_on = {"manual": ("observations",), "sensor": ("sensor_readings",), "all": ("observations", "sensor_readings")}[source]
+    return get_cache().get_or_set("series", key, build, depends_on=depends_on)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..core.database import get_db
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.station_schemas import StationCreate, StationUpdate, StationResponse
+from ..middleware.auth_middleware import get_current_active_user, get_current_admin_user
+from ..services import stations
+
+router = APIRouter(prefix="/stations", tags=["stations"])
+
+def resolve_station(db: Session, station_id: Optional[int]) -> Station:
+    """The requested station, or the default one when none is named; 404 if it does not exist"""
+    station = stations.get_station(db, station_id)
+    if station is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Station not found"
+        )
+    return station
+
+def get_current_station(
+    station_id: Optional[int] = Query(None, description="Station to read; the default station when omitted"),
+    db: Session = Depends(get_db)
+) -> Station:
+    """Dependency scoping a read to one station"""
+    return resolve_station(db, station_id)
+
+@router.get("/", response_model=List[StationResponse])
+async def get_stations(
+    include_inactive: bool = False,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """List the stations of this deployment"""
+    query = db.query(Station)
+    if not include_inactive:
+        query = query.filter(Station.is_active == True)
+    return query.order_by(Station.code).all()
+
+@router.post("/", response_model=StationResponse)
+async def create_station(
+    station: StationCreate,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Add a station (admin only)"""
+    if db.query(Station).filter(Station.code == station.code).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Station code already exists"
+        )
+    db_station = Station(code=station.code, name=station.name, is_active=True)
+    db.add(db_station)
+    db.commit()
+    db.refresh(db_station)
+    return db_station
+
+@router.put("/{station_id}", response_model=StationResponse)
+async def update_station(
+    station_id: int,
+    station_update: StationUpdate,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Rename or deactivate a station (admin only)"""
+    station = resolve_station(db, station_id)
+    if station_update.is_active is False and stations.is_default(station):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The default station cannot be deactivated"
+        )
+    for field, value in station_update.dict(exclude_unset=True).items():
+        setattr(station, field, value)
+    db.commit()
+    db.refresh(station)
+    return station
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from sqlalchemy import or_, tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
+import base64
+from ..core.cache import get_cache
 from ..core.database import get_db
 from ..models.user_model import User
 from ..schemas.user_schemas import UserResponse, UserUpdate, UserSummary, UserSettingsUpdate
@@ -8,6 +12,41 @@ from ..middleware.auth_middleware import get_current_active_user, get_current_ad
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+def _encode_cursor(user: User) -> str:
+    value = f"{user.created_at.isoformat()}|{user.id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def _user_page(db: Session, limit: int, cursor: Optional[str], q: Optional[str]):
+    query = db.query(User)
+    if q:
+        pattern = f"%{q}%"
+        query = query.filter(or_(
+            User.email.ilike(pattern),
+            User.display_name.ilike(pattern),
+            User.formal_name.ilike(pattern),
+            User.google_name.ilike(pattern),
+        ))
+    
+    # Keyset pagination over the (created_at, id) index
+    if cursor:
+        created_at, user_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(User.created_at, User.id) < tuple_(created_at, user_id))
+    users = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1).all()
+    
+    if len(users) > limit:
+        return users[:limit], _encode_cursor(users[limit - 1])
+    return users, None
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """Get current user information"""
@@ -25,6 +64,7 @@ async def update_user_settings(
         current_user.formal_name = settings_update.formal_name
     
     db.commit()
+    get_cache().invalidate("users")
     db.refresh(current_user)
     return current_user
 
@@ -44,12 +84,26 @@ async def update_current_user(
 
 @router.get("/", response_model=List[UserSummary])
 async def get_users(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Search email and names"),
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all users (admin only)"""
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return users
+    """Get users newest first, one page at a time (admin only)"""
+    def build():
+        users, next_cursor = _user_page(db, limit, cursor, q)
+        return {
+            "users": [UserSummary.model_validate(user).model_dump(mode="json") for user in users],
+            "next_cursor": next_cursor,
+        }
+    
+    # Counters change with observation writes, so those invalidate the page too
+    page = get_cache().get_or_set("users", f"{limit}|{cursor}|{q}", build, depends_on=("users", "observations"))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["users"]
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
@@ -87,6 +141,7 @@ async def update_user(
         setattr(user, field, value)
     
     db.commit()
+    get_cache().invalidate("users")
     db.refresh(user)
     return user
 
@@ -112,6 +167,7 @@ async def deactivate_user(
     
     user.is_active = False
     db.commit()
+    get_cache().invalidate("users")
     return {"message": "User deactivated successfully"}
 
 @router.post("/{user_id}/activate")
@@ -130,6 +186,7 @@ async def activate_user(
     
     user.is_active = True
     db.commit()
+    get_cache().invalidate("users")
     return {"message": "User activated successfully"}
 
 @router.post("/{user_id}/make-admin")
@@ -148,6 +205,7 @@ async def make_admin(
     
     user.is_admin = True
     db.commit()
+    get_cache().invalidate("users")
     return {"message": "User promoted to admin successfully"}
 
 @router.delete("/{user_id}/remove-admin")
@@ -172,4 +230,5 @@ async def remove_admin(
     
     user.is_admin = False
     db.commit()
+    get_cache().invalidate("users")
     return {"message": "Admin privileges removed successfully"}
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""Shared response cache.
+
+``CACHE_URL`` picks the backend:
+
+* ``memory://`` - per-process LRU; fine for a single worker.
+* ``sqlite:///path/to/cache.db`` - a WAL-mode SQLite file shared by every
+  worker on one host.
+* ``redis://host:6379/0`` - any server speaking the Redis protocol, shared
+  by every replica. The client is a small RESP implementation, so no extra
+  dependency is needed.
+
+Entries are never invalidated one by one. Each cached value names the data
+it depends on ("observations", "users") and the current version counter of
+each is part of its key; writers bump the counter after committing, which
+makes every process miss on its next read. Old entries simply expire.
+"""
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Byte-level storage; every method is safe to call from any thread"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        """Add one to a counter, creating it at 1; a new counter expires after `ttl` seconds if given"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, max_entries: int = 1024):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key, ttl=None):
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] < now):
+                value, expires = 1, now + ttl if ttl else None
+            else:
+                value, expires = int(entry[0]) + 1, entry[1]
+            self._entries[key] = (str(value).encode(), expires)
+            if ttl:
+                # Expiring counters come and go, so they count towards the size limit
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend(CacheBackend):
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires >= ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl if ttl else None),
+        )
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr(self, key, ttl=None):
+        now = time.time()
+        row = self._connection().execute(
+            "INSERT INTO cache (key, value, expires) VALUES (?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "value = CASE WHEN expires < ? THEN 1 ELSE CAST(value AS INTEGER) + 1 END, "
+            "expires = CASE WHEN expires < ? THEN excluded.expires ELSE expires END "
+            "RETURNING value",
+            (key, now + ttl if ttl else None, now, now),
+        ).fetchone()
+        return int(row[0])
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+
+    def purge_expired(self) -> int:
+        return self._connection().execute("DELETE FROM cache WHERE expires < ?", (time.time(),)).rowcount
+
+
+class RedisError(Exception):
+    """Error reply from the server"""
+
+
+class RedisBackend(CacheBackend):
+    """Minimal RESP2 client: one connection per thread, reconnecting on failure"""
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 1.0):
+        self._address = (host, port)
+        self._db = db
+        self._password = password
+        self._timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        parsed = urlparse(url)
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=parsed.password,
+        )
+
+    def _connect(self):
+        sock = socket.create_connection(self._address, timeout=self._timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self._password:
+            self._call("AUTH", self._password)
+        if self._db:
+            self._call("SELECT", self._db)
+
+    def _read(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"unexpected reply {line!r}")
+
+    def _call(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read()
+
+    def command(self, *args):
+        if getattr(self._local, "sock", None) is None:
+            self._connect()
+        try:
+            return self._call(*args)
+        except (OSError, ConnectionError):
+            # Stale connection (server restart, idle timeout): retry once on a new one
+            self.close()
+            self._connect()
+            return self._call(*args)
+
+    def close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def get(self, key):
+        return self.command("GET", key)
+
+    def get_many(self, keys):
+        return self.command("MGET", *keys) if keys else []
+
+    def set(self, key, value, ttl):
+        if ttl:
+            self.command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self.command("SET", key, value)
+
+    def delete(self, key):
+        self.command("DEL", key)
+
+    def incr(self, key, ttl=None):
+        value = self.command("INCR", key)
+        if ttl and value == 1:
+            # The call that created the counter sets its expiry, so a counter that
+            # expires between calls is recreated by INCR and expires again
+            self.command("PEXPIRE", key, int(ttl * 1000))
+        return value
+
+    def clear(self):
+        self.command("FLUSHDB")
+
+
+def create_backend(url: str) -> CacheBackend:
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryBackend(settings.cache_max_entries)
+    if scheme == "sqlite":
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if scheme == "redis":
+        return RedisBackend.from_url(url)
+    raise ValueError(f"Unsupported CACHE_URL scheme '{scheme}'")
+
+
+class Cache:
+    """JSON values keyed by name, invalidated through shared version counters"""
+
+    def __init__(self, backend: CacheBackend, prefix: str = "wm", ttl: float = 300):
+        self.backend = backend
+        self._prefix = prefix
+        self._ttl = ttl
+
+    def _version_key(self, dependency: str) -> str:
+        return f"{self._prefix}:version:{dependency}"
+
+    def _key(self, name: str, key: str, depends_on: Iterable[str]) -> str:
+        depends_on = sorted(depends_on)
+        versions = self.backend.get_many([self._version_key(dependency) for dependency in depends_on])
+        stamp = ".".join(f"{dependency}{int(version or 0)}" for dependency, version in zip(depends_on, versions))
+        return f"{self._prefix}:{name}:{stamp}:{key}"
+
+    def get_or_set(self, name: str, key: str, factory: Callable[[], Any],
+                   depends_on: Iterable[str], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, computing and storing it on a miss.
+
+        `factory` must return something JSON-serializable. Backend failures
+        are logged and fall back to calling `factory`.
+        """
+        try:
+            full_key = self._key(name, key, depends_on)
+            cached = self.backend.get(full_key)
+        except Exception:
+            logger.warning("cache read failed", exc_info=True)
+            return factory()
+        if cached is not None:
+            return json.loads(cached)
+
+        value = factory()
+        try:
+            self.backend.set(full_key, json.dumps(value).encode(), self._ttl if ttl is None else ttl)
+        except Exception:
+            logger.warning("cache write failed", exc_info=True)
+        return value
+
+    def invalidate(self, *dependencies: str) -> None:
+        """Make every entry depending on any of `dependencies` miss from now on"""
+        for dependency in dependencies:
+            try:
+                self.backend.incr(self._version_key(dependency))
+            except Exception:
+                logger.warning("cache invalidation failed for %s", dependency, exc_info=True)
+
+
+_cache: Optional[Cache] = None
+_lock = threading.Lock()
+
+
+def get_cache() -> Cache:
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = Cache(create_backend(settings.cache_url), ttl=settings.cache_ttl_seconds)
+        return _cache
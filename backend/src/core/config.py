@@ -12,6 +12,16 @@ class Settings(BaseSettings):
     google_client_id: str
     google_client_secret: str
     google_redirect_uri: str = "http://localhost:8000/auth/google/callback"
+    google_authorize_url: str = "https://accounts.google.com/o/oauth2/auth"
+    google_token_url: str = "https://oauth2.googleapis.com/token"
+    google_userinfo_url: str = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+    # Outbound HTTP client shared by every OAuth call (keep-alive pool)
+    oauth_http_timeout_seconds: float = 10
+    oauth_http_connect_timeout_seconds: float = 5
+    oauth_http_max_connections: int = 20
+    oauth_http_max_keepalive: int = 10
+    oauth_http_keepalive_seconds: float = 60
     
     # JWT
     secret_key: str
@@ -25,6 +35,90 @@ class Settings(BaseSettings):
     environment: str = "development"
     debug: bool = True
 
+    # Database connection pool (server databases only); readiness watches its saturation
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+
+    # Slow-query log - statements over the threshold are kept for GET /admin/slow-queries
+    slow_query_threshold_ms: float = 500
+    slow_query_buffer_size: int = 200
+    slow_query_explain_sample_rate: float = 0.0  # share of slow Postgres SELECTs whose plan is recorded with EXPLAIN
+
+    # Readiness probe - DB ping result is reused for the cache window
+    readiness_cache_seconds: float = 2.0
+    readiness_db_timeout_seconds: float = 1.0
+    readiness_max_pool_utilization: float = 0.9  # checked-out share of pool size + overflow
+    readiness_max_loop_lag_seconds: float = 0.5
+    loop_lag_interval_seconds: float = 0.5
+
+    # Admission control - token buckets per user and concurrency caps per process, for each route class
+    admission_enabled: bool = True
+    admission_rate_per_second: float = 10
+    admission_burst: int = 40
+    admission_max_concurrent: int = 64
+    admission_heavy_rate_per_second: float = 0.2  # exports and imports
+    admission_heavy_burst: int = 5
+    admission_heavy_max_concurrent: int = 4
+    admission_max_pool_wait_seconds: float = 0.5  # shed requests while a checkout has waited longer
+    admission_retry_after_seconds: int = 1
+    admission_shared: bool = False  # count buckets in the shared cache so replicas share each budget
+
+    # Data-quality checks - a temperature step above the limit within the window is a spike
+    qc_max_temperature_change: float = 10.0  # °C
+    qc_spike_window_hours: float = 6.0
+    qc_scan_chunk_rows: int = 50000
+
+    # Coverage report - scheduled local observation times and how far off an observation may be
+    coverage_slots: str = "08:00,14:00,20:00"
+    coverage_tolerance_minutes: int = 30
+    coverage_max_days: int = 366
+    coverage_cache_ttl_seconds: float = 86400  # closed months; keyed on their data version
+
+    # Delta sync (GET /observations/changes) - older tokens get 410 and must resync in full
+    sync_tombstone_retention_days: int = 90
+
+    # Station used when a request names none; created with the stations table
+    default_station_code: str = "main"
+
+    # Station-local time zone used for daily and day-of-year grouping
+    station_timezone: str = "Asia/Taipei"
+
+    # Station pressure (hPa) used to derive humidity from dry and wet bulb readings
+    station_pressure_hpa: float = 1013.25
+
+    # Archival - observations older than the horizon move to compressed month segments
+    archive_horizon_days: int = 730
+    archive_cache_segments: int = 64  # decoded segments kept in memory per process
+
+    # Group commit - batch concurrent observation creates into one transaction
+    group_commit_enabled: bool = False
+    group_commit_window_ms: float = 5.0
+    group_commit_max_items: int = 64
+
+    # Sensor ingestion - device readings are buffered and bulk-inserted
+    ingest_flush_interval_ms: float = 500
+    ingest_flush_rows: int = 5000
+    ingest_max_pending_rows: int = 50000  # batches beyond this wait, then get 503
+    ingest_enqueue_timeout_seconds: float = 2.0
+    ingest_max_body_bytes: int = 1_000_000  # after gzip decoding
+
+    # Shared cache - memory://, sqlite:///path/cache.db or redis://host:6379/0
+    cache_url: str = "memory://"
+    cache_ttl_seconds: float = 300
+    cache_max_entries: int = 1024  # memory:// only
+
+    # In-app scheduler for maintenance jobs (one replica runs each tick on Postgres)
+    scheduler_enabled: bool = False
+    scheduler_jitter_seconds: float = 30
+
+    # Background CSV exports - files stay downloadable for the TTL, then are deleted
+    export_storage_dir: str = "exports"
+    export_workers: int = 2
+    export_ttl_seconds: float = 86400
+    export_job_timeout_seconds: float = 3600  # pending jobs older than this are marked failed
+    export_segment_max_age_days: int = 30  # cached month segments unused this long are deleted
+
     @property
     def allowed_origins(self) -> list[str]:
         return [origin.strip() for origin in self.allowed_origins_str.split(',')]
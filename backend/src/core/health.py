@@ -0,0 +1,176 @@
+"""Liveness and readiness checks.
+
+Liveness only says the process is serving requests. Readiness decides
+whether a replica should receive traffic. It is ready when all of these hold:
+
+* a ``SELECT 1`` ping answers within ``READINESS_DB_TIMEOUT_SECONDS``;
+* the connection pool has a free connection, i.e. the checked-out share
+  of pool size plus overflow is below ``READINESS_MAX_POOL_UTILIZATION``;
+* event-loop lag stays below ``READINESS_MAX_LOOP_LAG_SECONDS``.
+
+Probes come from every kubelet and load balancer, so the result is reused
+for ``READINESS_CACHE_SECONDS``. At most one ping runs at a time; a ping
+that hangs past the timeout keeps running while later checks report it as
+pending instead of starting another. A saturated pool is not pinged at
+all, since the ping would only queue behind the requests already waiting.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from . import metrics
+from .config import settings
+
+LOOP_LAG = "event_loop.lag_seconds"
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up, i.e. how long callbacks wait for the event loop"""
+
+    def __init__(self, interval: float, window: int = 10):
+        self.interval = interval
+        self._recent = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+    def record(self, lag: float) -> None:
+        self._recent.append(lag)
+        metrics.summary(LOOP_LAG).observe(lag)
+
+    def recent_max(self) -> Optional[float]:
+        """Worst lag over the last few intervals, or None before the first measurement"""
+        return max(self._recent) if self._recent else None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def pool_stats(pool) -> dict:
+    """Checkout, overflow and wait figures of a connection pool"""
+    waits = metrics.summary("db.pool.wait_seconds").snapshot()
+    stats = {
+        "pool_class": type(pool).__name__,
+        "wait_p95_seconds": waits["p95"],
+        "wait_max_seconds": waits["max"],
+        "timeouts": metrics.counter("db.pool.timeouts"),
+    }
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + settings.db_max_overflow
+        checked_out = pool.checkedout()
+        stats.update(
+            size=pool.size(),
+            checked_out=checked_out,
+            overflow=max(0, pool.overflow()),
+            max_overflow=settings.db_max_overflow,
+            waiting=getattr(pool, "waiting", 0),
+            utilization=checked_out / capacity if capacity else 0.0,
+        )
+    return stats
+
+
+def _ping(engine: Engine) -> float:
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return time.perf_counter() - started
+
+
+class ReadinessCheck:
+    def __init__(self, engine: Engine, loop_monitor: LoopLagMonitor):
+        self._engine = engine
+        self._loop_monitor = loop_monitor
+        self._lock = asyncio.Lock()
+        self._ping: Optional[asyncio.Future] = None
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+
+    async def check(self) -> dict:
+        """The latest readiness report, re-evaluated at most once per cache window"""
+        async with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= settings.readiness_cache_seconds:
+                self._result = await self._evaluate()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    async def _ping_database(self) -> dict:
+        if self._ping is not None and not self._ping.done():
+            return {"ok": False, "latency_ms": None, "error": "previous ping still pending"}
+        self._ping = asyncio.ensure_future(run_in_threadpool(_ping, self._engine))
+        try:
+            latency = await asyncio.wait_for(asyncio.shield(self._ping), settings.readiness_db_timeout_seconds)
+        except asyncio.TimeoutError:
+            return {"ok": False, "latency_ms": None, "error": "ping timed out"}
+        except Exception as e:
+            return {"ok": False, "latency_ms": None, "error": type(e).__name__}
+        metrics.summary("db.ping_seconds").observe(latency)
+        return {"ok": True, "latency_ms": round(latency * 1000, 3), "error": None}
+
+    async def _evaluate(self) -> dict:
+        reasons = []
+        pool = pool_stats(self._engine.pool)
+        saturated = pool.get("utilization", 0.0) >= settings.readiness_max_pool_utilization
+        if saturated:
+            reasons.append("connection pool saturated")
+            database = {"ok": None, "latency_ms": None, "error": "skipped while the pool is saturated"}
+        else:
+            database = await self._ping_database()
+            if not database["ok"]:
+                reasons.append(f"database: {database['error']}")
+
+        lag = self._loop_monitor.recent_max()
+        if lag is not None and lag > settings.readiness_max_loop_lag_seconds:
+            reasons.append("event loop lagging")
+
+        return {
+            "status": "not_ready" if reasons else "ready",
+            "reasons": reasons,
+            "checked_at": datetime.now(timezone.utc),
+            "database": database,
+            "pool": pool,
+            "event_loop": {"lag_seconds": lag, "max_lag_seconds": settings.readiness_max_loop_lag_seconds},
+        }
+
+
+_loop_monitor: Optional[LoopLagMonitor] = None
+_readiness: Optional[ReadinessCheck] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor(settings.loop_lag_interval_seconds)
+    return _loop_monitor
+
+
+def get_readiness() -> ReadinessCheck:
+    """Dependency returning the process-wide readiness check"""
+    global _readiness
+    if _readiness is None:
+        from .database import engine
+
+        _readiness = ReadinessCheck(engine, get_loop_monitor())
+    return _readiness
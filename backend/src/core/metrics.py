@@ -0,0 +1,74 @@
+"""In-process metrics.
+
+A `Summary` keeps a running count, total and maximum plus a window of recent
+samples for percentiles; a counter is a plain running total. Metrics are per
+process; each replica reports its own through ``GET /admin/metrics``.
+"""
+import threading
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+
+class Summary:
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._recent.append(value)
+            self.count += 1
+            self.total += value
+            self.maximum = max(self.maximum, value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = np.array(self._recent, dtype=float)
+            count, total, maximum = self.count, self.total, self.maximum
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99)) if len(recent) else (0.0, 0.0, 0.0)
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+        }
+
+
+_summaries: Dict[str, Summary] = {}
+_counters: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def summary(name: str) -> Summary:
+    """Get or create the named summary"""
+    with _lock:
+        if name not in _summaries:
+            _summaries[name] = Summary()
+        return _summaries[name]
+
+
+def increment(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def counter(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot() -> dict:
+    with _lock:
+        summaries = dict(_summaries)
+        counters = dict(_counters)
+    return {
+        "summaries": {name: item.snapshot() for name, item in sorted(summaries.items())},
+        "counters": dict(sorted(counters.items())),
+    }
@@ -0,0 +1,238 @@
+"""In-app scheduler for periodic maintenance jobs.
+
+Started from the application lifespan when ``SCHEDULER_ENABLED`` is set.
+Every replica runs the same schedule; the replicas agree on who runs a given
+tick in two steps:
+
+1. A Postgres advisory lock per job (``pg_try_advisory_lock``) makes
+   concurrent attempts skip instead of wait.
+2. Under that lock, ``scheduled_job_runs`` records the tick each job last
+   ran for, so a replica that gets the lock after the winner finished still
+   sees the tick is done.
+
+Interval ticks are aligned to the epoch and cron expressions are evaluated in
+the station time zone, so every replica computes the same ticks. Each run
+starts after a random jitter to spread replicas and jobs apart. On other
+databases (SQLite in development and tests) there is no advisory lock and
+the run table alone deduplicates.
+
+Durations and failures are recorded as ``scheduler.<job>.seconds`` and
+``scheduler.<job>.failures`` metrics.
+"""
+import asyncio
+import logging
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import metrics
+from .config import settings
+from ..models.job_model import ScheduledJobRun
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Fields accept ``*``, numbers, ranges (``1-5``), lists (``1,15``) and steps
+    (``*/10``, ``0-30/5``). Day of week runs 0-6 from Sunday. As in cron, when
+    both day fields are restricted a day matching either one qualifies.
+    """
+
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression: str, zone_name: Optional[str] = None):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.expression = expression
+        self._zone_name = zone_name
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(value, low, high) for value, (low, high) in zip(fields, self._RANGES)
+        )
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(value: str, low: int, high: int) -> frozenset:
+        result = set()
+        for part in value.split(","):
+            base, _, step = part.partition("/")
+            if base == "*":
+                start, end = low, high
+            elif "-" in base:
+                start, end = (int(bound) for bound in base.split("-"))
+            else:
+                start = end = int(base)
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field '{value}' outside {low}-{high}")
+            result.update(range(start, end + 1, int(step) if step else 1))
+        return frozenset(result)
+
+    def _day_matches(self, day: datetime) -> bool:
+        day_ok = day.day in self.days
+        weekday_ok = (day.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment`, as aware UTC"""
+        from ..services.station_time import station_zone
+
+        zone = station_zone(self._zone_name or settings.station_timezone)
+        local = _utc(moment).astimezone(zone).replace(second=0, microsecond=0, tzinfo=None) + timedelta(minutes=1)
+        limit = local + timedelta(days=366 * 5)
+        while local < limit:
+            if local.month not in self.months:
+                year, month = divmod(local.month, 12)
+                local = datetime(local.year + year, month + 1, 1)
+            elif not self._day_matches(local):
+                local = datetime(local.year, local.month, local.day) + timedelta(days=1)
+            elif local.hour not in self.hours:
+                local = datetime(local.year, local.month, local.day, local.hour) + timedelta(hours=1)
+            elif local.minute not in self.minutes:
+                local += timedelta(minutes=1)
+            else:
+                return local.replace(tzinfo=zone).astimezone(timezone.utc)
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+class IntervalSchedule:
+    """Every `seconds`, on ticks aligned to the epoch"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        elapsed = (_utc(moment) - _EPOCH).total_seconds()
+        return _EPOCH + timedelta(seconds=(elapsed // self.seconds + 1) * self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[Session], object]
+    schedule: object  # CronSchedule or IntervalSchedule
+    jitter: float = 0.0  # maximum random delay in seconds
+    next_run_at: Optional[datetime] = field(default=None, compare=False)
+
+    @property
+    def lock_key(self) -> int:
+        # Signed 64-bit key for pg_try_advisory_lock, stable across processes
+        return zlib.crc32(f"scheduler:{self.name}".encode()) - 2 ** 31
+
+
+class Scheduler:
+    def __init__(self, session_factory: Callable[[], Session], jobs: List[Job]):
+        self._session_factory = session_factory
+        self.jobs = list(jobs)
+        self._task: Optional[asyncio.Task] = None
+
+    def _claim(self, db: Session, job: Job, scheduled_for: datetime) -> Optional[ScheduledJobRun]:
+        run = db.get(ScheduledJobRun, job.name)
+        if run is not None and run.scheduled_for is not None and _utc(run.scheduled_for) >= scheduled_for:
+            return None
+        if run is None:
+            run = ScheduledJobRun(name=job.name, failure_count=0)
+            db.add(run)
+        run.scheduled_for = scheduled_for
+        run.started_at = datetime.now(timezone.utc)
+        run.finished_at = None
+        run.status = "running"
+        run.error = None
+        db.commit()
+        return run
+
+    def run_job(self, job: Job, scheduled_for: datetime) -> str:
+        """Run one tick of a job unless another replica has it; returns the outcome"""
+        scheduled_for = _utc(scheduled_for)
+        lock = self._session_factory()
+        try:
+            postgres = lock.get_bind().dialect.name == "postgresql"
+            if postgres and not lock.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}).scalar():
+                return "skipped"
+            try:
+                with self._session_factory() as db:
+                    run = self._claim(db, job, scheduled_for)
+                    if run is None:
+                        return "skipped"
+
+                    started = time.perf_counter()
+                    try:
+                        job.func(db)
+                        db.commit()
+                        run.status = "succeeded"
+                    except Exception as e:
+                        db.rollback()
+                        logger.exception("scheduled job %s failed", job.name)
+                        metrics.increment(f"scheduler.{job.name}.failures")
+                        run = db.get(ScheduledJobRun, job.name)
+                        run.status = "failed"
+                        run.error = f"{type(e).__name__}: {e}"[:2000]
+                        run.failure_count = (run.failure_count or 0) + 1
+                    duration = time.perf_counter() - started
+                    metrics.summary(f"scheduler.{job.name}.seconds").observe(duration)
+                    run.duration_seconds = duration
+                    run.finished_at = datetime.now(timezone.utc)
+                    db.commit()
+                    return run.status
+            finally:
+                if postgres:
+                    lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+                    lock.commit()
+        finally:
+            lock.close()
+
+    async def _loop(self) -> None:
+        now = datetime.now(timezone.utc)
+        for job in self.jobs:
+            job.next_run_at = job.schedule.next_after(now)
+        while True:
+            job = min(self.jobs, key=lambda item: item.next_run_at)
+            scheduled_for = job.next_run_at
+            delay = (scheduled_for - datetime.now(timezone.utc)).total_seconds() + random.uniform(0, job.jitter)
+            await asyncio.sleep(max(0.0, delay))
+            try:
+                await run_in_threadpool(self.run_job, job, scheduled_for)
+            except Exception:
+                # Database unreachable and the like; the next tick tries again
+                logger.exception("scheduler could not run %s", job.name)
+                metrics.increment(f"scheduler.{job.name}.failures")
+            job.next_run_at = job.schedule.next_after(max(scheduled_for, datetime.now(timezone.utc)))
+
+    def start(self) -> None:
+        if self.jobs and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,158 @@
+"""Slow-query log.
+
+Engine event hooks time every statement. Statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` are recorded with the route that issued them, a
+redacted copy of their parameters and the duration. Records go to a bounded
+in-process ring buffer (``SLOW_QUERY_BUFFER_SIZE``, read at
+``GET /admin/slow-queries``) and to the ``src.core.slow_queries`` logger,
+with the record attached as ``extra={"slow_query": ...}`` for JSON log
+formatters.
+
+On Postgres a share of slow SELECTs (``SLOW_QUERY_EXPLAIN_SAMPLE_RATE``) is
+explained with a plain ``EXPLAIN``, in the same transaction and inside a
+savepoint so a failing EXPLAIN cannot abort it. The plan carries estimates
+only: ANALYZE would run the query again, and a SELECT can have side effects
+of its own (``pg_try_advisory_lock``, ``nextval``, ``FOR UPDATE``).
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import metrics
+from .config import settings
+from ..middleware.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+_MAX_STATEMENT_CHARS = 4000
+_KEPT_TYPES = (bool, int, float, Decimal, datetime, date, type(None))
+
+
+def redact(value):
+    """Keep numbers, times and NULLs; replace text and binary values by their type and length"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, _KEPT_TYPES):
+        return value.isoformat() if isinstance(value, (datetime, date)) else value
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _redacted_parameters(parameters, executemany: bool):
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": redact(rows[0]) if rows else None}
+    return redact(parameters)
+
+
+class SlowQueryLog:
+    def __init__(self, size: int):
+        self._records = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        """Newest first"""
+        with self._lock:
+            records = list(reversed(self._records))
+        return records[:limit] if limit is not None else records
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+_log = SlowQueryLog(settings.slow_query_buffer_size)
+
+
+def get_log() -> SlowQueryLog:
+    return _log
+
+
+def _explain(connection, cursor, statement: str, parameters) -> Optional[list]:
+    raw = connection.connection.dbapi_connection
+    explain_cursor = raw.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = explain_cursor.fetchone()[0]
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        return plan if isinstance(plan, list) else json.loads(plan)
+    except Exception:
+        logger.warning("could not explain slow query", exc_info=True)
+        return None
+    finally:
+        explain_cursor.close()
+
+
+def _should_explain(connection, statement: str, executemany: bool) -> bool:
+    rate = settings.slow_query_explain_sample_rate
+    if rate <= 0 or executemany or connection.dialect.name != "postgresql":
+        return False
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    return random.random() < rate
+
+
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    connection.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    started = connection.info["slow_query_started"].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.slow_query_threshold_ms:
+        return
+
+    record = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "route": current_route(),
+        "duration_ms": round(duration_ms, 3),
+        "statement": statement[:_MAX_STATEMENT_CHARS],
+        "parameters": _redacted_parameters(parameters, executemany),
+        "executemany": executemany,
+        "plan": None,
+    }
+    if _should_explain(connection, statement, executemany):
+        record["plan"] = _explain(connection, cursor, statement, parameters)
+    metrics.increment("db.slow_queries")
+    _log.add(record)
+    logger.warning(
+        "slow query: %.1f ms on %s", duration_ms, record["route"] or "background work",
+        extra={"slow_query": record},
+    )
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    started = exception_context.connection.info.get("slow_query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def install(engine: Engine) -> None:
+    """Time every statement run through `engine`; installing twice is a no-op"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,207 @@
+"""Admission control: refuse work early instead of letting it queue on the database pool.
+
+Every request falls into a route class: ``heavy`` for exports and imports,
+``default`` for the rest; health probes and CORS preflights are exempt.
+Before the route runs, in this order:
+
+* while a pool checkout has been waiting longer than
+  ``ADMISSION_MAX_POOL_WAIT_SECONDS``, requests are shed with 503;
+* each class caps the requests in flight in this process (503), since
+  each process has its own pool;
+* each class has a token bucket per caller (429) - the user id from the
+  access token, else a digest of any other bearer token (sensor devices),
+  else the client address.
+
+Refusals carry ``Retry-After``. Buckets live in this process unless
+``ADMISSION_SHARED`` is set; then they are counted in the shared cache
+(``CACHE_URL``) so replicas draw on one budget per user. The shared
+counters are fixed windows of ``burst / rate`` seconds holding ``burst``
+requests, which allows the same average rate as the bucket but bursts at
+window edges. If the shared cache fails, requests are admitted.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from ..core import metrics
+from ..core.cache import CacheBackend, get_cache
+from ..core.config import settings
+from ..core.database import engine
+from ..core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+HEAVY = "heavy"
+DEFAULT = "default"
+
+# (method, path) of the routes that read or write in bulk
+_HEAVY_ROUTES = {
+    ("GET", "/observations/export/csv"),
+    ("POST", "/observations/export/jobs"),
+    ("POST", "/ingest/readings"),
+}
+# Health probes, including the legacy bare /health
+_EXEMPT_PATHS = {"/health"}
+_EXEMPT_PREFIXES = ("/health/",)
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    rate: float  # tokens per second
+    burst: int
+    max_concurrent: int
+
+
+class TokenBuckets:
+    """In-process token buckets, least recently used dropped beyond `max_keys`"""
+
+    def __init__(self, max_keys: int = 10000):
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token; returns 0 when there was one, else the seconds until there is"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1 if tokens >= 1 else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SharedBuckets:
+    """Fixed-window counters in the shared cache, standing in for token buckets across replicas"""
+
+    def __init__(self, backend: CacheBackend, prefix: str = "wm:admission"):
+        self._backend = backend
+        self._prefix = prefix
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        window = burst / rate
+        now = time.time()
+        index = int(now // window)
+        try:
+            count = self._backend.incr(f"{self._prefix}:{key}:{index}", ttl=window * 2)
+        except Exception:
+            logger.warning("shared admission counter failed; admitting", exc_info=True)
+            return 0.0
+        return 0.0 if count <= burst else (index + 1) * window - now
+
+
+def _pool_wait() -> float:
+    longest_wait = getattr(engine.pool, "longest_wait", None)
+    return longest_wait() if longest_wait else 0.0
+
+
+class Admission:
+    def __init__(self, buckets, pool_wait: Callable[[], float] = _pool_wait):
+        self.buckets = buckets
+        self.pool_wait = pool_wait
+        self.classes = {
+            DEFAULT: RouteClass(
+                DEFAULT, settings.admission_rate_per_second, settings.admission_burst, settings.admission_max_concurrent
+            ),
+            HEAVY: RouteClass(
+                HEAVY, settings.admission_heavy_rate_per_second, settings.admission_heavy_burst,
+                settings.admission_heavy_max_concurrent
+            ),
+        }
+        self.active = {name: 0 for name in self.classes}
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        """Route class of a request, or None when it is exempt"""
+        if method == "OPTIONS" or path in _EXEMPT_PATHS or path.startswith(_EXEMPT_PREFIXES):
+            return None
+        return self.classes[HEAVY if (method, path.rstrip("/")) in _HEAVY_ROUTES else DEFAULT]
+
+    def admit(self, route_class: RouteClass, caller: str) -> Optional[Tuple[int, str, int]]:
+        """None to admit the request, else (status, reason, Retry-After seconds); the caller must `release` admitted ones"""
+        if self.pool_wait() > settings.admission_max_pool_wait_seconds:
+            metrics.increment("admission.shed.pool_wait")
+            return 503, "Database is overloaded, retry later", settings.admission_retry_after_seconds
+        if self.active[route_class.name] >= route_class.max_concurrent:
+            metrics.increment(f"admission.shed.{route_class.name}.concurrency")
+            return 503, "Too many requests in progress, retry later", settings.admission_retry_after_seconds
+        wait = self.buckets.take(f"{route_class.name}:{caller}", route_class.rate, route_class.burst)
+        if wait > 0:
+            metrics.increment(f"admission.limited.{route_class.name}")
+            return 429, "Rate limit exceeded", max(1, math.ceil(wait))
+        self.active[route_class.name] += 1
+        return None
+
+    def release(self, route_class: RouteClass) -> None:
+        self.active[route_class.name] -= 1
+
+
+def _caller(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                user_id = verify_token(token)
+                if user_id is not None:
+                    return f"user:{user_id}"
+                return "token:" + hashlib.sha256(token.encode()).hexdigest()[:16]
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+
+class AdmissionMiddleware:
+    """Plain ASGI middleware, so refused requests never reach routing or the database"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+        admission = get_admission()
+        route_class = admission.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        refusal = admission.admit(route_class, _caller(scope))
+        if refusal is not None:
+            status_code, detail, retry_after = refusal
+            response = JSONResponse({"detail": detail}, status_code, headers={"Retry-After": str(retry_after)})
+            await response(scope, receive, send)
+            return
+        try:
+            # Held until the body is sent, so streamed exports count while they stream
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(route_class)
+
+
+_admission: Optional[Admission] = None
+_lock = threading.Lock()
+
+
+def get_admission() -> Admission:
+    global _admission
+    with _lock:
+        if _admission is None:
+            buckets = SharedBuckets(get_cache().backend) if settings.admission_shared else TokenBuckets()
+            _admission = Admission(buckets)
+        return _admission
+
+
+def reset() -> None:
+    """Forget buckets and settings, e.g. between tests"""
+    global _admission
+    with _lock:
+        _admission = None
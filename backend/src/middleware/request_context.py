@@ -0,0 +1,36 @@
+"""Request context visible to code running below the route, e.g. engine event hooks.
+
+Plain ASGI middleware, so the scope it stores is the same dict the router
+later fills in with the matched route; the route template is therefore
+known by the time any statement runs. Sync endpoints run in a thread pool
+that copies context variables, so they see it too.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _scope.reset(token)
+
+
+def current_route() -> Optional[str]:
+    """"METHOD /route/{template}" of the request being served, or None outside requests"""
+    scope = _scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
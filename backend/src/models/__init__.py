@@ -1,4 +1,29 @@
 from .user_model import User
+from .station_model import Station
 from .observation_model import Observation
+from .archive_model import ArchiveSegment
+from .evaporation_model import EvaporationInterval, DailyEvaporation
+from .climatology_model import ClimatologyBaseline
+from .job_model import ScheduledJobRun
+from .export_model import ExportJob, ExportMonthVersion
+from .sensor_model import Device, SensorReading
+from .sync_model import ChangeSequence, ObservationTombstone
+from .quality_model import QCFlag
 
-__all__ = ["User", "Observation"]
\ No newline at end of file
+__all__ = [
+    "User",
+    "Station",
+    "Observation",
+    "ArchiveSegment",
+    "EvaporationInterval",
+    "DailyEvaporation",
+    "ClimatologyBaseline",
+    "ScheduledJobRun",
+    "ExportJob",
+    "ExportMonthVersion",
+    "Device",
+    "SensorReading",
+    "ChangeSequence",
+    "ObservationTombstone",
+    "QCFlag"
+]
\ No newline at end of file
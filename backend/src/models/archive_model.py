@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class ArchiveSegment(Base):
+    """Immutable, compressed block of archived observations for one month"""
+    __tablename__ = "observation_archive_segments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String(7), nullable=False, index=True)  # YYYY-MM
+
+    # Time range covered by the rows inside the segment
+    range_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    range_end = Column(DateTime(timezone=True), nullable=False, index=True)
+    row_count = Column(Integer, nullable=False)
+
+    # gzip-compressed JSON lines, one observation per line
+    payload = Column(LargeBinary, nullable=False)
+    checksum = Column(String(64), nullable=False)  # sha256 of payload
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
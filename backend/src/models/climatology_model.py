@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class ClimatologyBaseline(Base):
+    """Precomputed statistics for one variable on one day of the year at one station"""
+    __tablename__ = "climatology_baselines"
+
+    station_id = Column(Integer, ForeignKey("stations.id"), primary_key=True)
+    variable = Column(String(32), primary_key=True)  # temperature | precipitation
+    day_of_year = Column(Integer, primary_key=True)  # 1-366 on a leap-year calendar
+
+    sample_count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=True)
+    minimum = Column(Float, nullable=True)
+    maximum = Column(Float, nullable=True)
+    p10 = Column(Float, nullable=True)
+    p25 = Column(Float, nullable=True)
+    p50 = Column(Float, nullable=True)
+    p75 = Column(Float, nullable=True)
+    p90 = Column(Float, nullable=True)
+
+    # Set by observation writes, cleared when the day is recomputed
+    is_stale = Column(Boolean, nullable=False, default=True, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
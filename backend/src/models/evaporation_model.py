@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class EvaporationInterval(Base):
+    """Pan evaporation between two consecutive observations"""
+    __tablename__ = "evaporation_intervals"
+
+    id = Column(Integer, primary_key=True, index=True)
+    station_id = Column(Integer, ForeignKey("stations.id"), nullable=False)
+
+    # Plain ids rather than foreign keys: intervals outlive archival of their observations
+    start_observation_id = Column(Integer, nullable=False, index=True)
+    end_observation_id = Column(Integer, nullable=False, unique=True, index=True)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    day = Column(Date, nullable=False)  # Station-local day of end_time
+
+    start_level = Column(Float, nullable=True)  # 上次觀測後 (清洗/加水/減水後) 水位高 (mm)
+    end_level = Column(Float, nullable=True)  # 本次觀測現蒸發皿水位高 (mm)
+    precipitation = Column(Float, nullable=True)  # 期間降水量 (mm)
+    evaporation = Column(Float, nullable=True)  # 蒸發量 (mm)
+
+    __table_args__ = (
+        Index("ix_evaporation_intervals_station_end_time", "station_id", "end_time"),
+        Index("ix_evaporation_intervals_station_day", "station_id", "day"),
+    )
+
+class DailyEvaporation(Base):
+    """Evaporation per station-local day, summed from the intervals ending that day"""
+    __tablename__ = "daily_evaporation"
+
+    station_id = Column(Integer, ForeignKey("stations.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    evaporation = Column(Float, nullable=True)  # 日蒸發量 (mm)
+    interval_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
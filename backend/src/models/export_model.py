@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class ExportJob(Base):
+    """Background CSV export; the file lives in EXPORT_STORAGE_DIR until it expires"""
+    __tablename__ = "export_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, also the file name
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the normalized request
+    requested_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    station_id = Column(Integer, ForeignKey("stations.id"), nullable=False)
+
+    # Request
+    start_date = Column(DateTime(timezone=True), nullable=True)
+    end_date = Column(DateTime(timezone=True), nullable=True)
+    filters = Column(Text, nullable=True)  # JSON list of field:op[:value] strings
+    fields = Column(Text, nullable=True)  # JSON list of CSV columns; all columns when null
+
+    status = Column(String(16), nullable=False, default="queued")  # queued | running | succeeded | failed
+    error = Column(Text, nullable=True)
+    row_count = Column(Integer, nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    # At most one pending job per request, so identical concurrent requests share it
+    __table_args__ = (
+        Index(
+            "ux_export_jobs_pending_fingerprint", "fingerprint",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+class ExportMonthVersion(Base):
+    """Change counter of one UTC month of a station's observations; cached export segments carry the version they encode"""
+    __tablename__ = "export_month_versions"
+
+    station_id = Column(Integer, primary_key=True, autoincrement=False)  # 0 for the row shared by every station
+    month = Column(String(7), primary_key=True)  # YYYY-MM, or * for every month
+    version = Column(Integer, nullable=False, default=0)
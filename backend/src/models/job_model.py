@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from ..core.database import Base
+
+class ScheduledJobRun(Base):
+    """Latest run of a scheduled maintenance job, shared by every replica"""
+    __tablename__ = "scheduled_job_runs"
+
+    name = Column(String(64), primary_key=True)
+    scheduled_for = Column(DateTime(timezone=True), nullable=True)  # Tick the latest run was for
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    status = Column(String(16), nullable=True)  # running | succeeded | failed
+    error = Column(Text, nullable=True)
+    failure_count = Column(Integer, nullable=False, default=0)
@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Text, Boolean, ForeignKey, Index, event, select, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from ..core.config import settings
 from ..core.database import Base
+from ..services import psychrometrics, search
+from .station_model import Station
 
 class Observation(Base):
     __tablename__ = "observations"
@@ -11,12 +14,22 @@ class Observation(Base):
     # Basic observation info
     observation_time = Column(DateTime(timezone=True), nullable=False, index=True)
     observer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Writes that name no station belong to the default one
+    station_id = Column(
+        Integer, ForeignKey("stations.id"), nullable=False,
+        default=select(Station.id).where(Station.code == settings.default_station_code).scalar_subquery()
+    )
     
     # Core weather measurements  
     temperature = Column(Float, nullable=True)  # 現在溫度 (°C)
     wet_bulb_temperature = Column(Float, nullable=True)  # 濕球溫度 (°C)
     precipitation = Column(Float, nullable=True)  # 降水量 (mm)
     
+    # Derived from temperature and wet bulb temperature, cached for filtering
+    relative_humidity = Column(Float, nullable=True)  # 相對濕度 (%)
+    dew_point = Column(Float, nullable=True)  # 露點溫度 (°C)
+    vapour_pressure = Column(Float, nullable=True)  # 水氣壓 (hPa)
+    
     # Evaporation pan data
     evaporation_pan_temp = Column(Float, nullable=True)  # 蒸發皿水溫 (°C)
     current_evaporation_level = Column(Float, nullable=True)  # 現蒸發皿水位高 (mm)
@@ -52,13 +65,52 @@ class Observation(Base):
     
     # Additional fields
     notes = Column(Text, nullable=True)  # 備註
+    notes_search = Column(Text, nullable=True)  # Tokenized notes backing full-text search
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    change_seq = Column(BigInteger, nullable=True)  # Sequence number of the last write, for GET /observations/changes
     
     # Relationships
     observer = relationship("User", back_populates="observations")
+    
+    # Reads are scoped to one station, so its indexes lead with station_id;
+    # the code indexes skip rows without a code
+    __table_args__ = (
+        Index("ix_observations_station_time", "station_id", "observation_time"),
+        Index(
+            "ix_observations_station_weather_code_time", "station_id", "current_weather_code", "observation_time",
+            postgresql_where=text("current_weather_code IS NOT NULL"),
+            sqlite_where=text("current_weather_code IS NOT NULL"),
+        ),
+        Index("ix_observations_station_total_cloud_time", "station_id", "total_cloud_amount", "observation_time"),
+        Index("ix_observations_station_humidity", "station_id", "relative_humidity"),
+        Index("ix_observations_observer_time", "observer_id", "observation_time"),
+        Index("ix_observations_station_change_seq", "station_id", "change_seq"),
+        Index(
+            "ix_observations_station_low_cloud_type_time", "station_id", "low_cloud_type_code", "observation_time",
+            postgresql_where=text("low_cloud_type_code IS NOT NULL"),
+            sqlite_where=text("low_cloud_type_code IS NOT NULL"),
+        ),
+    )
+
+@event.listens_for(Observation, "before_insert")
+@event.listens_for(Observation, "before_update")
+def _update_derived_columns(mapper, connection, target):
+    """Keep the cached humidity and search columns in step with the readings"""
+    derived = psychrometrics.derive_rows([target.temperature], [target.wet_bulb_temperature])[0]
+    for name, value in derived.items():
+        setattr(target, name, value)
+    target.notes_search = search.search_text(target.notes)
+
+@event.listens_for(Observation.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    search.create_search_structures(connection)
+
+@event.listens_for(Observation.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    search.drop_search_structures(connection)
 
 # Add the relationship to User model
 from .user_model import User
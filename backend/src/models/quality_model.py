@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class QCFlag(Base):
+    """One data-quality rule an observation fails; kept current by writes and by full rescans"""
+    __tablename__ = "qc_flags"
+
+    observation_id = Column(Integer, ForeignKey("observations.id", ondelete="CASCADE"), primary_key=True)
+    rule = Column(String(32), primary_key=True)  # e.g. wet_bulb_above_dry_bulb
+    station_id = Column(Integer, nullable=False)
+    observation_time = Column(DateTime(timezone=True), nullable=False)
+    detail = Column(String, nullable=True)  # Human-readable values that broke the rule
+    flagged_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_qc_flags_station_rule_time", "station_id", "rule", "observation_time"),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class Device(Base):
+    """Automatic weather station sensor that posts readings with its own token"""
+    __tablename__ = "devices"
+
+    id = Column(Integer, primary_key=True, index=True)
+    station_id = Column(Integer, ForeignKey("stations.id"), nullable=False)
+    name = Column(String, nullable=False)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 hex; the token itself is never stored
+    token_prefix = Column(String(12), nullable=False)  # shown in listings to tell tokens apart
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+
+class SensorReading(Base):
+    """One timestamped sensor reading; narrow so minute data stays cheap to insert and scan"""
+    __tablename__ = "sensor_readings"
+
+    # A device reports once per timestamp, so re-sent batches are ignored
+    device_id = Column(Integer, ForeignKey("devices.id", ondelete="CASCADE"), primary_key=True)
+    time = Column(DateTime(timezone=True), primary_key=True)
+    station_id = Column(Integer, ForeignKey("stations.id"), nullable=False)
+
+    temperature = Column(Float, nullable=True)  # 溫度 (°C)
+    relative_humidity = Column(Float, nullable=True)  # 相對濕度 (%)
+    pressure = Column(Float, nullable=True)  # 氣壓 (hPa)
+    precipitation = Column(Float, nullable=True)  # 降水量 (mm) since the previous reading
+
+    __table_args__ = (
+        Index("ix_sensor_readings_station_time", "station_id", "time"),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, event, insert
+from sqlalchemy.sql import func
+from ..core.config import settings
+from ..core.database import Base
+
+class Station(Base):
+    """Observing site; every observation and derived table row belongs to one"""
+    __tablename__ = "stations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(32), unique=True, index=True, nullable=False)  # Short identifier, e.g. "main"
+    name = Column(String, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+@event.listens_for(Station.__table__, "after_create")
+def _create_default_station(target, connection, **kw):
+    # Requests that name no station use this one, so it always exists
+    connection.execute(insert(target).values(code=settings.default_station_code, name="Main station", is_active=True))
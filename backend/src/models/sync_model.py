@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, event, insert
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class ChangeSequence(Base):
+    """Counter handing out change sequence numbers; the row lock orders writers so numbers follow commit order"""
+    __tablename__ = "change_sequences"
+
+    name = Column(String(32), primary_key=True)  # "observations"
+    value = Column(BigInteger, nullable=False, default=0)  # Last number handed out
+    purged_through = Column(BigInteger, nullable=False, default=0)  # Tombstones up to here are gone
+
+class ObservationTombstone(Base):
+    """Record of a deleted observation, so syncing clients learn about the deletion"""
+    __tablename__ = "observation_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    observation_id = Column(Integer, nullable=False)
+    station_id = Column(Integer, nullable=False)
+    observation_time = Column(DateTime(timezone=True), nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_observation_tombstones_station_change_seq", "station_id", "change_seq"),
+    )
+
+@event.listens_for(ChangeSequence.__table__, "after_create")
+def _create_observation_sequence(target, connection, **kw):
+    connection.execute(insert(target).values(name="observations", value=0, purged_through=0))
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from ..core.database import Base
 
 class User(Base):
@@ -16,5 +17,17 @@ class User(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     # Add password field for admin users
     password_hash = Column(String, nullable=True)  # Only used for admin login
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    # Set in Python as well so SQLite stores one format; the directory pages by comparing it
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Counters maintained on observation writes and logins for the admin directory
+    observation_count = Column(Integer, default=0, server_default="0", nullable=False)
+    first_observation_at = Column(DateTime(timezone=True), nullable=True)
+    last_observation_at = Column(DateTime(timezone=True), nullable=True)
+    last_login_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Keyset pagination order of the user directory
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -7,6 +7,18 @@ from .observation_schemas import (
     ObservationSummary,
     DashboardData
 )
+from .archive_schemas import ArchiveSegmentResponse, ArchiveRunResult
+from .evaporation_schemas import EvaporationIntervalResponse, DailyEvaporationResponse
+from .climatology_schemas import ClimatologyDay, ClimatologyRanking, ClimatologyResponse
+from .series_schemas import SeriesResponse
+from .admin_schemas import MetricSummary, MetricsSnapshot, SlowQuery, ScheduledJobStatus
+from .export_schemas import ExportJobCreate, ExportJobResponse
+from .station_schemas import StationCreate, StationUpdate, StationResponse
+from .health_schemas import DatabaseCheck, PoolStats, EventLoopCheck, ReadinessReport
+from .ingest_schemas import DeviceCreate, DeviceUpdate, DeviceResponse, DeviceCreated, IngestResult, SensorSnapshot
+from .sync_schemas import DeletedObservation, ObservationChanges
+from .quality_schemas import QCFlagResponse, QCScanResult
+from .coverage_schemas import CoverageDay, CoverageObserver, CoverageResponse, ObserverSlots
 
 __all__ = [
     "UserBase", 
@@ -19,5 +31,40 @@ __all__ = [
     "ObservationUpdate", 
     "ObservationResponse", 
     "ObservationSummary",
-    "DashboardData"
+    "DashboardData",
+    "ArchiveSegmentResponse",
+    "ArchiveRunResult",
+    "EvaporationIntervalResponse",
+    "DailyEvaporationResponse",
+    "ClimatologyDay",
+    "ClimatologyRanking",
+    "ClimatologyResponse",
+    "SeriesResponse",
+    "MetricSummary",
+    "MetricsSnapshot",
+    "SlowQuery",
+    "ScheduledJobStatus",
+    "ExportJobCreate",
+    "ExportJobResponse",
+    "StationCreate",
+    "StationUpdate",
+    "StationResponse",
+    "DatabaseCheck",
+    "PoolStats",
+    "EventLoopCheck",
+    "ReadinessReport",
+    "DeviceCreate",
+    "DeviceUpdate",
+    "DeviceResponse",
+    "DeviceCreated",
+    "IngestResult",
+    "SensorSnapshot",
+    "DeletedObservation",
+    "ObservationChanges",
+    "QCFlagResponse",
+    "QCScanResult",
+    "CoverageDay",
+    "CoverageObserver",
+    "CoverageResponse",
+    "ObserverSlots"
 ]
\ No newline at end of file
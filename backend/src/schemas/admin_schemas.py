@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+class MetricSummary(BaseModel):
+    count: int
+    mean: float
+    max: float
+    p50: float
+    p95: float
+    p99: float
+
+class MetricsSnapshot(BaseModel):
+    summaries: Dict[str, MetricSummary]
+    counters: Dict[str, int]
+
+class SlowQuery(BaseModel):
+    recorded_at: datetime
+    route: Optional[str] = None  # None for work outside a request, e.g. scheduled jobs
+    duration_ms: float
+    statement: str
+    parameters: Any = None  # text values replaced by their type and length
+    executemany: bool = False
+    plan: Optional[List[Any]] = None  # EXPLAIN output when sampled
+
+class ScheduledJobStatus(BaseModel):
+    name: str
+    schedule: str
+    next_run_at: Optional[datetime] = None
+    last_scheduled_for: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    failure_count: int = 0
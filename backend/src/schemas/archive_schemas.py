@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class ArchiveSegmentResponse(BaseModel):
+    id: int
+    month: str
+    range_start: datetime
+    range_end: datetime
+    row_count: int
+    checksum: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ArchiveRunResult(BaseModel):
+    cutoff: datetime
+    segments_created: int
+    observations_archived: int
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+class ClimatologyDay(BaseModel):
+    variable: str
+    day_of_year: int
+    month: int
+    day: int
+    sample_count: int
+    mean: Optional[float] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    p10: Optional[float] = None
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
+
+class ClimatologyRanking(BaseModel):
+    observation_time: datetime
+    day_of_year: int
+    temperature: Optional[float] = None
+    temperature_percentile: Optional[float] = Field(None, description="Percentile of the latest temperature for this day of year")
+    precipitation_24h: Optional[float] = None
+    precipitation_percentile: Optional[float] = Field(None, description="Percentile of the 24h precipitation among daily totals for this day of year")
+
+class ClimatologyResponse(BaseModel):
+    days: List[ClimatologyDay]
+    latest: Optional[ClimatologyRanking] = None
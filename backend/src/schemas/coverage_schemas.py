@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+class ObserverSlots(BaseModel):
+    observer_id: int
+    mask: int  # Bit i set: this observer covered slot i
+
+class CoverageDay(BaseModel):
+    date: date
+    mask: int  # Bit i set: slot i was observed
+    observers: List[ObserverSlots]
+
+class CoverageObserver(BaseModel):
+    observer_id: int
+    observer_name: Optional[str] = None
+    slots: int  # Slots covered in the range
+
+class CoverageResponse(BaseModel):
+    start_date: date
+    end_date: date
+    slots: List[str]  # Local times, in bit order
+    tolerance_minutes: int
+    expected: int
+    observed: int
+    days: List[CoverageDay]
+    observers: List[CoverageObserver]
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Optional
+
+class EvaporationIntervalResponse(BaseModel):
+    start_observation_id: int
+    end_observation_id: int
+    start_time: datetime
+    end_time: datetime
+    day: date
+    start_level: Optional[float] = Field(None, description="起始水位高 (mm)")
+    end_level: Optional[float] = Field(None, description="結束水位高 (mm)")
+    precipitation: Optional[float] = Field(None, description="期間降水量 (mm)")
+    evaporation: Optional[float] = Field(None, description="蒸發量 (mm)")
+
+    class Config:
+        from_attributes = True
+
+class DailyEvaporationResponse(BaseModel):
+    day: date
+    evaporation: Optional[float] = Field(None, description="日蒸發量 (mm)")
+    interval_count: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+class ExportJobCreate(BaseModel):
+    station_id: Optional[int] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    filters: List[str] = Field(default_factory=list, description="Column filters as field:op[:value]")
+    fields: Optional[List[str]] = Field(None, description="CSV columns to include; all when omitted")
+
+class ExportJobResponse(BaseModel):
+    id: str
+    status: str
+    station_id: int
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    filters: List[str] = []
+    fields: Optional[List[str]] = None
+    row_count: Optional[int] = None
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None
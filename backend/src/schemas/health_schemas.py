@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class DatabaseCheck(BaseModel):
+    ok: Optional[bool] = None  # None when the ping was skipped
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+class PoolStats(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    waiting: Optional[int] = None
+    utilization: Optional[float] = None
+    wait_p95_seconds: float
+    wait_max_seconds: float
+    timeouts: int
+
+class EventLoopCheck(BaseModel):
+    lag_seconds: Optional[float] = None
+    max_lag_seconds: float
+
+class ReadinessReport(BaseModel):
+    status: str  # ready | not_ready
+    reasons: List[str]
+    checked_at: datetime
+    database: DatabaseCheck
+    pool: PoolStats
+    event_loop: EventLoopCheck
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class DeviceCreate(BaseModel):
+    station_id: Optional[int] = None
+    name: str = Field(..., min_length=1)
+
+class DeviceUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    is_active: Optional[bool] = None
+
+class DeviceResponse(BaseModel):
+    id: int
+    station_id: int
+    name: str
+    token_prefix: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+    last_seen_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class DeviceCreated(DeviceResponse):
+    token: str  # Shown once; only its hash is stored
+
+class IngestResult(BaseModel):
+    received: int
+    accepted: int  # New readings; re-sent device/time pairs are skipped
+
+class SensorSnapshot(BaseModel):
+    time: datetime
+    temperature: Optional[float] = None
+    relative_humidity: Optional[float] = None
+    pressure: Optional[float] = None
+    precipitation_24h: Optional[float] = None
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
+from .ingest_schemas import SensorSnapshot
 
 class ObservationBase(BaseModel):
     observation_time: datetime
@@ -40,7 +41,7 @@ class ObservationBase(BaseModel):
     notes: Optional[str] = Field(None, description="備註")
 
 class ObservationCreate(ObservationBase):
-    pass
+    station_id: Optional[int] = Field(None, description="Station observed at; the default station when omitted")
 
 class ObservationUpdate(BaseModel):
     observation_time: Optional[datetime] = None
@@ -82,7 +83,13 @@ class ObservationUpdate(BaseModel):
 class ObservationResponse(ObservationBase):
     id: int
     observer_id: int
+    station_id: int
     observer_name: Optional[str] = None
+    relative_humidity: Optional[float] = Field(None, description="相對濕度 (%)")
+    dew_point: Optional[float] = Field(None, description="露點溫度 (°C)")
+    vapour_pressure: Optional[float] = Field(None, description="水氣壓 (hPa)")
+    search_rank: Optional[float] = Field(None, description="Relevance when searching with q")
+    search_snippet: Optional[str] = Field(None, description="Notes excerpt with matches wrapped in <mark>")
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -96,6 +103,7 @@ class ObservationSummary(BaseModel):
     wet_bulb_temperature: Optional[float] = None
     precipitation: Optional[float] = None
     observer_id: int
+    station_id: int
     
     class Config:
         from_attributes = True
@@ -104,10 +112,21 @@ class DashboardData(BaseModel):
     observation_time: datetime
     temperature: Optional[float] = None
     wet_bulb_temperature: Optional[float] = None
+    precipitation_1h: Optional[float] = None  # Precipitation sums over the windows ending at observation_time
+    precipitation_3h: Optional[float] = None
+    precipitation_6h: Optional[float] = None
     precipitation_24h: Optional[float] = None  # Calculated 24-hour precipitation
+    precipitation_7d: Optional[float] = None
+    temperature_min_24h: Optional[float] = None
+    temperature_max_24h: Optional[float] = None
+    temperature_change_24h: Optional[float] = None  # Against the reading at the same hour yesterday
+    relative_humidity: Optional[float] = None
+    dew_point: Optional[float] = None
+    vapour_pressure: Optional[float] = None
     current_evaporation_level: Optional[float] = None
     evaporation_pan_temp: Optional[float] = None
     observer_name: Optional[str] = None
+    sensor: Optional[SensorSnapshot] = None  # Latest automatic reading of the station
     
     class Config:
         from_attributes = True
\ No newline at end of file
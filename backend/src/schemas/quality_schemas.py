@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, Optional
+
+class QCFlagResponse(BaseModel):
+    observation_id: int
+    rule: str
+    station_id: int
+    observation_time: datetime
+    detail: Optional[str] = None
+    flagged_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class QCScanResult(BaseModel):
+    scanned: int
+    flagged: Dict[str, int]  # Observations failing each rule
+    duration_seconds: float
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class SeriesResponse(BaseModel):
+    field: str
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    source_points: int  # Points in the range before downsampling
+    times: List[datetime]
+    values: List[float]
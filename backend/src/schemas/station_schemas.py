@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class StationCreate(BaseModel):
+    code: str = Field(..., min_length=1, max_length=32, pattern=r"^[A-Za-z0-9_-]+$")
+    name: str = Field(..., min_length=1)
+
+class StationUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    is_active: Optional[bool] = None
+
+class StationResponse(BaseModel):
+    id: int
+    code: str
+    name: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+from .observation_schemas import ObservationResponse
+
+class DeletedObservation(BaseModel):
+    id: int
+    station_id: int
+    observation_time: datetime
+    deleted_at: datetime
+
+class ObservationChanges(BaseModel):
+    changed: List[ObservationResponse]  # Created or updated since the token, oldest change first
+    deleted: List[DeletedObservation]
+    next_token: str  # Pass as `since` on the next call
+    has_more: bool  # Call again right away with next_token
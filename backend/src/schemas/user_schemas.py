@@ -41,6 +41,12 @@ class UserSummary(BaseModel):
     display_name: Optional[str] = None
     google_name: str
     is_admin: bool
+    is_active: bool = True
+    created_at: Optional[datetime] = None
+    observation_count: int = 0
+    first_observation_at: Optional[datetime] = None
+    last_observation_at: Optional[datetime] = None
+    last_login_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""Cold storage for historical observations.
+
+Observations older than the archive horizon are moved, a whole month at a
+time, out of the hot ``observations`` table into immutable gzip-compressed
+segments stored in ``observation_archive_segments``. The segment table keeps
+the time range of every segment, so readers can find the few segments a date
+range touches without decompressing anything.
+"""
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import DateTime, desc
+from sqlalchemy.orm import Session, defer
+
+from ..core.config import settings
+from ..models.archive_model import ArchiveSegment
+from ..models.observation_model import Observation
+from . import psychrometrics, stations, sync
+
+ARCHIVE_COLUMNS = [column.name for column in Observation.__table__.columns]
+_DATETIME_COLUMNS = {
+    column.name for column in Observation.__table__.columns
+    if isinstance(column.type, DateTime)
+}
+
+# Segments never change once written, so decoded rows can be cached by id
+_decoded_segments: "OrderedDict[tuple, list]" = OrderedDict()
+
+
+def normalize_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Return a naive UTC datetime so stored and requested times compare safely"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    """First instant that stays hot: the start of the month containing the horizon"""
+    now = now or datetime.now(timezone.utc)
+    horizon = now - timedelta(days=settings.archive_horizon_days)
+    return horizon.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _encode_rows(observations: Iterable[Observation]) -> bytes:
+    lines = []
+    for observation in observations:
+        row = {}
+        for name in ARCHIVE_COLUMNS:
+            value = getattr(observation, name)
+            row[name] = value.isoformat() if isinstance(value, datetime) else value
+        lines.append(json.dumps(row, ensure_ascii=False))
+    return gzip.compress("\n".join(lines).encode("utf-8"))
+
+
+def _decode_rows(payload: bytes) -> list:
+    rows = []
+    for line in gzip.decompress(payload).decode("utf-8").splitlines():
+        # Columns added after the segment was written read back as None
+        row = dict.fromkeys(ARCHIVE_COLUMNS)
+        row.update(json.loads(line))
+        for name in _DATETIME_COLUMNS:
+            if row.get(name):
+                row[name] = datetime.fromisoformat(row[name])
+        rows.append(SimpleNamespace(**row))
+    psychrometrics.fill_missing(rows)
+    return rows
+
+
+def archive_observations(db: Session, before: Optional[datetime] = None) -> List[ArchiveSegment]:
+    """Move every observation older than `before` into per-month segments.
+
+    Runs in the caller's transaction and commits once, so a failure leaves the
+    hot table untouched. Months that already have segments get an additional
+    segment for back-filled rows; existing segments are never rewritten.
+    """
+    before = before or archive_cutoff()
+    observations = (
+        db.query(Observation)
+        .filter(Observation.observation_time < before)
+        .order_by(desc(Observation.observation_time), desc(Observation.id))
+        .all()
+    )
+    if not observations:
+        return []
+
+    by_month: "OrderedDict[str, list]" = OrderedDict()
+    for observation in observations:
+        month = observation.observation_time.strftime("%Y-%m")
+        by_month.setdefault(month, []).append(observation)
+
+    segments = []
+    for month, rows in by_month.items():
+        payload = _encode_rows(rows)
+        segment = ArchiveSegment(
+            month=month,
+            range_start=rows[-1].observation_time,
+            range_end=rows[0].observation_time,
+            row_count=len(rows),
+            payload=payload,
+            checksum=hashlib.sha256(payload).hexdigest(),
+        )
+        db.add(segment)
+        segments.append(segment)
+
+    archived_ids = [observation.id for observation in observations]
+    for start in range(0, len(archived_ids), 500):
+        db.query(Observation).filter(
+            Observation.id.in_(archived_ids[start:start + 500])
+        ).delete(synchronize_session=False)
+
+    db.commit()
+    return segments
+
+
+def restore_segment(db: Session, segment_id: int) -> int:
+    """Move the rows of one segment back into the hot table so they can be edited"""
+    segment = db.query(ArchiveSegment).filter(ArchiveSegment.id == segment_id).first()
+    if not segment:
+        return 0
+
+    rows = _decode_rows(segment.payload)
+    for row in rows:
+        values = dict(vars(row))
+        if values["station_id"] is None:
+            # Archived before stations existed: let the column default pick the default station
+            del values["station_id"]
+        db.add(Observation(**values))
+    db.flush()
+    # The rows left the change feed when archived; come back as changes under a fresh number
+    sync.mark_changed(db, [row.id for row in rows])
+    db.delete(segment)
+    db.commit()
+    _decoded_segments.pop((segment.id, segment.checksum), None)
+    return len(rows)
+
+
+def segments_in_range(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> List[ArchiveSegment]:
+    """Index lookup of the segments overlapping a date range, newest first"""
+    query = db.query(ArchiveSegment).options(defer(ArchiveSegment.payload))
+    if start_date:
+        query = query.filter(ArchiveSegment.range_end >= start_date)
+    if end_date:
+        query = query.filter(ArchiveSegment.range_start <= end_date)
+    return query.order_by(desc(ArchiveSegment.range_end), desc(ArchiveSegment.id)).all()
+
+
+def _segment_rows(segment: ArchiveSegment) -> list:
+    key = (segment.id, segment.checksum)
+    rows = _decoded_segments.get(key)
+    if rows is None:
+        rows = _decode_rows(segment.payload)
+        _decoded_segments[key] = rows
+        while len(_decoded_segments) > settings.archive_cache_segments:
+            _decoded_segments.popitem(last=False)
+    else:
+        _decoded_segments.move_to_end(key)
+    return rows
+
+
+def load_observations(
+    segments: List[ArchiveSegment],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    predicate: Optional[Callable[[SimpleNamespace], bool]] = None,
+    limit: Optional[int] = None,
+    station=None,
+) -> List[SimpleNamespace]:
+    """Read archived observations in a date range, newest first.
+
+    `segments` comes from `segments_in_range`; segments hold every station's
+    rows, so pass `station` to keep one station's. With `limit`, segments are
+    decoded newest first and reading stops as soon as no remaining segment
+    can contribute to the newest `limit` rows.
+    """
+    start = normalize_time(start_date)
+    end = normalize_time(end_date)
+    result = []
+
+    for segment in segments:
+        if limit is not None and len(result) >= limit:
+            result.sort(key=lambda row: normalize_time(row.observation_time), reverse=True)
+            del result[limit:]
+            if normalize_time(segment.range_end) < normalize_time(result[-1].observation_time):
+                break
+
+        for row in _segment_rows(segment):
+            time = normalize_time(row.observation_time)
+            if start and time < start:
+                continue
+            if end and time > end:
+                continue
+            if station is not None and not stations.belongs(row, station):
+                continue
+            if predicate and not predicate(row):
+                continue
+            result.append(row)
+
+    result.sort(key=lambda row: normalize_time(row.observation_time), reverse=True)
+    if limit is not None:
+        del result[limit:]
+    return result
+
+
+def merge_newest_first(hot_rows: list, archived_rows: list) -> list:
+    """Merge hot and archived rows into one list ordered by observation time"""
+    return sorted(
+        list(hot_rows) + list(archived_rows),
+        key=lambda row: normalize_time(row.observation_time),
+        reverse=True,
+    )
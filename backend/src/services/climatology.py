@@ -0,0 +1,210 @@
+"""Day-of-year climatology baselines.
+
+Statistics are kept per station, variable and day of the year in
+``climatology_baselines``. Temperature statistics are over individual
+readings; precipitation statistics are over daily totals. Days are numbered
+on a leap-year calendar so that 1 March is day 61 in every year.
+
+Observation writes only mark the affected days stale. `refresh_stale`, run
+by the scheduled maintenance job, recomputes just those days, reading the
+matching calendar day of every year through the ``observation_time`` index
+rather than scanning all history. Reads serve the stored baselines as they
+are, so they may lag writes by up to the job's interval.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.climatology_model import ClimatologyBaseline
+from ..models.observation_model import Observation
+from ..models.station_model import Station
+from . import archive
+from .station_time import local_date, station_zone
+
+VARIABLES = ("temperature", "precipitation")
+PERCENTILES = (10, 25, 50, 75, 90)
+_LEAP_YEAR = 2000
+
+
+def day_of_year(value) -> int:
+    """Leap-year-calendar day number of a timestamp's station-local date"""
+    day = local_date(value) if isinstance(value, datetime) else value
+    return date(_LEAP_YEAR, day.month, day.day).timetuple().tm_yday
+
+
+def calendar_day(doy: int) -> date:
+    """Month and day for a day number, as a date in the reference leap year"""
+    return date(_LEAP_YEAR, 1, 1) + timedelta(days=doy - 1)
+
+
+def mark_stale(db: Session, positions: Iterable[Tuple[int, datetime]]) -> None:
+    """Flag the days of the given (station_id, observation time) pairs for recomputation"""
+    keys = {(station_id, day_of_year(value)) for station_id, value in positions}
+    if not keys:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    # One upsert, so concurrent writers touching a new day do not collide creating it;
+    # sorted so they lock rows in one order
+    db.execute(
+        dialect.insert(ClimatologyBaseline).on_conflict_do_update(
+            index_elements=[
+                ClimatologyBaseline.station_id, ClimatologyBaseline.variable, ClimatologyBaseline.day_of_year
+            ],
+            set_={"is_stale": True, "updated_at": func.now()},
+        ),
+        [
+            {"station_id": station_id, "variable": variable, "day_of_year": doy, "sample_count": 0, "is_stale": True}
+            for station_id, doy in sorted(keys)
+            for variable in VARIABLES
+        ],
+    )
+
+
+def _local_day_bounds(day: date):
+    zone = station_zone(settings.station_timezone)
+    start = datetime.combine(day, time.min, tzinfo=zone).astimezone(timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def _collect(db: Session, station: Station, doys: Optional[set] = None) -> Dict[str, Dict[int, np.ndarray]]:
+    """Gather the sample values of each variable at one station, keyed by day of year"""
+    in_station = Observation.station_id == station.id
+    query = db.query(Observation.observation_time, Observation.temperature, Observation.precipitation).filter(in_station)
+    segments = archive.segments_in_range(db)
+
+    # Past a month's worth of days a full scan is cheaper than per-day ranges
+    if doys is not None and len(doys) <= 31:
+        times = db.query(Observation.observation_time).filter(in_station)
+        first = times.order_by(Observation.observation_time).limit(1).scalar()
+        last = times.order_by(Observation.observation_time.desc()).limit(1).scalar()
+        years = set()
+        if first is not None:
+            years.update(range(local_date(first).year, local_date(last).year + 1))
+        if segments:
+            # Segments hold UTC months, which can end inside the next local year
+            years.update(range(
+                local_date(min(segment.range_start for segment in segments)).year,
+                local_date(max(segment.range_end for segment in segments)).year + 1,
+            ))
+
+        # One index range per calendar day per year
+        bounds = []
+        ranges = []
+        for year in sorted(years):
+            for doy in doys:
+                day = calendar_day(doy)
+                if day.month == 2 and day.day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+                    continue
+                start, end = _local_day_bounds(date(year, day.month, day.day))
+                bounds.append((archive.normalize_time(start), archive.normalize_time(end)))
+                ranges.append((Observation.observation_time >= start) & (Observation.observation_time < end))
+        if not ranges:
+            return {variable: {} for variable in VARIABLES}
+        query = query.filter(or_(*ranges))
+
+        # Segments are UTC months, so a local day can sit in the segment before its own month
+        segments = [
+            segment for segment in segments
+            if any(
+                archive.normalize_time(segment.range_start) < end and archive.normalize_time(segment.range_end) >= start
+                for start, end in bounds
+            )
+        ]
+
+    rows = list(query.all()) + archive.load_observations(segments, station=station)
+
+    temperatures = defaultdict(list)
+    daily_precipitation = defaultdict(float)
+    for row in rows:
+        day = local_date(row.observation_time)
+        doy = day_of_year(day)
+        if doys is not None and doy not in doys:
+            continue
+        if row.temperature is not None:
+            temperatures[doy].append(row.temperature)
+        if row.precipitation is not None:
+            daily_precipitation[day] += row.precipitation
+
+    precipitation = defaultdict(list)
+    for day, total in daily_precipitation.items():
+        precipitation[day_of_year(day)].append(total)
+
+    return {
+        "temperature": {doy: np.array(values) for doy, values in temperatures.items()},
+        "precipitation": {doy: np.array(values) for doy, values in precipitation.items()},
+    }
+
+
+def _statistics(values: Optional[np.ndarray]) -> dict:
+    if values is None or not len(values):
+        return {"sample_count": 0, "mean": None, "minimum": None, "maximum": None,
+                **{f"p{p}": None for p in PERCENTILES}}
+    bands = np.percentile(values, PERCENTILES)
+    return {
+        "sample_count": int(len(values)),
+        "mean": round(float(values.mean()), 2),
+        "minimum": float(values.min()),
+        "maximum": float(values.max()),
+        **{f"p{p}": round(float(band), 2) for p, band in zip(PERCENTILES, bands)},
+    }
+
+
+def _store(db: Session, station: Station, doys: Iterable[int], samples: Dict[str, Dict[int, np.ndarray]]) -> None:
+    for variable in VARIABLES:
+        for doy in doys:
+            db.merge(ClimatologyBaseline(
+                station_id=station.id,
+                variable=variable,
+                day_of_year=doy,
+                is_stale=False,
+                **_statistics(samples[variable].get(doy)),
+            ))
+
+
+def refresh_stale(db: Session, station: Optional[Station] = None) -> int:
+    """Recompute only the days marked stale, at one station or all; returns how many station-days changed"""
+    query = db.query(ClimatologyBaseline.station_id, ClimatologyBaseline.day_of_year).filter(
+        ClimatologyBaseline.is_stale == True
+    )
+    if station is not None:
+        query = query.filter(ClimatologyBaseline.station_id == station.id)
+    by_station = defaultdict(set)
+    for station_id, doy in query.distinct():
+        by_station[station_id].add(doy)
+    if not by_station:
+        return 0
+    for station_id, doys in by_station.items():
+        stale_station = station if station is not None else db.get(Station, station_id)
+        _store(db, stale_station, doys, _collect(db, stale_station, doys))
+    db.commit()
+    return sum(len(doys) for doys in by_station.values())
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every day of the year at every station from the full history"""
+    all_stations = db.query(Station).all()
+    for station in all_stations:
+        _store(db, station, range(1, 367), _collect(db, station))
+    db.commit()
+    return 366 * len(all_stations)
+
+
+def percentile_rank(baseline: Optional[ClimatologyBaseline], value: Optional[float]) -> Optional[float]:
+    """Approximate percentile of a value within a day's baseline bands"""
+    if baseline is None or value is None or not baseline.sample_count:
+        return None
+    points = [(baseline.minimum, 0)] + [
+        (getattr(baseline, f"p{p}"), p) for p in PERCENTILES
+    ] + [(baseline.maximum, 100)]
+    if value < baseline.minimum:
+        return 0.0
+    if value > baseline.maximum:
+        return 100.0
+    levels, ranks = zip(*points)
+    return round(float(np.interp(value, levels, ranks)), 1)
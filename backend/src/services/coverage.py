@@ -0,0 +1,199 @@
+"""Coverage of the scheduled observation times.
+
+A station is expected to observe at fixed local times every day
+(``COVERAGE_SLOTS``, e.g. 08:00, 14:00 and 20:00); a slot counts as observed
+when an observation lies within ``COVERAGE_TOLERANCE_MINUTES`` of it.
+
+`daily_coverage` answers a date range with one query. The slot windows come
+from ``generate_series`` on PostgreSQL (a VALUES list computed here on other
+databases, which lack time zone arithmetic), are joined against
+``observations`` through the ``(station_id, observation_time)`` index and are
+folded into one bitmap per day and observer: bit i set means slot i was
+observed. Archived months are matched here against the same windows.
+
+Months that ended before today are cached whole, keyed on the station month
+versions exports already keep (`exports.month_versions`), so backfilling an
+old observation recomputes only its own month.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, Integer, and_, column, func, select, text, values
+from sqlalchemy.orm import Session
+
+from ..core.cache import get_cache
+from ..core.config import settings
+from ..models.observation_model import Observation
+from ..models.station_model import Station
+from . import archive, exports
+from .station_time import local_date, station_zone
+
+MAX_SLOTS = 24
+_SLOT = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+
+# (day, observer id) -> bitmap of observed slots
+Masks = Dict[Tuple[str, int], int]
+
+_POSTGRES_SLOTS = text("""
+    SELECT day::date AS day,
+           1 << slot.ordinal AS bit,
+           (day + make_interval(mins => slot.start_minute)) AT TIME ZONE :zone AS window_start,
+           (day + make_interval(mins => slot.end_minute)) AT TIME ZONE :zone AS window_end
+    FROM generate_series(CAST(:first_day AS timestamp), CAST(:last_day AS timestamp), interval '1 day') AS day
+    CROSS JOIN unnest(CAST(:positions AS integer[]), CAST(:start_minutes AS integer[]), CAST(:end_minutes AS integer[]))
+        AS slot(ordinal, start_minute, end_minute)
+""")
+
+
+class CoverageError(ValueError):
+    """The slots or the date range are invalid"""
+
+
+def parse_slots(raw: str) -> Tuple[int, ...]:
+    """Minutes after local midnight of comma-separated ``HH:MM`` slots, in order"""
+    slots = set()
+    for part in raw.split(","):
+        match = _SLOT.match(part.strip())
+        if not match:
+            raise CoverageError(f"Invalid slot '{part.strip()}', expected HH:MM")
+        slots.add(int(match.group(1)) * 60 + int(match.group(2)))
+    if len(slots) > MAX_SLOTS:
+        raise CoverageError(f"At most {MAX_SLOTS} slots are supported")
+    return tuple(sorted(slots))
+
+
+def format_slot(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _utc(day: date, minutes: int) -> datetime:
+    """Naive UTC instant of a station-local day plus minutes"""
+    local = datetime.combine(day, time()) + timedelta(minutes=minutes)
+    return local.replace(tzinfo=station_zone(settings.station_timezone)).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _windows(first_day: date, last_day: date, slots: Sequence[int], tolerance: int) -> list:
+    """(day, bit, window start, window end) of every slot, in naive UTC"""
+    windows = []
+    day = first_day
+    while day <= last_day:
+        for position, minutes in enumerate(slots):
+            windows.append((day, 1 << position, _utc(day, minutes - tolerance), _utc(day, minutes + tolerance)))
+        day += timedelta(days=1)
+    return windows
+
+
+def _slot_windows(db: Session, first_day: date, last_day: date, slots: Sequence[int], tolerance: int):
+    if db.get_bind().dialect.name == "postgresql":
+        return _POSTGRES_SLOTS.bindparams(
+            zone=settings.station_timezone,
+            first_day=first_day,
+            last_day=last_day,
+            positions=list(range(len(slots))),
+            start_minutes=[minutes - tolerance for minutes in slots],
+            end_minutes=[minutes + tolerance for minutes in slots],
+        ).columns(
+            column("day", Date), column("bit", Integer),
+            column("window_start", DateTime(timezone=True)), column("window_end", DateTime(timezone=True)),
+        ).cte("slot_windows")
+    return values(
+        column("day", Date), column("bit", Integer), column("window_start", DateTime), column("window_end", DateTime),
+        name="slot_windows",
+    ).data(_windows(first_day, last_day, slots, tolerance)).cte("slot_windows")
+
+
+def _hot_masks(db: Session, station: Station, first_day: date, last_day: date, slots, tolerance: int) -> Masks:
+    windows = _slot_windows(db, first_day, last_day, slots, tolerance)
+    observed = (
+        select(windows.c.day, windows.c.bit, Observation.observer_id)
+        .join_from(windows, Observation, and_(
+            Observation.station_id == station.id,
+            Observation.observation_time >= windows.c.window_start,
+            Observation.observation_time <= windows.c.window_end,
+        ))
+        .distinct()
+        .subquery()
+    )
+    # Each (day, slot, observer) appears once, so the sum of bits is their bitwise OR
+    query = (
+        select(observed.c.day, observed.c.observer_id, func.sum(observed.c.bit))
+        .group_by(observed.c.day, observed.c.observer_id)
+    )
+    return {(day.isoformat(), observer_id): int(mask) for day, observer_id, mask in db.execute(query)}
+
+
+def _archived_masks(db: Session, station: Station, first_day: date, last_day: date, slots, tolerance: int) -> Masks:
+    windows = _windows(first_day, last_day, slots, tolerance)
+    start, end = windows[0][2], max(window[3] for window in windows)
+    segments = archive.segments_in_range(db, start, end)
+    if not segments:
+        return {}
+    rows = sorted(
+        (archive.normalize_time(row.observation_time), row.observer_id)
+        for row in archive.load_observations(segments, start, end, station=station)
+    )
+    times = [row[0] for row in rows]
+    masks = defaultdict(int)
+    for day, bit, window_start, window_end in windows:
+        for _, observer_id in rows[bisect_left(times, window_start):bisect_right(times, window_end)]:
+            masks[(day.isoformat(), observer_id)] |= bit
+    return masks
+
+
+def _compute(db: Session, station: Station, first_day: date, last_day: date, slots, tolerance: int) -> list:
+    masks = _hot_masks(db, station, first_day, last_day, slots, tolerance)
+    for key, mask in _archived_masks(db, station, first_day, last_day, slots, tolerance).items():
+        masks[key] = masks.get(key, 0) | mask
+    return sorted([day, observer_id, mask] for (day, observer_id), mask in masks.items())
+
+
+def _month_end(first_day: date) -> date:
+    return (first_day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def daily_coverage(
+    db: Session,
+    station: Station,
+    start_date: date,
+    end_date: date,
+    slots: Sequence[int],
+    tolerance: int,
+    today: Optional[date] = None,
+) -> List[list]:
+    """``[day, observer id, bitmap]`` of every observer who covered a slot, by day.
+
+    Whole months that ended before `today` come from the cache.
+    """
+    if not slots:
+        raise CoverageError("At least one slot is required")
+    if end_date < start_date:
+        raise CoverageError("end_date must not be before start_date")
+    if (end_date - start_date).days >= settings.coverage_max_days:
+        raise CoverageError(f"The range may span at most {settings.coverage_max_days} days")
+    today = today or local_date(datetime.now(timezone.utc))
+
+    result = []
+    first_day = start_date
+    while first_day <= end_date:
+        month_end = _month_end(first_day)
+        last_day = min(month_end, end_date)
+        if first_day.day == 1 and last_day == month_end and month_end < today:
+            # The local month reaches into the UTC months on either side of its edges
+            months = sorted({
+                exports.month_key(_utc(first_day, -tolerance)),
+                first_day.strftime("%Y-%m"),
+                exports.month_key(_utc(last_day, 24 * 60 + tolerance)),
+            })
+            version = exports.month_versions(db, station.id, months)
+            key = f"{station.id}|{first_day:%Y-%m}|{','.join(map(str, slots))}|{tolerance}|{version}"
+            result.extend(get_cache().get_or_set(
+                "coverage", key, lambda: _compute(db, station, first_day, last_day, slots, tolerance),
+                depends_on=(), ttl=settings.coverage_cache_ttl_seconds,
+            ))
+        else:
+            result.extend(_compute(db, station, first_day, last_day, slots, tolerance))
+        first_day = last_day + timedelta(days=1)
+    return result
@@ -0,0 +1,132 @@
+"""Latest-conditions summary of one station, shown on the dashboard"""
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import desc, func, select
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from ..core.cache import get_cache
+from ..models.observation_model import Observation
+from ..models.station_model import Station
+from ..models.user_model import User
+from ..schemas.observation_schemas import DashboardData
+from . import archive, ingestion
+
+
+# Window aggregates ending at the latest observation: (name, column, aggregate, window start, window end)
+# as offsets back from it. The same-hour reading is the mean of temperatures within half an hour of 24h ago.
+_SAME_HOUR_TOLERANCE = timedelta(minutes=30)
+_SAME_HOUR = (timedelta(hours=24) + _SAME_HOUR_TOLERANCE, timedelta(hours=24) - _SAME_HOUR_TOLERANCE)
+_AGGREGATES = (
+    ("precipitation_1h", "precipitation", "sum", timedelta(hours=1), timedelta(0)),
+    ("precipitation_3h", "precipitation", "sum", timedelta(hours=3), timedelta(0)),
+    ("precipitation_6h", "precipitation", "sum", timedelta(hours=6), timedelta(0)),
+    ("precipitation_24h", "precipitation", "sum", timedelta(hours=24), timedelta(0)),
+    ("precipitation_7d", "precipitation", "sum", timedelta(days=7), timedelta(0)),
+    ("temperature_min_24h", "temperature", "min", timedelta(hours=24), timedelta(0)),
+    ("temperature_max_24h", "temperature", "max", timedelta(hours=24), timedelta(0)),
+    ("same_hour_sum", "temperature", "sum", *_SAME_HOUR),
+    ("same_hour_count", "temperature", "count", *_SAME_HOUR),
+)
+_LOOKBACK = max(start for _, _, _, start, _ in _AGGREGATES)
+_COMBINE = {"sum": lambda a, b: a + b, "count": lambda a, b: a + b, "min": min, "max": max}
+
+
+def window_aggregates(db: Session, station: Station, observation_time) -> dict:
+    """Precipitation sums, temperature extremes and the same-hour temperature of the windows ending at `observation_time`
+
+    All windows come from one statement: a single range scan over the
+    last 7 days on the (station_id, observation_time) index, with each
+    window an aggregate ``FILTER`` clause. Archived rows inside the range
+    are folded in here.
+    """
+    columns = []
+    for name, column, aggregate, start, end in _AGGREGATES:
+        in_window = Observation.observation_time.between(observation_time - start, observation_time - end)
+        columns.append(getattr(func, aggregate)(getattr(Observation, column)).filter(in_window).label(name))
+    row = db.execute(
+        select(*columns).where(
+            Observation.station_id == station.id,
+            Observation.observation_time >= observation_time - _LOOKBACK,
+            Observation.observation_time <= observation_time,
+        )
+    ).one()
+    values = dict(row._mapping)
+    
+    segments = archive.segments_in_range(db, observation_time - _LOOKBACK, observation_time)
+    if segments:
+        latest = archive.normalize_time(observation_time)
+        for archived in archive.load_observations(segments, observation_time - _LOOKBACK, observation_time, station=station):
+            age = latest - archive.normalize_time(archived.observation_time)
+            for name, column, aggregate, start, end in _AGGREGATES:
+                value = getattr(archived, column)
+                if value is None or not end <= age <= start:
+                    continue
+                value = 1 if aggregate == "count" else value
+                values[name] = value if values[name] is None else _COMBINE[aggregate](values[name], value)
+    
+    count = values.pop("same_hour_count") or 0
+    same_hour_sum = values.pop("same_hour_sum")
+    values["temperature_24h_ago"] = same_hour_sum / count if count else None
+    return values
+
+
+def build_dashboard(db: Session, station: Station) -> Optional[DashboardData]:
+    """Summarize the station's latest observation and sensor reading, or None when it has no observations"""
+    # Get the most recent observation, falling back to the archive if the hot table is empty
+    latest_observation = (
+        db.query(Observation)
+        .filter(Observation.station_id == station.id)
+        .order_by(desc(Observation.observation_time))
+        .first()
+    )
+    if not latest_observation:
+        archived = archive.load_observations(archive.segments_in_range(db), limit=1, station=station)
+        latest_observation = archived[0] if archived else None
+    
+    if not latest_observation:
+        return None
+    
+    observation_time = latest_observation.observation_time
+    aggregates = window_aggregates(db, station, observation_time)
+    temperature_change_24h = None
+    if latest_observation.temperature is not None and aggregates["temperature_24h_ago"] is not None:
+        temperature_change_24h = round(latest_observation.temperature - aggregates["temperature_24h_ago"], 2)
+    
+    # Get observer name (prioritize formal_name set by user)
+    observer = db.query(User).filter(User.id == latest_observation.observer_id).first()
+    observer_name = observer.formal_name or observer.display_name or observer.google_name if observer else None
+    
+    return DashboardData(
+        observation_time=latest_observation.observation_time,
+        temperature=latest_observation.temperature,
+        wet_bulb_temperature=latest_observation.wet_bulb_temperature,
+        precipitation_1h=aggregates["precipitation_1h"],
+        precipitation_3h=aggregates["precipitation_3h"],
+        precipitation_6h=aggregates["precipitation_6h"],
+        precipitation_24h=aggregates["precipitation_24h"],
+        precipitation_7d=aggregates["precipitation_7d"],
+        temperature_min_24h=aggregates["temperature_min_24h"],
+        temperature_max_24h=aggregates["temperature_max_24h"],
+        temperature_change_24h=temperature_change_24h,
+        relative_humidity=latest_observation.relative_humidity,
+        dew_point=latest_observation.dew_point,
+        vapour_pressure=latest_observation.vapour_pressure,
+        current_evaporation_level=latest_observation.current_evaporation_level,
+        evaporation_pan_temp=latest_observation.evaporation_pan_temp,
+        observer_name=observer_name,
+        sensor=ingestion.latest_snapshot(db, station.id)
+    )
+
+
+def cached_dashboard(db: Session, station: Station) -> Optional[dict]:
+    """`build_dashboard` through the shared cache, as JSON-ready data"""
+    def build():
+        data = build_dashboard(db, station)
+        return jsonable_encoder(data) if data is not None else None
+    
+    # Names come from users, so user edits invalidate it too
+    return get_cache().get_or_set(
+        "dashboard", f"station:{station.id}", build, depends_on=("observations", "users", "sensor_readings")
+    )
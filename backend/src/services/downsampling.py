@@ -0,0 +1,44 @@
+"""Largest-Triangle-Three-Buckets downsampling for time-series charts.
+
+Steinarsson, "Downsampling Time Series for Visual Representation" (2013).
+The first and last points are always kept; every bucket in between keeps
+the point forming the largest triangle with the point kept from the
+previous bucket and the average of the next bucket.
+"""
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Return the indices of the points to keep, in ascending order.
+
+    `x` must be sorted ascending. When there are no more than `threshold`
+    points every index is returned.
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    # Bucket edges over the points between the first and the last
+    edges = np.linspace(1, length - 1, threshold - 1).astype(int)
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = length - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        # Average of the next bucket; the last bucket looks at the final point
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+
+    return kept
@@ -0,0 +1,292 @@
+"""Pan evaporation derived from consecutive observations.
+
+Between two observations the pan loses water to evaporation and gains the
+precipitation recorded at the later observation. Any maintenance done at an
+observation (cleaning and refilling, adding or removing water) resets the
+level the next interval starts from, so for an interval ending at
+observation ``n``::
+
+    evaporation = level_after_maintenance(n - 1) - current_level(n) + precipitation(n)
+
+Intervals only join consecutive observations of the same station. They are
+stored per ending observation and summed into station-local days per
+station. A write only recomputes the intervals that touch the changed
+observation; `rebuild` recomputes everything with NumPy. Both read the
+archive as well, so an observation's neighbour may be an archived one.
+"""
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import and_, delete, desc, func, insert, or_
+from sqlalchemy.orm import Session
+
+from ..models.evaporation_model import DailyEvaporation, EvaporationInterval
+from ..models.observation_model import Observation
+from ..models.station_model import Station
+from . import archive, stations
+from .station_time import local_date
+
+# Narrow projection used by both the incremental and the batch paths
+_LEVEL_COLUMNS = (
+    Observation.id,
+    Observation.station_id,
+    Observation.observation_time,
+    Observation.current_evaporation_level,
+    Observation.precipitation,
+    Observation.has_cleaned_evaporation_pan,
+    Observation.cleaned_evaporation_level,
+    Observation.has_added_evaporation_water,
+    Observation.added_evaporation_level,
+    Observation.has_reduced_evaporation_water,
+    Observation.reduced_evaporation_level,
+)
+
+
+def level_after_maintenance(row) -> Optional[float]:
+    """Pan level left behind by an observation, after any cleaning or refilling"""
+    if row.has_reduced_evaporation_water and row.reduced_evaporation_level is not None:
+        return row.reduced_evaporation_level
+    if row.has_added_evaporation_water and row.added_evaporation_level is not None:
+        return row.added_evaporation_level
+    if row.has_cleaned_evaporation_pan and row.cleaned_evaporation_level is not None:
+        return row.cleaned_evaporation_level
+    return row.current_evaporation_level
+
+
+def _interval_values(station_id: int, previous, current) -> dict:
+    start_level = level_after_maintenance(previous)
+    end_level = current.current_evaporation_level
+    evaporation = None
+    if start_level is not None and end_level is not None:
+        evaporation = round(start_level - end_level + (current.precipitation or 0.0), 2)
+    return {
+        "station_id": station_id,
+        "start_observation_id": previous.id,
+        "end_observation_id": current.id,
+        "start_time": previous.observation_time,
+        "end_time": current.observation_time,
+        "day": local_date(current.observation_time),
+        "start_level": start_level,
+        "end_level": end_level,
+        "precipitation": current.precipitation,
+        "evaporation": evaporation,
+    }
+
+
+def _position(row) -> tuple:
+    """Order of observations along a station's history, hot and archived alike"""
+    return archive.normalize_time(row.observation_time), row.id
+
+
+def _archived_neighbour(db: Session, station_id: int, position: tuple, before: bool, bound=None):
+    """Closest archived observation of a station before or after `position`, if closer than `bound`"""
+    moment = position[0]
+    bound = archive.normalize_time(bound)
+    segments = (
+        archive.segments_in_range(db, bound, moment) if before else archive.segments_in_range(db, moment, bound)
+    )
+    if not segments:
+        return None
+    station = db.get(Station, station_id)
+    if before:
+        rows = archive.load_observations(
+            segments, bound, moment, predicate=lambda row: _position(row) < position, limit=1, station=station
+        )
+        return rows[0] if rows else None
+    rows = archive.load_observations(segments, moment, bound, predicate=lambda row: _position(row) > position, station=station)
+    return min(rows, key=_position, default=None)
+
+
+def _previous_observation(db: Session, station_id: int, row):
+    hot = (
+        db.query(*_LEVEL_COLUMNS)
+        .filter(Observation.station_id == station_id)
+        .filter(or_(
+            Observation.observation_time < row.observation_time,
+            and_(Observation.observation_time == row.observation_time, Observation.id < row.id),
+        ))
+        .order_by(desc(Observation.observation_time), desc(Observation.id))
+        .first()
+    )
+    archived = _archived_neighbour(db, station_id, _position(row), True, hot.observation_time if hot else None)
+    return max((found for found in (hot, archived) if found is not None), key=_position, default=None)
+
+
+def _next_observation(db: Session, station_id: int, observation_id: int, observation_time):
+    hot = (
+        db.query(*_LEVEL_COLUMNS)
+        .filter(Observation.station_id == station_id)
+        .filter(or_(
+            Observation.observation_time > observation_time,
+            and_(Observation.observation_time == observation_time, Observation.id > observation_id),
+        ))
+        .order_by(Observation.observation_time, Observation.id)
+        .first()
+    )
+    position = (archive.normalize_time(observation_time), observation_id)
+    archived = _archived_neighbour(db, station_id, position, False, hot.observation_time if hot else None)
+    return min((found for found in (hot, archived) if found is not None), key=_position, default=None)
+
+
+def _observation(db: Session, observation_id: int, observation_time=None):
+    """Level columns of a hot observation, else of the archived one at `observation_time`"""
+    row = db.query(*_LEVEL_COLUMNS).filter(Observation.id == observation_id).first()
+    if row is None and observation_time is not None:
+        segments = archive.segments_in_range(db, observation_time, observation_time)
+        rows = archive.load_observations(
+            segments, observation_time, observation_time, predicate=lambda row: row.id == observation_id
+        )
+        row = rows[0] if rows else None
+    return row
+
+
+def _refresh_days(db: Session, station_days: Iterable) -> None:
+    """Re-sum the daily totals of (station_id, day) pairs"""
+    by_station = defaultdict(set)
+    for station_id, day in station_days:
+        by_station[station_id].add(day)
+    for station_id, days in by_station.items():
+        totals = (
+            db.query(
+                EvaporationInterval.day,
+                func.sum(EvaporationInterval.evaporation),
+                func.count(EvaporationInterval.evaporation),
+            )
+            .filter(EvaporationInterval.station_id == station_id, EvaporationInterval.day.in_(days))
+            .group_by(EvaporationInterval.day)
+            .all()
+        )
+        db.execute(delete(DailyEvaporation).where(
+            DailyEvaporation.station_id == station_id, DailyEvaporation.day.in_(days)
+        ))
+        if totals:
+            db.execute(insert(DailyEvaporation), [
+                {"station_id": station_id, "day": day,
+                 "evaporation": round(total, 2) if count else None, "interval_count": count}
+                for day, total, count in totals
+            ])
+
+
+def refresh_after_change(db: Session, changes: List) -> None:
+    """Recompute the intervals around changed observations in the caller's transaction.
+
+    `changes` are `ObservationChange` records. Only the interval ending at a
+    changed observation and the one ending at its next neighbour (before and
+    after the change) are recomputed, plus the daily totals they fall on.
+    """
+    # End observation id -> its time, for ends that may have been archived
+    ends = {}
+    days = set()
+
+    for change in changes:
+        # Intervals that referenced the observation before the change
+        stale = (
+            db.query(EvaporationInterval)
+            .filter(or_(
+                EvaporationInterval.end_observation_id == change.id,
+                EvaporationInterval.start_observation_id == change.id,
+            ))
+            .all()
+        )
+        for interval in stale:
+            days.add((interval.station_id, interval.day))
+            if interval.end_observation_id == change.id:
+                db.delete(interval)
+            else:
+                ends[interval.end_observation_id] = interval.end_time
+
+        # Neighbours at the observation's new position
+        if change.new_time is not None:
+            ends[change.id] = change.new_time
+            following = _next_observation(db, change.station_id, change.id, change.new_time)
+            if following is not None:
+                ends[following.id] = following.observation_time
+    db.flush()
+
+    default_id = stations.default_station(db).id if ends else None
+    for end_id, end_time in ends.items():
+        db.query(EvaporationInterval).filter(EvaporationInterval.end_observation_id == end_id).delete()
+        current = _observation(db, end_id, end_time)
+        if current is None:
+            continue
+        station_id = stations.station_id_of(current, default_id)
+        previous = _previous_observation(db, station_id, current)
+        if previous is None:
+            continue
+        values = _interval_values(station_id, previous, current)
+        db.execute(insert(EvaporationInterval), [values])
+        days.add((values["station_id"], values["day"]))
+
+    _refresh_days(db, days)
+
+
+def rebuild(db: Session, batch_size: int = 5000) -> int:
+    """Recompute every station's intervals and daily totals from the full history, archive included"""
+    default_id = stations.default_station(db).id
+    hot_rows = db.query(*_LEVEL_COLUMNS).all()
+    archived_rows = archive.load_observations(archive.segments_in_range(db))
+    by_station = defaultdict(list)
+    for row in list(hot_rows) + archived_rows:
+        by_station[stations.station_id_of(row, default_id)].append(row)
+
+    db.execute(delete(EvaporationInterval))
+    db.execute(delete(DailyEvaporation))
+    intervals = []
+    daily = []
+    for station_id, rows in by_station.items():
+        rows.sort(key=lambda row: (archive.normalize_time(row.observation_time), row.id))
+        station_intervals, station_daily = _station_history(station_id, rows)
+        intervals.extend(station_intervals)
+        daily.extend(station_daily)
+
+    for start in range(0, len(intervals), batch_size):
+        db.execute(insert(EvaporationInterval), intervals[start:start + batch_size])
+    if daily:
+        db.execute(insert(DailyEvaporation), daily)
+    db.commit()
+    return len(intervals)
+
+
+def _station_history(station_id: int, rows: list) -> tuple:
+    """Interval and daily rows for one station's observations in time order"""
+    if len(rows) < 2:
+        return [], []
+
+    def column(values):
+        return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+    start_levels = column([level_after_maintenance(row) for row in rows[:-1]])
+    end_levels = column([row.current_evaporation_level for row in rows[1:]])
+    precipitation = column([row.precipitation for row in rows[1:]])
+    evaporation = np.round(start_levels - end_levels + np.nan_to_num(precipitation), 2)
+
+    intervals = []
+    daily_totals = defaultdict(float)
+    daily_counts = defaultdict(int)
+    for index, (previous, current) in enumerate(zip(rows[:-1], rows[1:])):
+        day = local_date(current.observation_time)
+        value = None if np.isnan(evaporation[index]) else float(evaporation[index])
+        intervals.append({
+            "station_id": station_id,
+            "start_observation_id": previous.id,
+            "end_observation_id": current.id,
+            "start_time": previous.observation_time,
+            "end_time": current.observation_time,
+            "day": day,
+            "start_level": None if np.isnan(start_levels[index]) else float(start_levels[index]),
+            "end_level": current.current_evaporation_level,
+            "precipitation": current.precipitation,
+            "evaporation": value,
+        })
+        # Days whose intervals all lack a value still get a row, with a count of 0
+        daily_counts[day] += value is not None
+        if value is not None:
+            daily_totals[day] += value
+
+    daily = [
+        {"station_id": station_id, "day": day,
+         "evaporation": round(daily_totals[day], 2) if count else None, "interval_count": count}
+        for day, count in daily_counts.items()
+    ]
+    return intervals, daily
@@ -0,0 +1,566 @@
+"""CSV exports of observations, inline or as background jobs.
+
+`build_export` produces the same file for the synchronous ``/export/csv``
+route and for export jobs; every export covers one station. History rarely
+changes, so the rows of every month an export fully covers are cached as an
+encoded segment file under ``EXPORT_STORAGE_DIR/segments``. Each observation
+write bumps the version of its station's month (`mark_dirty`, in the write's
+transaction) and segments are named after the version they encode, so only
+the changed months and the partly covered edge months of a range are
+generated again.
+
+A background job is recorded in ``export_jobs`` and its id handed to a small
+thread pool (``EXPORT_WORKERS``), which writes the CSV under
+``EXPORT_STORAGE_DIR`` and marks the job succeeded or failed. Clients poll the
+job and download the file with ``Range`` requests, so a dropped connection
+resumes where it stopped instead of regenerating the export.
+
+Requests are fingerprinted after normalizing the date range and filters. A
+partial unique index allows one queued or running job per fingerprint, so
+identical concurrent requests - from any replica - end up sharing one job.
+
+Finished jobs expire after ``EXPORT_TTL_SECONDS``; `purge_expired` removes
+their rows and files and fails jobs whose worker died (still pending after
+``EXPORT_JOB_TIMEOUT_SECONDS``).
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import and_, desc, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
+
+from ..core.config import settings
+from ..models.archive_model import ArchiveSegment
+from ..models.export_model import ExportJob, ExportMonthVersion
+from ..models.observation_model import Observation
+from ..models.station_model import Station
+from ..models.user_model import User
+from . import archive, fieldsets, filters
+
+logger = logging.getLogger(__name__)
+
+PENDING = ("queued", "running")
+
+# Bump when the CSV layout changes so segment files in the old layout are never served
+SEGMENT_FORMAT = 1
+_EVERY_MONTH = (0, "*")  # version row shared by all stations and months
+_BOM = "\ufeff".encode("utf-8")
+_CHUNK_SIZE = 1 << 16
+_ONE_TICK = timedelta(microseconds=1)
+_STALE_SEGMENT_GRACE = 3600  # seconds
+
+# (field, header) in file order; headers are in Chinese for the UI
+CSV_COLUMNS = [
+    ('observation_time', '觀測時間'),
+    ('observer_name', '觀測人員'),
+    ('temperature', '現在溫度 (°C)'),
+    ('wet_bulb_temperature', '濕球溫度 (°C)'),
+    ('precipitation', '降水量 (mm)'),
+    ('evaporation_pan_temp', '蒸發皿水溫 (°C)'),
+    ('current_evaporation_level', '現蒸發皿水位高 (mm)'),
+    ('current_weather_code', '現在天氣代碼'),
+    ('total_cloud_amount', '總雲量 (0-8)'),
+    ('high_cloud_type_code', '高雲雲種代碼 (0-9)'),
+    ('high_cloud_amount', '高雲雲量 (0-8)'),
+    ('middle_cloud_type_code', '中雲雲種代碼 (0-9)'),
+    ('middle_cloud_amount', '中雲雲量 (0-8)'),
+    ('low_cloud_type_code', '低雲雲種代碼 (0-9)'),
+    ('low_cloud_amount', '低雲雲量 (0-8)'),
+    ('cleaned_evaporation_level', '洗蒸發皿後水位高 (mm)'),
+    ('cleaned_evaporation_temp', '洗蒸發皿後水溫 (°C)'),
+    ('added_evaporation_level', '加蒸發皿水位後水位高 (mm)'),
+    ('added_evaporation_temp', '加蒸發皿水位後水溫 (°C)'),
+    ('reduced_evaporation_level', '減蒸發皿水位後水位高 (mm)'),
+    ('reduced_evaporation_temp', '減蒸發皿水位後水溫 (°C)'),
+    ('notes', '備註'),
+    ('relative_humidity', '相對濕度 (%)'),
+    ('dew_point', '露點溫度 (°C)'),
+    ('vapour_pressure', '水氣壓 (hPa)'),
+]
+CSV_HEADER = [header for _, header in CSV_COLUMNS]
+_HEADERS = dict(CSV_COLUMNS)
+
+# Columns selectable with `fields`
+EXPORT_FIELDS = tuple(_HEADERS)
+
+
+def csv_row(observation, observer_name: Optional[str], fields: Sequence[str] = EXPORT_FIELDS) -> list:
+    row = []
+    for field in fields:
+        if field == 'observation_time':
+            value = observation.observation_time.strftime('%Y-%m-%d %H:%M:%S') if observation.observation_time else ''
+        elif field == 'observer_name':
+            value = observer_name
+        else:
+            value = getattr(observation, field)
+        row.append('' if value is None else value)
+    return row
+
+
+def export_filename(start_date: Optional[datetime], end_date: Optional[datetime]) -> str:
+    if start_date and end_date:
+        return f"weather_observations_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.csv"
+    if start_date:
+        return f"weather_observations_from_{start_date.strftime('%Y%m%d')}.csv"
+    if end_date:
+        return f"weather_observations_until_{end_date.strftime('%Y%m%d')}.csv"
+    return f"weather_observations_{datetime.now().strftime('%Y%m%d')}.csv"
+
+
+def observer_names(db: Session, observer_ids=None) -> dict:
+    """Resolve display names for a set of observers, or every user, with a single query"""
+    query = db.query(User.id, User.formal_name, User.display_name, User.google_name)
+    if observer_ids is not None:
+        observer_ids = set(observer_ids)
+        if not observer_ids:
+            return {}
+        query = query.filter(User.id.in_(observer_ids))
+    return {
+        observer.id: observer.formal_name or observer.display_name or observer.google_name
+        for observer in query
+    }
+
+
+def _encode(rows) -> bytes:
+    output = io.StringIO()
+    csv.writer(output).writerows(rows)
+    return output.getvalue().encode("utf-8")
+
+
+def _load(
+    db: Session, station: Station, start: Optional[datetime], end: Optional[datetime], column_filters, fields: Sequence[str]
+) -> list:
+    """A station's hot and archived observations in [start, end], newest first, with the columns `fields` needs"""
+    query = db.query(Observation).filter(Observation.station_id == station.id)
+    if fields != EXPORT_FIELDS:
+        query = query.options(load_only(*fieldsets.load_columns(fields, "observation_time")))
+    if start:
+        query = query.filter(Observation.observation_time >= start)
+    if end:
+        query = query.filter(Observation.observation_time <= end)
+    observations = column_filters.apply(query).order_by(desc(Observation.observation_time)).all()
+
+    segments = archive.segments_in_range(db, start, end)
+    if segments:
+        observations = archive.merge_newest_first(
+            observations,
+            archive.load_observations(segments, start, end, column_filters.matches, station=station),
+        )
+    return observations
+
+
+def month_key(value: datetime) -> str:
+    return archive.normalize_time(value).strftime("%Y-%m")
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(start: datetime) -> datetime:
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def _versions(db: Session, station_id: int) -> dict:
+    rows = db.query(ExportMonthVersion).filter(ExportMonthVersion.station_id.in_((station_id, _EVERY_MONTH[0])))
+    return {(row.station_id, row.month): row.version for row in rows}
+
+
+def _bump(db: Session, keys: set) -> None:
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(ExportMonthVersion)
+    # One upsert, incremented in SQL, so concurrent writers never reuse a version
+    # or collide creating the same month; sorted so they lock rows in one order
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ExportMonthVersion.station_id, ExportMonthVersion.month],
+            set_={"version": ExportMonthVersion.version + 1},
+        ),
+        [{"station_id": station_id, "month": month, "version": 1} for station_id, month in sorted(keys)],
+    )
+
+
+def month_versions(db: Session, station_id: int, months) -> str:
+    """Version tag of a station's months (``YYYY-MM``), for caches built from their rows"""
+    versions = _versions(db, station_id)
+    return ".".join(str(versions.get((station_id, month), 0)) for month in months) + f"-{versions.get(_EVERY_MONTH, 0)}"
+
+
+def mark_dirty(db: Session, positions) -> None:
+    """Retire the cached segments of the station months holding the given (station id, time) pairs"""
+    keys = {(station_id, month_key(value)) for station_id, value in positions if value is not None}
+    if keys:
+        _bump(db, keys)
+
+
+def invalidate_all(db: Session) -> None:
+    """Retire every cached segment, e.g. after derived columns were recomputed in bulk"""
+    _bump(db, {_EVERY_MONTH})
+
+
+def _segment_dir() -> str:
+    return os.path.join(settings.export_storage_dir, "segments")
+
+
+def _segment_index(directory: str) -> dict:
+    """Cached segment files by name prefix (station.month.version.digest.), with their row counts"""
+    index = {}
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith(".csv"):
+                prefix, _, rows = name[:-len(".csv")].rpartition(".")
+                index[f"{prefix}."] = (os.path.join(directory, name), int(rows))
+    return index
+
+
+def _data_bounds(db: Session, station: Station) -> tuple:
+    """Oldest and newest observation time of a station, hot or archived, as naive UTC"""
+    first, last = (
+        db.query(func.min(Observation.observation_time), func.max(Observation.observation_time))
+        .filter(Observation.station_id == station.id)
+        .one()
+    )
+    # Archive segments mix stations, so their range is an upper bound
+    archived = db.query(func.min(ArchiveSegment.range_start), func.max(ArchiveSegment.range_end)).one()
+    times = [archive.normalize_time(value) for value in (first, last, *archived) if value is not None]
+    if not times:
+        return None, None
+    return min(times), max(times)
+
+
+class ExportBody:
+    """A CSV export as ordered parts: bytes generated for this request and cached segment files"""
+
+    def __init__(self):
+        self.parts: List[object] = []
+        self.size = 0
+        self.row_count = 0
+
+    def add(self, part, size: int, rows: int) -> None:
+        self.parts.append(part)
+        self.size += size
+        self.row_count += rows
+
+    def __iter__(self) -> Iterator[bytes]:
+        for part in self.parts:
+            if isinstance(part, bytes):
+                if part:
+                    yield part
+                continue
+            with open(part, "rb") as segment:
+                while True:
+                    chunk = segment.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def write_to(self, output: BinaryIO) -> None:
+        for chunk in self:
+            output.write(chunk)
+
+
+def build_export(
+    db: Session,
+    station: Station,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    expressions: Optional[List[str]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> ExportBody:
+    """Assemble a station's export newest month first, including archived months.
+
+    Months entirely inside the range come from cached segment files, which
+    are written on first use and replaced once the month's version moves on.
+    Edge months the range only partly covers are generated for the request.
+    `fields` picks the columns, all of them by default. Raises
+    `filters.FilterError` for invalid filters and `fieldsets.FieldsetError`
+    for unknown fields.
+    """
+    expressions = list(expressions or [])
+    column_filters = filters.compile_filters(expressions)
+    fields = fieldsets.select(fields, EXPORT_FIELDS) if fields else EXPORT_FIELDS
+    start, end = archive.normalize_time(start_date), archive.normalize_time(end_date)
+    names = observer_names(db) if "observer_name" in fields else {}
+
+    body = ExportBody()
+    header = _BOM + _encode([[_HEADERS[field] for field in fields]])  # BOM for Excel compatibility
+    body.add(header, len(header), 0)
+
+    first, last = _data_bounds(db, station)
+    low = max(first, start) if first and start else first
+    high = min(last, end) if last and end else last
+    if first is None or low > high:
+        return body
+
+    # Segments depend on the month's rows, the filters, the observer names and the layout
+    versions = _versions(db, station.id)
+    digest = hashlib.sha256(json.dumps(
+        [SEGMENT_FORMAT, sorted(expressions), sorted(names.items()), list(fields)], ensure_ascii=False
+    ).encode()).hexdigest()[:16]
+    directory = _segment_dir()
+    index = _segment_index(directory)
+
+    month = _month_start(high)
+    while month >= _month_start(low):
+        last_tick = _next_month(month) - _ONE_TICK
+        if (start is None or start <= month) and (end is None or end >= last_tick):
+            key = month.strftime("%Y-%m")
+            version = f"{versions.get((station.id, key), 0)}-{versions.get(_EVERY_MONTH, 0)}"
+            prefix = f"{station.id}.{key}.{version}.{digest}."
+            cached = index.get(prefix)
+            if cached is not None:
+                path, rows = cached
+                os.utime(path)  # marks the segment as recently used for `purge_segments`
+            else:
+                observations = _load(db, station, month, last_tick, column_filters, fields)
+                rows = len(observations)
+                path = os.path.join(directory, f"{prefix}{rows}.csv")
+                _write_atomically(path, _encode(
+                    csv_row(observation, names.get(observation.observer_id) if names else None, fields)
+                    for observation in observations
+                ))
+            body.add(path, os.path.getsize(path), rows)
+        else:
+            observations = _load(
+                db, station, max(start, month) if start else month, min(end, last_tick) if end else last_tick,
+                column_filters, fields
+            )
+            data = _encode(
+                csv_row(observation, names.get(observation.observer_id) if names else None, fields)
+                for observation in observations
+            )
+            body.add(data, len(data), len(observations))
+        month = _month_start(month - timedelta(days=1))
+    return body
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{uuid.uuid4().hex}.part"
+    with open(partial, "wb") as output:
+        output.write(data)
+    os.replace(partial, path)
+
+
+def purge_segments(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete segment files for outdated month versions or unused for EXPORT_SEGMENT_MAX_AGE_DAYS"""
+    directory = _segment_dir()
+    if not os.path.isdir(directory):
+        return 0
+    now = (now or datetime.now(timezone.utc)).timestamp()
+    versions = {(row.station_id, row.month): row.version for row in db.query(ExportMonthVersion)}
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        idle = now - os.path.getmtime(path)
+        station_id, month, version = (name.split(".") + ["", "", ""])[:3]
+        key = (int(station_id) if station_id.isdigit() else None, month)
+        current = f"{versions.get(key, 0)}-{versions.get(_EVERY_MONTH, 0)}"
+        # Outdated files wait out a grace period in case an export is still streaming them
+        outdated = name.endswith(".part") or version != current
+        if (outdated and idle > _STALE_SEGMENT_GRACE) or idle > settings.export_segment_max_age_days * 86400:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def fingerprint(
+    station_id: int,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    expressions: List[str],
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """Stable key for an export request: same station, range, filters and columns, same fingerprint"""
+    start, end = archive.normalize_time(start_date), archive.normalize_time(end_date)
+    canonical = json.dumps({
+        "station": station_id,
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "filters": sorted(expression.strip() for expression in expressions),
+        "fields": fieldsets.select(fields, EXPORT_FIELDS) if fields else None,
+    })
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def file_path(job_id: str) -> str:
+    return os.path.join(settings.export_storage_dir, f"{job_id}.csv")
+
+
+def request_filters(job: ExportJob) -> List[str]:
+    return json.loads(job.filters) if job.filters else []
+
+
+def request_fields(job: ExportJob) -> Optional[List[str]]:
+    return json.loads(job.fields) if job.fields else None
+
+
+def _pending(db: Session, key: str) -> Optional[ExportJob]:
+    return db.query(ExportJob).filter(ExportJob.fingerprint == key, ExportJob.status.in_(PENDING)).first()
+
+
+def enqueue(
+    db: Session,
+    user: User,
+    station: Station,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    expressions: List[str],
+    fields: Optional[Sequence[str]] = None,
+) -> tuple:
+    """Create an export job, or return the pending identical one; the flag is True when created"""
+    key = fingerprint(station.id, start_date, end_date, expressions, fields)
+    job = _pending(db, key)
+    if job is not None:
+        return job, False
+
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        fingerprint=key,
+        requested_by=user.id,
+        station_id=station.id,
+        start_date=archive.normalize_time(start_date),
+        end_date=archive.normalize_time(end_date),
+        filters=json.dumps(list(expressions)) if expressions else None,
+        fields=json.dumps(list(fieldsets.select(fields, EXPORT_FIELDS))) if fields else None,
+        status="queued",
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request created the same job between our lookup and insert
+        db.rollback()
+        job = _pending(db, key)
+        if job is None:
+            raise
+        return job, False
+    return job, True
+
+
+def run_export(db: Session, job_id: str) -> Optional[str]:
+    """Generate one queued job's file; returns its final status, or None if it was not queued"""
+    claimed = db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == "queued")
+        .values(status="running", started_at=datetime.now(timezone.utc))
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+
+    job = db.get(ExportJob, job_id)
+    path = file_path(job_id)
+    partial = f"{path}.part"
+    try:
+        body = build_export(
+            db, db.get(Station, job.station_id), job.start_date, job.end_date, request_filters(job), request_fields(job)
+        )
+        os.makedirs(settings.export_storage_dir, exist_ok=True)
+        with open(partial, "wb") as output:
+            body.write_to(output)
+        os.replace(partial, path)
+        job.row_count = body.row_count
+        job.size_bytes = os.path.getsize(path)
+        job.status = "succeeded"
+    except Exception as e:
+        logger.exception("export %s failed", job_id)
+        db.rollback()
+        if os.path.exists(partial):
+            os.remove(partial)
+        job = db.get(ExportJob, job_id)
+        job.status = "failed"
+        job.error = f"{type(e).__name__}: {e}"[:2000]
+    job.finished_at = datetime.now(timezone.utc)
+    job.expires_at = job.finished_at + timedelta(seconds=settings.export_ttl_seconds)
+    db.commit()
+    return job.status
+
+
+def purge_expired(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete expired jobs with their files and fail abandoned ones; returns the jobs deleted"""
+    now = now or datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=settings.export_job_timeout_seconds)
+    abandoned = db.query(ExportJob).filter(
+        ExportJob.status.in_(PENDING),
+        or_(ExportJob.started_at < stale, and_(ExportJob.started_at.is_(None), ExportJob.created_at < stale)),
+    ).all()
+    for job in abandoned:
+        job.status = "failed"
+        job.error = "Export did not finish in time"
+        job.finished_at = now
+        job.expires_at = now + timedelta(seconds=settings.export_ttl_seconds)
+
+    expired = db.query(ExportJob).filter(ExportJob.expires_at < now).all()
+    for job in expired:
+        for path in (file_path(job.id), f"{file_path(job.id)}.part"):
+            if os.path.exists(path):
+                os.remove(path)
+        db.delete(job)
+    db.commit()
+    return len(expired)
+
+
+class ExportWorkerPool:
+    """Thread pool running export jobs, each in its own session"""
+
+    def __init__(self, session_factory: Callable[[], Session], workers: int):
+        self._session_factory = session_factory
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _run(self, job_id: str) -> Optional[str]:
+        with self._session_factory() as db:
+            try:
+                return run_export(db, job_id)
+            except Exception:
+                logger.exception("export worker could not run %s", job_id)
+                return None
+
+    def submit(self, job_id: str):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix="export")
+        return self._executor.submit(self._run, job_id)
+
+    def resume(self) -> int:
+        """Queue jobs left waiting by a previous process; returns how many"""
+        with self._session_factory() as db:
+            job_ids = [job_id for (job_id,) in db.query(ExportJob.id).filter(ExportJob.status == "queued")]
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; without `wait`, unstarted jobs stay queued for `resume`"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+_pool: Optional[ExportWorkerPool] = None
+
+
+def get_export_pool() -> ExportWorkerPool:
+    """Dependency returning the process-wide export worker pool"""
+    global _pool
+    if _pool is None:
+        from ..core.database import SessionLocal
+
+        _pool = ExportWorkerPool(SessionLocal, settings.export_workers)
+    return _pool
+
+
+def shutdown() -> None:
+    if _pool is not None:
+        _pool.shutdown(wait=False)
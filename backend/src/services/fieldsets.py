@@ -0,0 +1,87 @@
+"""Sparse fieldsets: ``fields=observation_time,temperature`` on reads.
+
+List and detail routes load only the requested columns (``load_only``, plus
+the id and whatever the route itself needs) and serialize them with a
+response model holding just those fields. Models are built once per
+distinct field set and cached, so a narrow table view neither reads the
+large ``notes`` text nor validates and sends the ~30 fields it did not ask
+for. CSV exports use the same parameter to choose their columns.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from ..models.observation_model import Observation
+from ..schemas.observation_schemas import ObservationResponse
+
+_COLUMNS = {column.name for column in Observation.__table__.columns}
+
+# Selectable response fields, in response order
+RESPONSE_FIELDS = tuple(ObservationResponse.model_fields)
+
+
+class FieldsetError(ValueError):
+    """A requested field does not exist"""
+
+
+def select(names: Iterable[str], allowed: Sequence[str]) -> Tuple[str, ...]:
+    """Validate field names against `allowed`; returns them in the order of `allowed`"""
+    requested = {name.strip() for name in names if name.strip()}
+    if not requested:
+        raise FieldsetError("fields must name at least one field")
+    unknown = requested - set(allowed)
+    if unknown:
+        raise FieldsetError(f"Unknown field '{sorted(unknown)[0]}'. Choose from: {', '.join(allowed)}")
+    return tuple(name for name in allowed if name in requested)
+
+
+def parse(raw: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated ``fields`` parameter; None when absent"""
+    return None if raw is None else select(raw.split(","), allowed)
+
+
+def response_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse ``fields`` for an observation response; the id is always included so clients can key rows"""
+    fields = parse(raw, RESPONSE_FIELDS)
+    if fields is None or "id" in fields:
+        return fields
+    return ("id",) + fields
+
+
+def wants_observer_name(fields: Optional[Sequence[str]]) -> bool:
+    return fields is None or "observer_name" in fields
+
+
+def load_columns(fields: Sequence[str], *extra: str) -> list:
+    """Observation attributes to load for `fields` and the `extra` columns the caller reads itself"""
+    names = {name for name in fields if name in _COLUMNS} | {"id", *extra}
+    if "observer_name" in fields:
+        names.add("observer_id")
+    return [getattr(Observation, name) for name in sorted(names)]
+
+
+@lru_cache(maxsize=256)
+def response_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """`ObservationResponse` cut down to `fields`"""
+    definitions = {
+        name: (ObservationResponse.model_fields[name].annotation, ObservationResponse.model_fields[name])
+        for name in fields
+    }
+    return create_model("ObservationFields", __config__=ConfigDict(from_attributes=True), **definitions)
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[response_model(fields)])
+
+
+def render(fields: Tuple[str, ...], data) -> Response:
+    """JSON response of one observation dict, or a list of them, holding only `fields`"""
+    if isinstance(data, list):
+        adapter = _list_adapter(fields)
+        body = adapter.dump_json(adapter.validate_python(data))
+    else:
+        body = response_model(fields).model_validate(data).model_dump_json().encode()
+    return Response(body, media_type="application/json")
@@ -0,0 +1,204 @@
+"""Typed filters over observation columns.
+
+Filters arrive as ``field:op[:value]`` strings, for example::
+
+    total_cloud_amount:gte:6
+    current_weather_code:between:60..69
+    low_cloud_type_code:in:7,8,9
+    precipitation:notnull
+
+Every filter becomes one SQL clause ANDed into the caller's query and an
+equivalent Python predicate for archived rows. Checking that the fields and
+operators of a request make sense is cached per query shape (the sequence of
+``(field, op)`` pairs), so repeated dashboards and exports only parse values.
+
+Weather codes are stored as text. Numeric comparisons on them are expanded
+into an ``IN`` list of the two-digit codes they cover (WMO present weather
+runs 00-99), which keeps them on the index instead of casting every row.
+"""
+import operator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, Float, Integer, String, and_
+
+OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "between", "in", "null", "notnull")
+
+# Codes that are numbers stored as text
+_CODE_COLUMNS = {"current_weather_code"}
+_CODE_RANGE = range(0, 100)
+
+_COMPARISONS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+class FilterError(ValueError):
+    """A filter that names an unknown field, operator or badly typed value"""
+
+
+@dataclass(frozen=True)
+class Filter:
+    field: str
+    op: str
+    raw: Optional[str]
+
+
+def _filterable_columns() -> dict:
+    from ..models.observation_model import Observation
+
+    return {
+        column.name: column
+        for column in Observation.__table__.columns
+        if isinstance(column.type, (Float, Integer, String, Boolean))
+        and column.name not in ("id", "station_id", "notes_search", "change_seq")
+    }
+
+
+def parse(expressions: Optional[Sequence[str]]) -> List[Filter]:
+    """Split raw ``field:op[:value]`` strings without validating them"""
+    filters = []
+    for expression in expressions or ():
+        field, _, rest = expression.partition(":")
+        op, _, raw = rest.partition(":")
+        filters.append(Filter(field.strip(), op.strip().lower(), raw.strip() if raw else None))
+    return filters
+
+
+@lru_cache(maxsize=256)
+def _plan(shape: Tuple[Tuple[str, str], ...]) -> Tuple[Tuple[object, str, Callable], ...]:
+    """Validate a query shape once: each step is (column, op, value converter)"""
+    columns = _filterable_columns()
+    steps = []
+    for field, op in shape:
+        column = columns.get(field)
+        if column is None:
+            raise FilterError(f"Unknown filter field '{field}'. Choose one of: {', '.join(sorted(columns))}")
+        if op not in OPERATORS:
+            raise FilterError(f"Unknown filter operator '{op}'. Choose one of: {', '.join(OPERATORS)}")
+        if isinstance(column.type, Boolean):
+            if op not in ("eq", "ne", "null", "notnull"):
+                raise FilterError(f"Operator '{op}' does not apply to yes/no field '{field}'")
+            convert = _to_bool
+        elif isinstance(column.type, Float):
+            convert = float
+        elif isinstance(column.type, Integer) or field in _CODE_COLUMNS:
+            convert = int
+        else:
+            if op not in ("eq", "ne", "in", "null", "notnull"):
+                raise FilterError(f"Operator '{op}' does not apply to text field '{field}'")
+            convert = str
+        steps.append((column, op, convert))
+    return tuple(steps)
+
+
+def _to_bool(raw: str) -> bool:
+    value = raw.lower()
+    if value in ("true", "1", "yes"):
+        return True
+    if value in ("false", "0", "no"):
+        return False
+    raise ValueError(raw)
+
+
+def _values(step, raw: Optional[str]):
+    column, op, convert = step
+    if op in ("null", "notnull"):
+        return None
+    if not raw:
+        raise FilterError(f"Filter '{column.name}:{op}' needs a value")
+    try:
+        if op == "between":
+            low, separator, high = raw.partition("..")
+            if not separator:
+                raise ValueError(raw)
+            return convert(low), convert(high)
+        if op == "in":
+            return tuple(convert(item) for item in raw.split(",") if item.strip())
+        return convert(raw)
+    except ValueError:
+        raise FilterError(f"Invalid value '{raw}' for filter '{column.name}:{op}'")
+
+
+def _code_strings(codes) -> List[str]:
+    """Stored spellings of numeric weather codes ("5" and "05")"""
+    spellings = set()
+    for code in codes:
+        spellings.update((str(code), f"{code:02d}"))
+    return sorted(spellings)
+
+
+def _code_matches(op: str, value) -> List[int]:
+    if op == "between":
+        return [code for code in _CODE_RANGE if value[0] <= code <= value[1]]
+    if op == "in":
+        return [code for code in _CODE_RANGE if code in value]
+    return [code for code in _CODE_RANGE if _COMPARISONS[op](code, value)]
+
+
+def _clause(step, value):
+    column, op, _ = step
+    if op == "null":
+        return column.is_(None)
+    if op == "notnull":
+        return column.isnot(None)
+    if column.name in _CODE_COLUMNS:
+        if op == "ne":
+            return and_(column.isnot(None), column.notin_(_code_strings([value])))
+        return column.in_(_code_strings(_code_matches(op, value)))
+    if op == "between":
+        return column.between(*value)
+    if op == "in":
+        return column.in_(value)
+    return _COMPARISONS[op](column, value)
+
+
+def _test(step, value, actual) -> bool:
+    column, op, _ = step
+    if op == "null":
+        return actual is None
+    if op == "notnull":
+        return actual is not None
+    if actual is None:
+        return False
+    if column.name in _CODE_COLUMNS:
+        try:
+            actual = int(actual)
+        except ValueError:
+            return False
+    if op == "between":
+        return value[0] <= actual <= value[1]
+    if op == "in":
+        return actual in value
+    return _COMPARISONS[op](actual, value)
+
+
+class CompiledFilters:
+    """Validated filters ready to apply to a query or to archived rows"""
+
+    def __init__(self, steps, values):
+        self._pairs = list(zip(steps, values))
+
+    def __bool__(self) -> bool:
+        return bool(self._pairs)
+
+    def apply(self, query):
+        for step, value in self._pairs:
+            query = query.filter(_clause(step, value))
+        return query
+
+    def matches(self, row) -> bool:
+        return all(_test(step, value, getattr(row, step[0].name, None)) for step, value in self._pairs)
+
+
+def compile_filters(expressions: Optional[Sequence[str]]) -> CompiledFilters:
+    """Validate filter strings and bind their values, raising `FilterError`"""
+    filters = parse(expressions)
+    steps = _plan(tuple((item.field, item.op) for item in filters))
+    return CompiledFilters(steps, [_values(step, item.raw) for step, item in zip(steps, filters)])
@@ -0,0 +1,81 @@
+"""Google OAuth2 authorization-code exchange on a shared async HTTP client.
+
+One ``httpx.AsyncClient`` serves every login for the life of the process
+(closed from the application lifespan). Logins therefore reuse kept-alive
+connections to Google and never block the event loop, and the client's
+timeouts and connection limits (``OAUTH_HTTP_*``) bound how much a slow
+Google can hold up. The endpoint URLs are settings, so tests can point
+them at a stand-in server.
+"""
+from typing import Optional
+
+import httpx
+
+from ..core.config import settings
+
+
+class OAuthError(Exception):
+    """Google rejected the exchange or answered with something unusable"""
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The process-wide outbound client, created on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.oauth_http_timeout_seconds, connect=settings.oauth_http_connect_timeout_seconds
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.oauth_http_max_connections,
+                max_keepalive_connections=settings.oauth_http_max_keepalive,
+                keepalive_expiry=settings.oauth_http_keepalive_seconds,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _json(response: httpx.Response, what: str) -> dict:
+    if response.status_code != 200:
+        raise OAuthError(f"{what} failed with HTTP {response.status_code}")
+    try:
+        return response.json()
+    except ValueError:
+        raise OAuthError(f"{what} returned invalid JSON")
+
+
+async def exchange_code(client: httpx.AsyncClient, code: str) -> dict:
+    """Trade an authorization code for tokens"""
+    response = await client.post(
+        settings.google_token_url,
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": settings.google_redirect_uri,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+        },
+        headers={"Accept": "application/json"},
+    )
+    token = _json(response, "Token exchange")
+    if "access_token" not in token:
+        raise OAuthError("Token exchange returned no access token")
+    return token
+
+
+async def fetch_userinfo(client: httpx.AsyncClient, access_token: str) -> dict:
+    response = await client.get(
+        settings.google_userinfo_url,
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    return _json(response, "User info request")
@@ -0,0 +1,184 @@
+"""Group commit for observation inserts.
+
+With ``GROUP_COMMIT_ENABLED`` set, `create_observation` hands its row to a
+`GroupCommitWriter` instead of committing on its own. The writer collects
+the creates that arrive within a short window (``GROUP_COMMIT_WINDOW_MS``
+or ``GROUP_COMMIT_MAX_ITEMS``, whichever comes first), inserts them with a
+single ``INSERT ... RETURNING`` and commits once, so a burst of submissions
+pays for one fsync instead of one each.
+
+Durability is unchanged: a caller's future resolves only after the
+transaction holding its row has committed. If the batch insert fails, the
+rows are retried one savepoint each in the same transaction so one bad row
+only fails its own caller.
+"""
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..core import metrics
+from ..core.config import settings
+from ..models.observation_model import Observation
+from . import psychrometrics, search
+from .observation_events import ObservationChange, observations_changed
+
+WINDOW_SIZE = "group_commit.window_size"
+COMMIT_SECONDS = "group_commit.commit_seconds"
+WAIT_SECONDS = "group_commit.wait_seconds"
+
+
+def _with_derived_columns(rows: List[dict]) -> List[dict]:
+    """Bulk inserts skip the mapper events, so fill the cached columns here"""
+    derived = psychrometrics.derive_rows(
+        [row.get("temperature") for row in rows],
+        [row.get("wet_bulb_temperature") for row in rows],
+    )
+    return [dict(row, **values, notes_search=search.search_text(row.get("notes"))) for row, values in zip(rows, derived)]
+
+
+def _as_dict(observation: Observation) -> dict:
+    return {column.name: getattr(observation, column.name) for column in Observation.__table__.columns}
+
+
+def insert_batch(db: Session, rows: List[dict]) -> List[object]:
+    """Insert rows in one transaction and commit once.
+
+    Returns, in input order, each row's stored column values or the
+    exception that kept it from being stored.
+    """
+    statement = insert(Observation).returning(Observation, sort_by_parameter_order=True)
+    values = _with_derived_columns(rows)
+    try:
+        try:
+            results = list(db.scalars(statement, values))
+        except SQLAlchemyError:
+            db.rollback()
+            results = []
+            for row in values:
+                try:
+                    with db.begin_nested():
+                        results.append(db.scalars(statement, [row]).one())
+                except SQLAlchemyError as e:
+                    results.append(e)
+
+        stored = [result for result in results if isinstance(result, Observation)]
+        observations_changed(db, [
+            ObservationChange(row.id, new_time=row.observation_time, observer_id=row.observer_id, station_id=row.station_id)
+            for row in stored
+        ])
+        results = [_as_dict(result) if isinstance(result, Observation) else result for result in results]
+        db.commit()
+        return results
+    except SQLAlchemyError as e:
+        db.rollback()
+        return [e] * len(rows)
+
+
+class GroupCommitWriter:
+    def __init__(self, session_factory: Callable[[], Session], window_ms: float, max_items: int):
+        self._session_factory = session_factory
+        self._window = window_ms / 1000
+        self._max_items = max_items
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, row: dict) -> dict:
+        """Queue one observation and wait until its window has committed"""
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        await self._queue.put((row, future))
+        try:
+            return await future
+        finally:
+            metrics.summary(WAIT_SECONDS).observe(time.perf_counter() - started)
+
+    async def _next_window(self) -> tuple:
+        """Collect one window of queued creates; the flag is False once closing"""
+        first = await self._queue.get()
+        if first is None:
+            return [], False
+        batch = [first]
+        deadline = self._loop.time() + self._window
+        while len(batch) < self._max_items:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, False
+            batch.append(item)
+        return batch, True
+
+    def _write(self, rows: List[dict]) -> List[object]:
+        db = self._session_factory()
+        try:
+            return insert_batch(db, rows)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        running = True
+        while running:
+            batch, running = await self._next_window()
+            if not batch:
+                break
+            metrics.summary(WINDOW_SIZE).observe(len(batch))
+            started = time.perf_counter()
+            try:
+                results = await run_in_threadpool(self._write, [row for row, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            metrics.summary(COMMIT_SECONDS).observe(time.perf_counter() - started)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        """Let queued creates finish, then stop the writer task"""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+
+_writer: Optional[GroupCommitWriter] = None
+
+
+def get_group_writer() -> Optional[GroupCommitWriter]:
+    """Dependency returning the process-wide writer, or None when group commit is off"""
+    global _writer
+    if not settings.group_commit_enabled:
+        return None
+    if _writer is None:
+        from ..core.database import SessionLocal
+
+        _writer = GroupCommitWriter(SessionLocal, settings.group_commit_window_ms, settings.group_commit_max_items)
+    return _writer
+
+
+async def shutdown() -> None:
+    if _writer is not None:
+        await _writer.close()
@@ -0,0 +1,357 @@
+"""Bulk ingestion of automatic weather station readings.
+
+Devices post batches of readings to ``POST /ingest/readings`` with their
+own token, as line protocol::
+
+    weather temperature=21.5,relative_humidity=80,pressure=1008.2 1718000000
+
+(measurement and tags are accepted and ignored, the timestamp is in
+``precision`` units and defaults to the time of receipt) or as NDJSON, one
+``{"time": ..., "temperature": ...}`` object per line.
+
+Parsed readings go to an `IngestBuffer`. It flushes everything pending
+every ``INGEST_FLUSH_INTERVAL_MS``, or as soon as ``INGEST_FLUSH_ROWS``
+are waiting, with one multi-row insert that skips readings already stored
+for the same device and time. A request returns only after its readings
+are committed, so a device can safely re-send a batch that failed.
+
+The buffer holds at most ``INGEST_MAX_PENDING_ROWS``. A batch that does not
+fit waits up to ``INGEST_ENQUEUE_TIMEOUT_SECONDS`` for room, then is
+refused (503 with Retry-After), which pushes the backpressure onto the
+devices instead of onto memory.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..core import metrics
+from ..core.cache import get_cache
+from ..core.config import settings
+from ..models.sensor_model import Device, SensorReading
+from . import archive
+
+logger = logging.getLogger(__name__)
+
+SENSOR_FIELDS = ("temperature", "relative_humidity", "pressure", "precipitation")
+_PRECISIONS = {"s": 1, "ms": 10 ** 3, "us": 10 ** 6, "ns": 10 ** 9}
+_MAX_CLOCK_SKEW = timedelta(days=1)
+
+FLUSH_ROWS = "ingest.flush_rows"
+FLUSH_SECONDS = "ingest.flush_seconds"
+WAIT_SECONDS = "ingest.wait_seconds"
+REJECTED = "ingest.rejected_batches"
+
+
+class IngestError(ValueError):
+    """A payload line could not be parsed"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+
+
+class IngestBusy(Exception):
+    """The buffer stayed full for the whole enqueue timeout"""
+
+
+def new_token() -> str:
+    return f"dev_{secrets.token_urlsafe(32)}"
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def authenticate(db: Session, token: str) -> Optional[Device]:
+    """The active device owning `token`, or None"""
+    device = db.query(Device).filter(Device.token_hash == hash_token(token)).first()
+    return device if device is not None and device.is_active else None
+
+
+def _check_time(line: int, value: datetime, received: datetime) -> datetime:
+    if value > received + _MAX_CLOCK_SKEW:
+        raise IngestError(line, "timestamp is in the future; check the precision")
+    return value
+
+
+def _epoch(line: int, value: float, scale: int, received: datetime) -> datetime:
+    try:
+        moment = datetime(1970, 1, 1) + timedelta(seconds=value / scale)
+    except OverflowError:
+        raise IngestError(line, "timestamp out of range")
+    return _check_time(line, moment, received)
+
+
+def _reading(line: int, values: Dict[str, object]) -> Dict[str, Optional[float]]:
+    unknown = set(values) - set(SENSOR_FIELDS)
+    if unknown:
+        raise IngestError(line, f"unknown field '{sorted(unknown)[0]}'. Choose from: {', '.join(SENSOR_FIELDS)}")
+    reading = {}
+    for field in SENSOR_FIELDS:
+        value = values.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise IngestError(line, f"field '{field}' must be a number")
+        reading[field] = None if value is None else float(value)
+    if all(value is None for value in reading.values()):
+        raise IngestError(line, "reading has no values")
+    return reading
+
+
+def parse_line_protocol(body: str, precision: str = "s", received: Optional[datetime] = None) -> List[dict]:
+    """Parse ``measurement[,tags] field=value[,field=value] [timestamp]`` lines"""
+    scale = _PRECISIONS[precision]
+    received = received or datetime.utcnow()
+    readings = []
+    for number, line in enumerate(body.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(" ")
+        if len(parts) not in (2, 3):
+            raise IngestError(number, "expected 'measurement fields [timestamp]'")
+        values = {}
+        for pair in parts[1].split(","):
+            field, _, raw = pair.partition("=")
+            try:
+                values[field] = float(raw[:-1] if raw.endswith("i") else raw)
+            except ValueError:
+                raise IngestError(number, f"field '{field}' must be a number")
+        if len(parts) == 3:
+            try:
+                moment = _epoch(number, int(parts[2]), scale, received)
+            except ValueError:
+                raise IngestError(number, "timestamp must be an integer")
+        else:
+            moment = received
+        readings.append({"time": moment, **_reading(number, values)})
+    return readings
+
+
+def parse_ndjson(body: str, received: Optional[datetime] = None) -> List[dict]:
+    """Parse one JSON object per line; ``time`` is ISO 8601 or epoch seconds"""
+    received = received or datetime.utcnow()
+    readings = []
+    for number, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            values = json.loads(line)
+        except ValueError:
+            raise IngestError(number, "invalid JSON")
+        if not isinstance(values, dict):
+            raise IngestError(number, "expected a JSON object")
+        raw_time = values.pop("time", None)
+        if raw_time is None:
+            moment = received
+        elif isinstance(raw_time, (int, float)) and not isinstance(raw_time, bool):
+            moment = _epoch(number, raw_time, 1, received)
+        elif isinstance(raw_time, str):
+            try:
+                moment = _check_time(number, archive.normalize_time(datetime.fromisoformat(raw_time)), received)
+            except ValueError:
+                raise IngestError(number, "time must be ISO 8601 or epoch seconds")
+        else:
+            raise IngestError(number, "time must be ISO 8601 or epoch seconds")
+        readings.append({"time": moment, **_reading(number, values)})
+    return readings
+
+
+def insert_readings(db: Session, rows: List[dict]) -> Set[Tuple[int, datetime]]:
+    """Insert rows and commit, skipping device/time pairs already stored; returns the pairs inserted"""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = (
+        dialect.insert(SensorReading)
+        .on_conflict_do_nothing(index_elements=["device_id", "time"])
+        .returning(SensorReading.device_id, SensorReading.time)
+    )
+    # Core executemany, batched into multi-row VALUES; skipped rows return nothing
+    inserted = {
+        (device_id, archive.normalize_time(moment))
+        for device_id, moment in db.connection().execute(statement, rows)
+    }
+    last_seen = {}
+    for row in rows:
+        last_seen[row["device_id"]] = max(row["time"], last_seen.get(row["device_id"], row["time"]))
+    for device_id, moment in last_seen.items():
+        db.execute(update(Device).where(Device.id == device_id).values(last_seen_at=moment))
+    db.commit()
+    return inserted
+
+
+class IngestBuffer:
+    def __init__(self, session_factory: Callable[[], Session], flush_interval_ms: float, flush_rows: int,
+                 max_pending_rows: int, enqueue_timeout: float):
+        self._session_factory = session_factory
+        self._interval = flush_interval_ms / 1000
+        self._flush_rows = flush_rows
+        self.max_pending_rows = max_pending_rows
+        self._enqueue_timeout = enqueue_timeout
+        self._pending: List[Tuple[List[dict], asyncio.Future]] = []
+        self.pending_rows = 0
+        self._changed: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self._closing = False
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._changed = asyncio.Condition()
+            self._closing = False
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, rows: List[dict]) -> int:
+        """Queue a batch and wait until it is committed; returns how many rows were new"""
+        if len(rows) > self.max_pending_rows:
+            raise ValueError("batch is larger than the ingest buffer")
+        self._ensure_running()
+        started = time.perf_counter()
+        future = self._loop.create_future()
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.pending_rows + len(rows) <= self.max_pending_rows),
+                    self._enqueue_timeout,
+                )
+            except asyncio.TimeoutError:
+                metrics.increment(REJECTED)
+                raise IngestBusy("ingest buffer is full")
+            self._pending.append((rows, future))
+            self.pending_rows += len(rows)
+            if self.pending_rows >= self._flush_rows:
+                self._changed.notify_all()
+        try:
+            return await future
+        finally:
+            metrics.summary(WAIT_SECONDS).observe(time.perf_counter() - started)
+
+    def _write(self, rows: List[dict]) -> Set[Tuple[int, datetime]]:
+        db = self._session_factory()
+        try:
+            return insert_readings(db, rows)
+        finally:
+            db.close()
+
+    async def _flush(self) -> None:
+        async with self._changed:
+            batches, self._pending = self._pending, []
+        if not batches:
+            return
+        rows = [row for batch, _ in batches for row in batch]
+        started = time.perf_counter()
+        try:
+            inserted = await run_in_threadpool(self._write, rows)
+            error = None
+        except Exception as e:
+            logger.exception("ingest flush of %d readings failed", len(rows))
+            error = e
+        metrics.summary(FLUSH_ROWS).observe(len(rows))
+        metrics.summary(FLUSH_SECONDS).observe(time.perf_counter() - started)
+        if error is None:
+            get_cache().invalidate("sensor_readings")
+
+        async with self._changed:
+            self.pending_rows -= len(rows)
+            self._changed.notify_all()
+        for batch, future in batches:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+                continue
+            new = 0
+            for row in batch:
+                key = (row["device_id"], row["time"])
+                if key in inserted:
+                    # A pair sent twice in one flush is new for its first sender only
+                    inserted.discard(key)
+                    new += 1
+            future.set_result(new)
+
+    async def _run(self) -> None:
+        while True:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: self._closing or len(self._pending) and self.pending_rows >= self._flush_rows),
+                        self._interval,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                closing = self._closing
+            await self._flush()
+            if closing:
+                return
+
+    async def close(self) -> None:
+        """Flush what is pending, then stop the flusher task"""
+        if self._task is None or self._task.done():
+            return
+        async with self._changed:
+            self._closing = True
+            self._changed.notify_all()
+        await self._task
+        self._task = None
+
+
+_buffer: Optional[IngestBuffer] = None
+
+
+def get_ingest_buffer() -> IngestBuffer:
+    """Dependency returning the process-wide ingest buffer"""
+    global _buffer
+    if _buffer is None:
+        from ..core.database import SessionLocal
+
+        _buffer = IngestBuffer(
+            SessionLocal,
+            settings.ingest_flush_interval_ms,
+            settings.ingest_flush_rows,
+            settings.ingest_max_pending_rows,
+            settings.ingest_enqueue_timeout_seconds,
+        )
+    return _buffer
+
+
+async def shutdown() -> None:
+    if _buffer is not None:
+        await _buffer.close()
+
+
+def latest_snapshot(db: Session, station_id: int) -> Optional[dict]:
+    """Latest sensor reading at a station, with that device's precipitation over the 24 hours before it"""
+    latest = (
+        db.query(SensorReading)
+        .filter(SensorReading.station_id == station_id)
+        .order_by(SensorReading.time.desc())
+        .first()
+    )
+    if latest is None:
+        return None
+    # Per device, so co-located rain gauges are not added together
+    precipitation_24h = (
+        db.query(func.sum(SensorReading.precipitation))
+        .filter(
+            SensorReading.device_id == latest.device_id,
+            SensorReading.time > latest.time - timedelta(hours=24),
+            SensorReading.time <= latest.time,
+        )
+        .scalar()
+    )
+    return {
+        "time": latest.time,
+        "temperature": latest.temperature,
+        "relative_humidity": latest.relative_humidity,
+        "pressure": latest.pressure,
+        "precipitation_24h": precipitation_24h,
+    }
@@ -0,0 +1,78 @@
+"""Periodic maintenance jobs run by the in-app scheduler"""
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import SQLiteBackend, get_cache
+from ..core.config import settings
+from ..core.scheduler import CronSchedule, IntervalSchedule, Job, Scheduler
+from ..models.station_model import Station
+from . import archive, climatology, dashboard, exports, sync
+
+
+def refresh_climatology(db: Session) -> int:
+    """Recompute the day-of-year baselines that writes marked stale"""
+    return climatology.refresh_stale(db)
+
+
+def archive_old_months(db: Session) -> int:
+    """Move months past the archive horizon into compressed segments"""
+    segments = archive.archive_observations(db, archive.archive_cutoff())
+    if segments:
+        get_cache().invalidate("observations")
+    return len(segments)
+
+
+def warm_dashboard(db: Session) -> None:
+    """Rebuild the cached dashboards so the first visitor after a write does not pay for it"""
+    for station in db.query(Station).filter(Station.is_active == True):
+        dashboard.cached_dashboard(db, station)
+
+
+def purge_expired_cache(db: Session) -> int:
+    """Drop expired rows from a SQLite cache file; other backends expire on their own"""
+    backend = get_cache().backend
+    return backend.purge_expired() if isinstance(backend, SQLiteBackend) else 0
+
+
+def purge_expired_exports(db: Session) -> int:
+    """Delete export files past their TTL, fail exports whose worker died and drop outdated month segments"""
+    return exports.purge_expired(db) + exports.purge_segments(db)
+
+
+def purge_sync_tombstones(db: Session) -> int:
+    """Forget deletions older than the sync retention period"""
+    return sync.purge_tombstones(db)
+
+
+def analyze_tables(db: Session) -> None:
+    """Refresh planner statistics for the tables that grow every day"""
+    for table in ("observations", "evaporation_intervals", "daily_evaporation"):
+        db.execute(text(f"ANALYZE {table}"))
+
+
+def default_jobs() -> List[Job]:
+    jitter = settings.scheduler_jitter_seconds
+    return [
+        Job("refresh_climatology", refresh_climatology, IntervalSchedule(600), jitter),
+        Job("warm_dashboard", warm_dashboard, IntervalSchedule(300), jitter),
+        Job("purge_expired_cache", purge_expired_cache, CronSchedule("15 * * * *"), jitter),
+        Job("purge_expired_exports", purge_expired_exports, CronSchedule("45 * * * *"), jitter),
+        Job("archive_old_months", archive_old_months, CronSchedule("30 3 * * *"), jitter),
+        Job("purge_sync_tombstones", purge_sync_tombstones, CronSchedule("50 3 * * *"), jitter),
+        Job("analyze_tables", analyze_tables, CronSchedule("0 4 * * 0"), jitter),
+    ]
+
+
+_scheduler = None
+
+
+def get_scheduler() -> Scheduler:
+    """Process-wide scheduler with the default jobs, created on first use"""
+    global _scheduler
+    if _scheduler is None:
+        from ..core.database import SessionLocal
+
+        _scheduler = Scheduler(SessionLocal, default_jobs())
+    return _scheduler
@@ -0,0 +1,39 @@
+"""Single place where observation writes fan out to derived data.
+
+Write paths call `observations_changed` after flushing their change and
+before committing, so derived tables are updated in the same transaction
+as the observation itself.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import climatology, evaporation, exports, quality, sync, user_stats
+
+
+@dataclass
+class ObservationChange:
+    id: int
+    old_time: Optional[datetime] = None  # None for an insert
+    new_time: Optional[datetime] = None  # None for a delete
+    observer_id: Optional[int] = None
+    station_id: Optional[int] = None
+
+
+def observations_changed(db: Session, changes: List[ObservationChange]) -> None:
+    if not changes:
+        return
+    evaporation.refresh_after_change(db, changes)
+    # (station, time) pairs of every position the observations left or moved to
+    positions = [
+        (change.station_id, time) for change in changes for time in (change.old_time, change.new_time)
+        if time is not None
+    ]
+    climatology.mark_stale(db, positions)
+    exports.mark_dirty(db, positions)
+    user_stats.refresh_after_change(db, changes)
+    quality.refresh_after_change(db, changes)
+    # Last, since it holds the change-sequence lock until the caller commits
+    sync.record_changes(db, changes)
@@ -0,0 +1,99 @@
+"""Single-statement update and delete of observations.
+
+Both operations check ownership in the WHERE clause and read back what the
+caller needs with RETURNING, including the observer's display name, instead
+of loading the ORM row first. When no row comes back the caller decides
+between 404 and 403 with `exists`; only that failure path costs an extra
+query. An update that moves ``observation_time`` also reads the old time
+first, since the observation hooks need it.
+"""
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..models.observation_model import Observation
+from ..models.user_model import User
+from . import psychrometrics, search
+from .observation_events import ObservationChange, observations_changed
+
+_observations = Observation.__table__
+_observer = User.__table__.alias("observer")
+
+# Same precedence as `formal_name or display_name or google_name`
+_observer_name = (
+    select(func.coalesce(
+        func.nullif(_observer.c.formal_name, ""),
+        func.nullif(_observer.c.display_name, ""),
+        _observer.c.google_name,
+    ))
+    .where(_observer.c.id == _observations.c.observer_id)
+    .scalar_subquery()
+    .label("observer_name")
+)
+
+
+def _owned(statement, observation_id: int, user: User):
+    statement = statement.where(_observations.c.id == observation_id)
+    if not user.is_admin:
+        statement = statement.where(_observations.c.observer_id == user.id)
+    return statement
+
+
+def exists(db: Session, observation_id: int) -> bool:
+    return db.execute(select(_observations.c.id).where(_observations.c.id == observation_id)).first() is not None
+
+
+def update_observation(db: Session, observation_id: int, user: User, values: dict) -> Optional[Row]:
+    """Apply `values` to an observation the user may edit and run the hooks.
+
+    Returns the updated row with ``observer_name``, or None when the
+    observation does not exist or belongs to someone else. Does not commit.
+    """
+    values = dict(values)
+    old_time = None
+    if "observation_time" in values:
+        old_time = db.execute(
+            _owned(select(_observations.c.observation_time), observation_id, user)
+        ).scalar()
+        if old_time is None:
+            return None
+
+    # Core statements skip the mapper events that maintain the cached columns
+    if "temperature" in values or "wet_bulb_temperature" in values:
+        values.update(psychrometrics.derived_expressions(
+            values.get("temperature", _observations.c.temperature),
+            values.get("wet_bulb_temperature", _observations.c.wet_bulb_temperature),
+        ))
+    if "notes" in values:
+        values["notes_search"] = search.search_text(values["notes"])
+
+    row = db.execute(
+        _owned(update(_observations), observation_id, user)
+        .values(**values)
+        .returning(*_observations.c, _observer_name)
+    ).first()
+    if row is None:
+        return None
+
+    observations_changed(db, [
+        ObservationChange(row.id, old_time or row.observation_time, row.observation_time, row.observer_id, row.station_id)
+    ])
+    return row
+
+
+def delete_observation(db: Session, observation_id: int, user: User) -> bool:
+    """Delete an observation the user may edit and run the hooks. Does not commit."""
+    row = db.execute(
+        _owned(delete(_observations), observation_id, user)
+        .returning(
+            _observations.c.id, _observations.c.observation_time, _observations.c.observer_id, _observations.c.station_id
+        )
+    ).first()
+    if row is None:
+        return False
+    observations_changed(db, [ObservationChange(
+        row.id, old_time=row.observation_time, observer_id=row.observer_id, station_id=row.station_id
+    )])
+    return True
@@ -0,0 +1,169 @@
+"""Psychrometric quantities derived from dry and wet bulb readings.
+
+All functions work on whole result sets at once: inputs are anything NumPy
+can turn into a float array (``None`` becomes NaN) and outputs are arrays of
+the same shape with NaN where a value cannot be derived.
+
+Formulas follow the WMO Guide to Meteorological Instruments (WMO-No. 8):
+Magnus saturation vapour pressure over water and the psychrometer equation
+for a ventilated (Assmann-type) psychrometer.
+"""
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+
+DERIVED_FIELDS = ("relative_humidity", "dew_point", "vapour_pressure")
+
+# Magnus coefficients over water, valid for -45 °C .. 60 °C
+_MAGNUS_A = 6.112  # hPa
+_MAGNUS_B = 17.62
+_MAGNUS_C = 243.12  # °C
+
+
+def _as_array(values) -> np.ndarray:
+    """Float array with NaN in place of None"""
+    if isinstance(values, np.ndarray):
+        return values.astype(float, copy=False)
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+def saturation_vapour_pressure(temperature) -> np.ndarray:
+    """Saturation vapour pressure over water (hPa)"""
+    t = _as_array(temperature)
+    return _MAGNUS_A * np.exp(_MAGNUS_B * t / (_MAGNUS_C + t))
+
+
+def vapour_pressure(temperature, wet_bulb_temperature, pressure: Optional[float] = None) -> np.ndarray:
+    """Actual vapour pressure (hPa) from the psychrometer equation"""
+    t = _as_array(temperature)
+    tw = _as_array(wet_bulb_temperature)
+    p = settings.station_pressure_hpa if pressure is None else pressure
+    psychrometer_coefficient = 6.53e-4 * (1 + 0.000944 * tw)
+    e = saturation_vapour_pressure(tw) - psychrometer_coefficient * p * (t - tw)
+    return np.where(e > 0, e, np.nan)
+
+
+def relative_humidity(temperature, wet_bulb_temperature, pressure: Optional[float] = None) -> np.ndarray:
+    """Relative humidity (%) clipped to 0-100"""
+    t = _as_array(temperature)
+    e = vapour_pressure(t, wet_bulb_temperature, pressure)
+    return np.clip(100 * e / saturation_vapour_pressure(t), 0, 100)
+
+
+def dew_point(vapour_pressure_hpa) -> np.ndarray:
+    """Dew point (°C) from actual vapour pressure, inverting the Magnus formula"""
+    e = _as_array(vapour_pressure_hpa)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gamma = np.log(e / _MAGNUS_A)
+    return _MAGNUS_C * gamma / (_MAGNUS_B - gamma)
+
+
+def derive(temperature, wet_bulb_temperature, pressure: Optional[float] = None) -> dict:
+    """Compute every derived field for a whole result set in one pass"""
+    t = _as_array(temperature)
+    tw = _as_array(wet_bulb_temperature)
+    with np.errstate(invalid="ignore"):
+        e = vapour_pressure(t, tw, pressure)
+        rh = np.clip(100 * e / saturation_vapour_pressure(t), 0, 100)
+        td = dew_point(e)
+    return {
+        "relative_humidity": np.round(rh, 1),
+        "dew_point": np.round(td, 2),
+        "vapour_pressure": np.round(e, 2),
+    }
+
+
+def to_optional(values: np.ndarray) -> List[Optional[float]]:
+    """Convert an array to plain floats with None in place of NaN"""
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def derive_rows(temperatures: Sequence, wet_bulb_temperatures: Sequence, pressure: Optional[float] = None) -> List[dict]:
+    """Row-oriented variant of `derive`, ready for bulk inserts and updates"""
+    columns = {name: to_optional(values) for name, values in derive(temperatures, wet_bulb_temperatures, pressure).items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def fill_missing(rows: Iterable, pressure: Optional[float] = None) -> None:
+    """Set derived fields on rows that have readings but no cached values yet"""
+    pending = [
+        row for row in rows
+        if getattr(row, "relative_humidity", None) is None
+        and row.temperature is not None
+        and row.wet_bulb_temperature is not None
+    ]
+    if not pending:
+        return
+    derived = derive_rows(
+        [row.temperature for row in pending],
+        [row.wet_bulb_temperature for row in pending],
+        pressure,
+    )
+    for row, values in zip(pending, derived):
+        for name, value in values.items():
+            setattr(row, name, value)
+
+
+def derived_expressions(temperature, wet_bulb_temperature, pressure: Optional[float] = None) -> dict:
+    """SQL counterpart of `derive` for UPDATE statements.
+
+    The inputs are column expressions or bound values, so a single UPDATE
+    can recompute the cached fields when only one of the readings changes.
+    """
+    from sqlalchemy import Float, Numeric, case, cast, func, literal
+    from sqlalchemy.sql import ClauseElement
+
+    def saturation(t):
+        return _MAGNUS_A * func.exp(_MAGNUS_B * t / (_MAGNUS_C + t))
+
+    def rounded(expression, digits):
+        return func.round(cast(expression, Numeric), digits)
+
+    def expression(value):
+        return value if isinstance(value, ClauseElement) else literal(value, Float)
+
+    t = expression(temperature)
+    tw = expression(wet_bulb_temperature)
+    p = settings.station_pressure_hpa if pressure is None else pressure
+    e = saturation(tw) - 6.53e-4 * (1 + 0.000944 * tw) * p * (t - tw)
+    rh = 100 * e / saturation(t)
+    gamma = func.ln(e / _MAGNUS_A)
+    return {
+        "relative_humidity": case(
+            (e <= 0, None), (rh > 100, 100.0), (rh < 0, 0.0), else_=rounded(rh, 1)
+        ),
+        "dew_point": case((e > 0, rounded(_MAGNUS_C * gamma / (_MAGNUS_B - gamma), 2)), else_=None),
+        "vapour_pressure": case((e > 0, rounded(e, 2)), else_=None),
+    }
+
+
+def recompute_cached(db, pressure: Optional[float] = None, batch_size: int = 5000) -> int:
+    """Recompute the cached humidity columns for every observation, e.g. after
+    the station pressure setting changes. Works in id-ordered batches."""
+    from sqlalchemy import update
+    from ..models.observation_model import Observation  # the model module imports this one
+
+    updated = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Observation.id, Observation.temperature, Observation.wet_bulb_temperature, Observation.updated_at)
+            .filter(Observation.id > last_id)
+            .order_by(Observation.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        ids, temperatures, wet_bulbs, updated_ats = zip(*batch)
+        rows = derive_rows(temperatures, wet_bulbs, pressure)
+        # Derived columns are not an edit, so updated_at is written back unchanged
+        db.execute(update(Observation), [
+            dict(row, id=id_, updated_at=updated_at) for id_, row, updated_at in zip(ids, rows, updated_ats)
+        ])
+        db.commit()
+        updated += len(batch)
+        last_id = ids[-1]
+    return updated
@@ -0,0 +1,230 @@
+"""Data-quality checks on observations.
+
+Rules, each stored as a row in ``qc_flags`` while an observation fails it:
+
+* ``wet_bulb_above_dry_bulb`` - the wet bulb reads warmer than the dry bulb;
+* ``cloud_amount_exceeds_total`` - a high, middle or low cloud amount is
+  larger than ``total_cloud_amount``;
+* ``evaporation_level_missing`` - a pan cleaning, refill or removal is
+  ticked without the level measured after it;
+* ``temperature_spike`` - temperature moved more than
+  ``QC_MAX_TEMPERATURE_CHANGE`` since the station's previous temperature
+  reading, if that reading is at most ``QC_SPIKE_WINDOW_HOURS`` older.
+
+`evaluate` checks a batch of rows with NumPy. `scan` streams the whole hot
+history through it in chunks of ``QC_SCAN_CHUNK_ROWS`` and replaces every
+flag; each write re-checks the changed observations and the readings after
+them (`refresh_after_change`). Changing the thresholds takes effect for
+existing rows on the next scan. Archived rows are not checked.
+"""
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, desc, insert, or_, select
+from sqlalchemy.orm import Session
+
+from ..core import metrics
+from ..core.config import settings
+from ..models.observation_model import Observation
+from ..models.quality_model import QCFlag
+from .archive import normalize_time
+
+WET_BULB_ABOVE_DRY_BULB = "wet_bulb_above_dry_bulb"
+CLOUD_AMOUNT_EXCEEDS_TOTAL = "cloud_amount_exceeds_total"
+EVAPORATION_LEVEL_MISSING = "evaporation_level_missing"
+TEMPERATURE_SPIKE = "temperature_spike"
+RULES = (WET_BULB_ABOVE_DRY_BULB, CLOUD_AMOUNT_EXCEEDS_TOTAL, EVAPORATION_LEVEL_MISSING, TEMPERATURE_SPIKE)
+
+EPOCH = datetime(1970, 1, 1)
+_CLOUD_LAYERS = ("high", "middle", "low")
+_MAINTENANCE = ("cleaned", "added", "reduced")
+
+# Narrow projection used by both the incremental and the batch paths
+_QC_COLUMNS = (
+    Observation.id,
+    Observation.station_id,
+    Observation.observation_time,
+    Observation.temperature,
+    Observation.wet_bulb_temperature,
+    Observation.total_cloud_amount,
+    Observation.high_cloud_amount,
+    Observation.middle_cloud_amount,
+    Observation.low_cloud_amount,
+    Observation.has_cleaned_evaporation_pan,
+    Observation.cleaned_evaporation_level,
+    Observation.has_added_evaporation_water,
+    Observation.added_evaporation_level,
+    Observation.has_reduced_evaporation_water,
+    Observation.reduced_evaporation_level,
+)
+
+# Last temperature reading before a batch: (station_id, epoch seconds, temperature)
+Reading = Tuple[int, float, float]
+
+
+def _seconds(value: datetime) -> float:
+    return (normalize_time(value) - EPOCH).total_seconds()
+
+
+def evaluate(rows: Sequence, previous: Optional[Reading] = None) -> Tuple[List[dict], Optional[Reading]]:
+    """Flags of `rows`, which are `_QC_COLUMNS` tuples ordered by station, time and id
+
+    `previous` is the temperature reading just before the first row, for
+    the spike rule. Returns the flags and the last temperature reading, to
+    pass as `previous` for the next batch.
+    """
+    if not rows:
+        return [], previous
+    (ids, station_ids, times, temperature, wet_bulb, total,
+     high, middle, low, has_cleaned, cleaned, has_added, added, has_reduced, reduced) = zip(*rows)
+    # None becomes NaN, and every comparison with NaN is false
+    temperature = np.array(temperature, dtype=float)
+    wet_bulb = np.array(wet_bulb, dtype=float)
+    total = np.array(total, dtype=float)
+    layers = np.array([high, middle, low], dtype=float)
+    ticked = np.array([has_cleaned, has_added, has_reduced], dtype=bool)
+    levels = np.array([cleaned, added, reduced], dtype=float)
+
+    flags = []
+
+    def add(mask, rule, detail):
+        for index in np.flatnonzero(mask):
+            flags.append({
+                "observation_id": ids[index],
+                "rule": rule,
+                "station_id": station_ids[index],
+                "observation_time": times[index],
+                "detail": detail(index),
+            })
+
+    add(wet_bulb > temperature, WET_BULB_ABOVE_DRY_BULB,
+        lambda i: f"wet bulb {wet_bulb[i]:g} °C above dry bulb {temperature[i]:g} °C")
+
+    exceeds = layers > total
+    add(exceeds.any(axis=0), CLOUD_AMOUNT_EXCEEDS_TOTAL, lambda i: ", ".join(
+        f"{_CLOUD_LAYERS[layer]} {layers[layer, i]:g}" for layer in np.flatnonzero(exceeds[:, i])
+    ) + f" above total {total[i]:g}")
+
+    missing = ticked & np.isnan(levels)
+    add(missing.any(axis=0), EVAPORATION_LEVEL_MISSING, lambda i: ", ".join(
+        f"{_MAINTENANCE[step]} level missing" for step in np.flatnonzero(missing[:, i])
+    ))
+
+    # Spikes compare each temperature reading with the station's previous one
+    readings = np.flatnonzero(~np.isnan(temperature))
+    if len(readings):
+        stations = np.array([station_ids[i] for i in readings])
+        seconds = np.array([_seconds(times[i]) for i in readings])
+        values = temperature[readings]
+        if previous is not None:
+            stations = np.concatenate(([previous[0]], stations))
+            seconds = np.concatenate(([previous[1]], seconds))
+            values = np.concatenate(([previous[2]], values))
+        step = np.abs(np.diff(values))
+        gap = np.diff(seconds)
+        spike = (
+            (stations[1:] == stations[:-1])
+            & (gap <= settings.qc_spike_window_hours * 3600)
+            & (step > settings.qc_max_temperature_change)
+        )
+        # Difference k ends at reading k, or k + 1 when there is no carried-over reading in front
+        shift = 0 if previous is not None else 1
+        spikes = {readings[k + shift]: (step[k], gap[k]) for k in np.flatnonzero(spike)}
+        mask = np.zeros(len(rows), dtype=bool)
+        mask[list(spikes)] = True
+        add(mask, TEMPERATURE_SPIKE,
+            lambda i: f"temperature changed {spikes[i][0]:.1f} °C in {spikes[i][1] / 3600:.1f} h")
+        previous = (int(stations[-1]), float(seconds[-1]), float(values[-1]))
+    return flags, previous
+
+
+def _insert(db: Session, flags: List[dict], batch_size: int = 5000) -> None:
+    for start in range(0, len(flags), batch_size):
+        db.execute(insert(QCFlag), flags[start:start + batch_size])
+
+
+def scan(db: Session, station_id: Optional[int] = None) -> dict:
+    """Check the whole hot history, or one station's, and replace its flags; commits"""
+    started = time.perf_counter()
+    query = select(*_QC_COLUMNS).order_by(Observation.station_id, Observation.observation_time, Observation.id)
+    if station_id is not None:
+        query = query.where(Observation.station_id == station_id)
+
+    flags = []
+    previous = None
+    scanned = 0
+    result = db.execute(query.execution_options(yield_per=settings.qc_scan_chunk_rows))
+    for chunk in result.partitions():
+        chunk_flags, previous = evaluate(chunk, previous)
+        flags.extend(chunk_flags)
+        scanned += len(chunk)
+
+    stale = delete(QCFlag)
+    if station_id is not None:
+        stale = stale.where(QCFlag.station_id == station_id)
+    db.execute(stale)
+    _insert(db, flags)
+    db.commit()
+
+    duration = time.perf_counter() - started
+    metrics.summary("qc.scan_seconds").observe(duration)
+    return {
+        "scanned": scanned,
+        "flagged": dict(Counter(flag["rule"] for flag in flags)),
+        "duration_seconds": round(duration, 3),
+    }
+
+
+def _previous_reading(db: Session, row) -> Optional[Reading]:
+    previous = (
+        db.query(Observation.station_id, Observation.observation_time, Observation.temperature)
+        .filter(Observation.station_id == row.station_id, Observation.temperature.isnot(None))
+        .filter(or_(
+            Observation.observation_time < row.observation_time,
+            and_(Observation.observation_time == row.observation_time, Observation.id < row.id),
+        ))
+        .order_by(desc(Observation.observation_time), desc(Observation.id))
+        .first()
+    )
+    if previous is None:
+        return None
+    return previous.station_id, _seconds(previous.observation_time), previous.temperature
+
+
+def _next_reading_id(db: Session, station_id: int, observation_id: int, observation_time) -> Optional[int]:
+    return (
+        db.query(Observation.id)
+        .filter(Observation.station_id == station_id, Observation.temperature.isnot(None))
+        .filter(or_(
+            Observation.observation_time > observation_time,
+            and_(Observation.observation_time == observation_time, Observation.id > observation_id),
+        ))
+        .order_by(Observation.observation_time, Observation.id)
+        .limit(1)
+        .scalar()
+    )
+
+
+def refresh_after_change(db: Session, changes: List) -> None:
+    """Re-check changed observations, and the readings whose previous reading changed, in the caller's transaction"""
+    deleted = {change.id for change in changes if change.new_time is None}
+    checked = set()
+    for change in changes:
+        if change.new_time is not None:
+            checked.add(change.id)
+        for position in {change.old_time, change.new_time} - {None}:
+            next_id = _next_reading_id(db, change.station_id, change.id, position)
+            if next_id is not None:
+                checked.add(next_id)
+    checked -= deleted
+
+    db.execute(delete(QCFlag).where(QCFlag.observation_id.in_(checked | deleted)))
+    flags = []
+    for observation_id in checked:
+        row = db.execute(select(*_QC_COLUMNS).where(Observation.id == observation_id)).first()
+        if row is not None:
+            flags.extend(evaluate([row], _previous_reading(db, row))[0])
+    _insert(db, flags)
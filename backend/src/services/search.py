@@ -0,0 +1,144 @@
+"""Full-text search over observation notes.
+
+Neither Postgres' built-in parsers nor SQLite FTS5's default tokenizer split
+Chinese text into words, so notes are pre-tokenized in Python into
+``observations.notes_search``: Latin words stay whole, CJK runs become
+overlapping character bigrams (霧雷雨 -> 霧雷 雷雨) plus single characters so
+one-character queries still match. The database indexes that column with
+its simplest tokenizer:
+
+* Postgres: a generated ``notes_tsv`` tsvector column (``'simple'`` config)
+  with a GIN index.
+* SQLite: an external-content FTS5 table kept in sync by triggers.
+
+Queries are tokenized the same way, so every term must match.
+"""
+import html
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, table
+
+FTS_TABLE = "observation_notes_fts"
+
+_TOKEN = re.compile(r"[぀-ヿ㐀-䶿一-鿿豈-﫿]+|[^\W_]+", re.UNICODE)
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿豈-﫿]")
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+_POSTGRES_DDL = (
+    "ALTER TABLE observations ADD COLUMN IF NOT EXISTS notes_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(notes_search, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_observations_notes_tsv ON observations USING gin (notes_tsv)",
+)
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    "USING fts5(notes_search, content='observations', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON observations BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, notes_search) VALUES (new.id, new.notes_search); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON observations BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, notes_search) VALUES ('delete', old.id, old.notes_search); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF notes_search ON observations BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, notes_search) VALUES ('delete', old.id, old.notes_search); "
+    f"INSERT INTO {FTS_TABLE}(rowid, notes_search) VALUES (new.id, new.notes_search); END",
+)
+
+
+def tokens(text: Optional[str]) -> List[str]:
+    """Split a query into terms: lower-cased words and CJK character bigrams"""
+    if not text:
+        return []
+    result = []
+    for run in _TOKEN.findall(text.lower()):
+        if _CJK.match(run) and len(run) > 1:
+            result.extend(run[index:index + 2] for index in range(len(run) - 1))
+        else:
+            result.append(run)
+    return result
+
+
+def index_tokens(text: Optional[str]) -> List[str]:
+    """Terms stored for a text: the query terms plus every single CJK character"""
+    if not text:
+        return []
+    return tokens(text) + [char for char in text if _CJK.match(char)]
+
+
+def search_text(notes: Optional[str]) -> Optional[str]:
+    """Value stored in notes_search for the given notes"""
+    terms = index_tokens(notes)
+    return " ".join(terms) if terms else None
+
+
+def create_search_structures(connection) -> None:
+    """Create the dialect-specific index over notes_search"""
+    statements = {"postgresql": _POSTGRES_DDL, "sqlite": _SQLITE_DDL}.get(connection.dialect.name, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_structures(connection) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def apply_search(query, q: str) -> Tuple[object, object]:
+    """Restrict an Observation query to notes matching every term of `q`.
+
+    Returns the filtered query and a relevance expression where larger
+    means more relevant. `q` must contain at least one term.
+    """
+    from ..models.observation_model import Observation  # the model module imports this one
+
+    terms = tokens(q)
+    if not terms:
+        raise ValueError("The search query contains no words")
+    dialect = query.session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery("simple", " & ".join(f"'{term}'" for term in terms))
+        vector = literal_column("observations.notes_tsv")
+        return query.filter(vector.op("@@")(ts_query)), func.ts_rank(vector, ts_query)
+
+    if dialect == "sqlite":
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        query = query.join(_fts, _fts.c.rowid == Observation.id).filter(
+            literal_column(FTS_TABLE).op("MATCH")(match)
+        )
+        # FTS5 rank is bm25, where lower is better
+        return query, -_fts.c.rank
+
+    # Without a text index fall back to a scan of the pre-tokenized column
+    for term in terms:
+        query = query.filter(Observation.notes_search.contains(term))
+    return query, literal_column("0")
+
+
+def matches(row, q: str) -> bool:
+    """Python equivalent of `apply_search` for archived rows"""
+    row_terms = set(index_tokens(row.notes))
+    return all(term in row_terms for term in tokens(q))
+
+
+def snippet(notes: Optional[str], q: str, width: int = 80) -> Optional[str]:
+    """HTML-escaped excerpt of the notes around the first match, matches wrapped in <mark>"""
+    if not notes:
+        return None
+    phrases = sorted({phrase.lower() for phrase in _TOKEN.findall(q)}, key=len, reverse=True)
+    if not phrases:
+        return None
+    pattern = re.compile("|".join(re.escape(phrase) for phrase in phrases), re.IGNORECASE)
+
+    first = pattern.search(notes)
+    start = max(0, (first.start() if first else 0) - width // 4)
+    end = min(len(notes), start + width)
+    excerpt = notes[start:end]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(excerpt):
+        parts.append(html.escape(excerpt[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(excerpt[position:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(notes) else "")
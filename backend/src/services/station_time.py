@@ -0,0 +1,26 @@
+"""Conversions between stored timestamps and the station's local calendar"""
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from ..core.config import settings
+
+
+@lru_cache(maxsize=None)
+def station_zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def local_time(value: datetime) -> datetime:
+    """Station-local wall time as a naive datetime.
+
+    Naive values are UTC, which is how timezone-aware input ends up in
+    databases without a timestamptz type.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(station_zone(settings.station_timezone)).replace(tzinfo=None)
+
+
+def local_date(value: datetime) -> date:
+    return local_time(value).date()
@@ -0,0 +1,42 @@
+"""Station lookup shared by the station-scoped routes and derived data.
+
+Requests that name no station read and write the default station
+(``DEFAULT_STATION_CODE``), so single-site deployments and older clients
+keep working unchanged. Archive segments written before stations existed
+hold rows without a ``station_id``; those rows belong to the default
+station too.
+"""
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.station_model import Station
+
+
+def default_station(db: Session) -> Station:
+    return db.query(Station).filter(Station.code == settings.default_station_code).one()
+
+
+def get_station(db: Session, station_id: Optional[int]) -> Optional[Station]:
+    """The requested station, the default one when `station_id` is None, or None if it does not exist"""
+    if station_id is None:
+        return default_station(db)
+    return db.get(Station, station_id)
+
+
+def is_default(station: Station) -> bool:
+    return station.code == settings.default_station_code
+
+
+def station_id_of(row, default_id: int) -> int:
+    """Station of a hot or archived row"""
+    station_id = getattr(row, "station_id", None)
+    return default_id if station_id is None else station_id
+
+
+def belongs(row, station: Station) -> bool:
+    station_id = getattr(row, "station_id", None)
+    if station_id is None:
+        return is_default(station)
+    return station_id == station.id
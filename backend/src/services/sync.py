@@ -0,0 +1,186 @@
+"""Change feed of observations for clients that keep a local copy.
+
+Every transaction that writes observations takes the next number from the
+``observations`` change sequence and stamps it on the rows it inserted or
+updated (``observations.change_seq``) and on a tombstone per row it deleted.
+Taking the number locks the counter row until commit, so numbers become
+visible in order: once a client has seen number N, no write with a number
+at or below N can still appear. ``GET /observations/changes?since=<token>``
+is then a range scan on ``(station_id, change_seq)`` over the rows and the
+tombstones, and costs O(changes) rather than O(history).
+
+Tokens are opaque to clients. ``N`` means "everything through N";
+``N.kind.id`` resumes a page that stopped inside the writes of number N.
+Tombstones are kept for ``SYNC_TOMBSTONE_RETENTION_DAYS``; a client whose
+token predates the purged ones must fetch everything again (410).
+
+The feed covers the hot table only: a full sync returns no archived
+observations, and moving rows into archive segments is neither a change nor
+a deletion. Restoring a segment stamps its rows with a new number, so they
+reach clients as changes.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.observation_model import Observation
+from ..models.station_model import Station
+from ..models.sync_model import ChangeSequence, ObservationTombstone
+
+OBSERVATIONS = "observations"
+
+# Within one sequence number, changed rows are listed before tombstones
+_ROW = 0
+_TOMBSTONE = 1
+
+# Stamping a change number is bookkeeping, not an edit: keep updated_at out of its onupdate
+_KEEP_UPDATED_AT = {"updated_at": Observation.__table__.c.updated_at}
+
+
+class SyncError(ValueError):
+    """The token is malformed"""
+
+
+class SyncExpired(Exception):
+    """Tombstones the token still needs were purged"""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    seq: int
+    kind: int = _TOMBSTONE  # Everything at `seq` seen
+    id: int = 0
+
+    @classmethod
+    def parse(cls, token: Optional[str]) -> "Cursor":
+        if not token:
+            return cls(0)
+        try:
+            parts = [int(part) for part in token.split(".")]
+        except ValueError:
+            raise SyncError(f"Invalid sync token '{token}'")
+        if len(parts) == 1 and parts[0] >= 0:
+            return cls(parts[0])
+        if len(parts) == 3 and parts[0] >= 0 and parts[1] in (_ROW, _TOMBSTONE):
+            return cls(*parts)
+        raise SyncError(f"Invalid sync token '{token}'")
+
+    def __str__(self) -> str:
+        return str(self.seq) if self.kind == _TOMBSTONE and self.id == 0 else f"{self.seq}.{self.kind}.{self.id}"
+
+
+def next_sequence(db: Session) -> int:
+    """Take the next change number; holds the counter row lock until the transaction ends"""
+    return db.execute(
+        update(ChangeSequence)
+        .where(ChangeSequence.name == OBSERVATIONS)
+        .values(value=ChangeSequence.value + 1)
+        .returning(ChangeSequence.value)
+    ).scalar_one()
+
+
+def record_changes(db: Session, changes) -> None:
+    """Stamp changed observations and leave tombstones for deleted ones, under one new number"""
+    seq = next_sequence(db)
+    written = [change.id for change in changes if change.new_time is not None]
+    if written:
+        db.execute(update(Observation.__table__).where(Observation.id.in_(written)).values(change_seq=seq, **_KEEP_UPDATED_AT))
+    deleted = [
+        dict(observation_id=change.id, station_id=change.station_id, observation_time=change.old_time, change_seq=seq)
+        for change in changes if change.new_time is None
+    ]
+    if deleted:
+        db.execute(insert(ObservationTombstone), deleted)
+
+
+def mark_changed(db: Session, observation_ids) -> None:
+    """Stamp observations changed under one new number, e.g. rows restored from the archive"""
+    seq = next_sequence(db)
+    db.execute(update(Observation.__table__).where(Observation.id.in_(observation_ids)).values(change_seq=seq, **_KEEP_UPDATED_AT))
+
+
+def touch_all(db: Session) -> None:
+    """Mark every observation changed, e.g. after derived columns were recomputed in bulk"""
+    seq = next_sequence(db)
+    db.execute(update(Observation.__table__).values(change_seq=seq, **_KEEP_UPDATED_AT))
+
+
+def purge_tombstones(db: Session, now: Optional[datetime] = None) -> int:
+    """Drop tombstones past the retention period; tokens older than the newest dropped one expire"""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.sync_tombstone_retention_days)
+    through = db.query(func.max(ObservationTombstone.change_seq)).filter(ObservationTombstone.deleted_at < cutoff).scalar()
+    if through is None:
+        return 0
+    # Whole sequence numbers only, so no token points into a half-purged number
+    purged = db.execute(delete(ObservationTombstone).where(ObservationTombstone.change_seq <= through)).rowcount
+    db.execute(
+        update(ChangeSequence)
+        .where(ChangeSequence.name == OBSERVATIONS, ChangeSequence.purged_through < through)
+        .values(purged_through=through)
+    )
+    db.commit()
+    return purged
+
+
+def _after(seq_column, id_column, cursor: Cursor, kind: int):
+    later = seq_column > cursor.seq
+    if cursor.kind < kind:
+        return or_(later, seq_column == cursor.seq)
+    if cursor.kind == kind:
+        return or_(later, and_(seq_column == cursor.seq, id_column > cursor.id))
+    return later
+
+
+def changes_since(
+    db: Session, station: Station, token: Optional[str], limit: int
+) -> Tuple[List[Observation], List[ObservationTombstone], str, bool]:
+    """Observations changed and deleted at a station after `token`, oldest change first
+
+    Returns ``(changed, deleted, next_token, has_more)``.
+    """
+    cursor = Cursor.parse(token)
+    current, purged_through = db.execute(
+        select(ChangeSequence.value, ChangeSequence.purged_through).where(ChangeSequence.name == OBSERVATIONS)
+    ).one()
+    # A full sync needs no tombstones
+    if token and cursor.seq < purged_through:
+        raise SyncExpired()
+
+    rows = (
+        db.query(Observation)
+        .filter(Observation.station_id == station.id, _after(Observation.change_seq, Observation.id, cursor, _ROW))
+        .order_by(Observation.change_seq, Observation.id)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = (
+        db.query(ObservationTombstone)
+        .filter(
+            ObservationTombstone.station_id == station.id,
+            _after(ObservationTombstone.change_seq, ObservationTombstone.id, cursor, _TOMBSTONE),
+        )
+        .order_by(ObservationTombstone.change_seq, ObservationTombstone.id)
+        .limit(limit + 1)
+        .all()
+    )
+    merged = sorted(
+        [(row.change_seq, _ROW, row.id, row) for row in rows]
+        + [(tombstone.change_seq, _TOMBSTONE, tombstone.id, tombstone) for tombstone in tombstones],
+        key=lambda entry: entry[:3],
+    )
+    has_more = len(merged) > limit
+    page = merged[:limit]
+
+    if has_more:
+        seq, kind, last_id, _ = page[-1]
+        next_cursor = Cursor(seq, kind, last_id)
+    else:
+        # Caught up: numbers up to the counter are all committed, even those used at other stations
+        next_cursor = Cursor(max([current, cursor.seq] + [entry[0] for entry in page]))
+    changed = [entry[3] for entry in page if entry[1] == _ROW]
+    deleted = [entry[3] for entry in page if entry[1] == _TOMBSTONE]
+    return changed, deleted, str(next_cursor), has_more
@@ -0,0 +1,93 @@
+"""Per-user observation counters.
+
+``users.observation_count`` and the first/last observation times are
+adjusted from the `ObservationChange` records of each write rather than
+counted on demand, so the admin user directory is a single query. Archiving
+and restoring move rows without going through the hooks, so archived
+observations stay counted.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.observation_model import Observation
+from ..models.user_model import User
+from . import archive
+from .archive import normalize_time
+
+
+def _earliest(*values):
+    values = [normalize_time(value) for value in values if value is not None]
+    return min(values) if values else None
+
+
+def _latest(*values):
+    values = [normalize_time(value) for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _archived_first(db: Session, user_id: int, before):
+    """Earliest archived observation time of a user, if earlier than `before`"""
+    segments = archive.segments_in_range(db, end_date=before)
+    rows = archive.load_observations(segments, end_date=before, predicate=lambda row: row.observer_id == user_id)
+    return normalize_time(rows[-1].observation_time) if rows else None
+
+
+def _archived_last(db: Session, user_id: int, after):
+    """Latest archived observation time of a user, if later than `after`"""
+    segments = archive.segments_in_range(db, start_date=after)
+    rows = archive.load_observations(
+        segments, start_date=after, predicate=lambda row: row.observer_id == user_id, limit=1
+    )
+    return normalize_time(rows[0].observation_time) if rows else None
+
+
+def refresh_after_change(db: Session, changes: List) -> None:
+    """Apply inserts, deletes and moves to their observers' counters"""
+    by_observer = defaultdict(list)
+    for change in changes:
+        if change.observer_id is not None and change.old_time != change.new_time:
+            by_observer[change.observer_id].append(change)
+    if not by_observer:
+        return
+
+    users = db.query(User).filter(User.id.in_(by_observer)).with_for_update().all()
+    for user in users:
+        items = by_observer[user.id]
+        added = [change.new_time for change in items if change.new_time is not None]
+        removed = [normalize_time(change.old_time) for change in items if change.old_time is not None]
+        inserted = sum(1 for change in items if change.old_time is None)
+        deleted = sum(1 for change in items if change.new_time is None)
+
+        first = normalize_time(user.first_observation_at)
+        last = normalize_time(user.last_observation_at)
+        user.observation_count = max(0, (user.observation_count or 0) + inserted - deleted)
+
+        if first in removed or last in removed:
+            # A bound moved away: the new one is in the hot table or, since back-filled
+            # hot rows can be older than archived ones, in the archive
+            hot_first, hot_last = (
+                db.query(func.min(Observation.observation_time), func.max(Observation.observation_time))
+                .filter(Observation.observer_id == user.id)
+                .one()
+            )
+            hot_first, hot_last = normalize_time(hot_first), normalize_time(hot_last)
+            if first in removed:
+                first = _earliest(hot_first, _archived_first(db, user.id, hot_first))
+            if last in removed:
+                last = _latest(hot_last, _archived_last(db, user.id, hot_last))
+        if not user.observation_count:
+            first = last = None
+        else:
+            first = _earliest(first, *added)
+            last = _latest(last, *added)
+
+        user.first_observation_at = first.replace(tzinfo=timezone.utc) if first else None
+        user.last_observation_at = last.replace(tzinfo=timezone.utc) if last else None
+
+
+def record_login(user: User) -> None:
+    user.last_login_at = datetime.now(timezone.utc)
@@ -1,10 +1,13 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from src.core.cache import get_cache
+from src.core.config import settings
 from src.core.database import Base, get_db
 from src.core.security import create_access_token
+from src.middleware import admission
 from src.models.user_model import User
 from src.models.observation_model import Observation
 from main import app
@@ -18,6 +21,23 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Every test starts from an empty database, so nothing cached may carry over
+    get_cache().backend.clear()
+
+@pytest.fixture(autouse=True)
+def admission_state():
+    # Rate-limit buckets would otherwise carry over between tests
+    admission.reset()
+    yield
+    admission.reset()
+
+@pytest.fixture(autouse=True)
+def export_storage(tmp_path, monkeypatch):
+    # Export files and cached month segments go to a fresh directory per test
+    monkeypatch.setattr(settings, "export_storage_dir", str(tmp_path / "exports"))
+
 @pytest.fixture(scope="function")
 def db_session():
     Base.metadata.create_all(bind=engine)
@@ -79,4 +99,17 @@ def auth_headers(test_user):
 @pytest.fixture
 def admin_headers(admin_user):
     token = create_access_token(subject=admin_user.id)
-    return {"Authorization": f"Bearer {token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def statements(db_session):
+    """SQL statements sent to the test database while the test runs"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(engine, "before_cursor_execute", capture)
@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+import time
+from src.core.cache import MemoryBackend
+from src.core.config import settings
+from src.core.database import TimedQueuePool
+from src.middleware.admission import SharedBuckets, TokenBuckets, get_admission
+
+class TestAdmission:
+
+    def test_rate_limits_are_per_user_and_route_class(self, client, auth_headers, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "admission_burst", 3)
+        monkeypatch.setattr(settings, "admission_rate_per_second", 0.01)
+        monkeypatch.setattr(settings, "admission_heavy_burst", 1)
+        monkeypatch.setattr(settings, "admission_heavy_rate_per_second", 0.01)
+
+        for _ in range(3):
+            assert client.get("/observations/", headers=auth_headers).status_code == 200
+        response = client.get("/observations/", headers=auth_headers)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 1
+        # Another user has a budget of their own, and probes are never limited
+        assert client.get("/observations/", headers=admin_headers).status_code == 200
+        assert client.get("/health/live").status_code == 200
+
+        assert client.get("/observations/export/csv", headers=admin_headers).status_code == 200
+        assert client.get("/observations/export/csv", headers=admin_headers).status_code == 429
+        assert client.get("/observations/", headers=admin_headers).status_code == 200
+
+    def test_overload_is_shed_with_retry_after(self, client, auth_headers, monkeypatch):
+        admission = get_admission()
+        admission.active["heavy"] = settings.admission_heavy_max_concurrent
+        response = client.get("/observations/export/csv", headers=auth_headers)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(settings.admission_retry_after_seconds)
+        assert client.get("/observations/", headers=auth_headers).status_code == 200
+        admission.active["heavy"] = 0
+
+        monkeypatch.setattr(admission, "pool_wait", lambda: settings.admission_max_pool_wait_seconds + 1)
+        assert client.get("/observations/", headers=auth_headers).status_code == 503
+        assert client.get("/health/live").status_code == 200
+        assert client.get("/health").status_code == 200
+        monkeypatch.setattr(admission, "pool_wait", lambda: 0.0)
+        assert client.get("/observations/", headers=auth_headers).status_code == 200
+
+    def test_buckets(self):
+        for buckets in (TokenBuckets(), SharedBuckets(MemoryBackend())):
+            assert [buckets.take("user:1", 0.01, 2) for _ in range(2)] == [0.0, 0.0]
+            assert buckets.take("user:1", 0.01, 2) > 0
+            assert buckets.take("user:2", 0.01, 2) == 0.0
+
+        buckets = TokenBuckets()
+        assert buckets.take("user:1", 50, 1) == 0.0
+        assert buckets.take("user:1", 50, 1) > 0
+        time.sleep(0.03)
+        assert buckets.take("user:1", 50, 1) == 0.0
+
+    def test_pool_reports_the_longest_wait(self):
+        pool = TimedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=5)
+        held = pool.connect()
+        waiter = threading.Thread(target=lambda: pool.connect().close())
+        waiter.start()
+        time.sleep(0.2)
+        assert pool.longest_wait() >= 0.15
+        held.close()
+        waiter.join()
+        assert pool.longest_wait() == 0.0
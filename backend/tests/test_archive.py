@@ -0,0 +1,70 @@
+import pytest
+from datetime import datetime
+from src.models.observation_model import Observation
+from src.models.archive_model import ArchiveSegment
+from src.services import archive
+
+class TestArchive:
+
+    @pytest.fixture
+    def history(self, db_session, test_user):
+        observations = [
+            Observation(observation_time=datetime(2020, 1, 10, 8, 0), observer_id=test_user.id, temperature=12.0, precipitation=1.0),
+            Observation(observation_time=datetime(2020, 1, 20, 8, 0), observer_id=test_user.id, temperature=13.0, precipitation=2.0),
+            Observation(observation_time=datetime(2020, 2, 5, 8, 0), observer_id=test_user.id, temperature=15.0),
+            Observation(observation_time=datetime(2024, 1, 15, 10, 0), observer_id=test_user.id, temperature=25.5),
+        ]
+        db_session.add_all(observations)
+        db_session.commit()
+        return observations
+
+    def test_archive_moves_old_months_into_segments(self, db_session, history):
+        segments = archive.archive_observations(db_session, datetime(2021, 1, 1))
+
+        assert [segment.month for segment in segments] == ["2020-02", "2020-01"]
+        assert sum(segment.row_count for segment in segments) == 3
+        assert db_session.query(Observation).count() == 1
+        assert db_session.query(ArchiveSegment).count() == 2
+
+    def test_list_reads_through_archive(self, client, auth_headers, db_session, history):
+        archive.archive_observations(db_session, datetime(2021, 1, 1))
+
+        response = client.get("/observations/", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [row["temperature"] for row in data] == [25.5, 15.0, 13.0, 12.0]
+        assert data[1]["observer_name"] == "Test Display"
+
+        response = client.get(
+            "/observations/",
+            params={"start_date": "2020-01-15T00:00:00", "end_date": "2020-03-01T00:00:00"},
+            headers=auth_headers,
+        )
+        assert [row["temperature"] for row in response.json()] == [15.0, 13.0]
+
+        response = client.get("/observations/", params={"skip": 1, "limit": 2}, headers=auth_headers)
+        assert [row["temperature"] for row in response.json()] == [15.0, 13.0]
+
+    def test_export_includes_archived_rows(self, client, auth_headers, db_session, history):
+        archive.archive_observations(db_session, datetime(2021, 1, 1))
+
+        response = client.get("/observations/export/csv", headers=auth_headers)
+        assert response.status_code == 200
+        lines = response.content.decode("utf-8-sig").strip().splitlines()
+        assert len(lines) == 5
+        assert lines[-1].startswith("2020-01-10 08:00:00")
+
+    def test_archive_endpoints_admin_only(self, client, auth_headers, admin_headers, db_session, history):
+        response = client.post("/observations/archive", params={"before": "2021-01-01T00:00:00"}, headers=auth_headers)
+        assert response.status_code == 403
+
+        response = client.post("/observations/archive", params={"before": "2021-01-01T00:00:00"}, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["observations_archived"] == 3
+
+        segments = client.get("/observations/archive/segments", headers=admin_headers).json()
+        assert len(segments) == 2
+
+        response = client.post(f"/observations/archive/segments/{segments[0]['id']}/restore", headers=admin_headers)
+        assert response.status_code == 200
+        assert db_session.query(Observation).count() == 2
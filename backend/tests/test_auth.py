@@ -1,5 +1,71 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import httpx
 import pytest
-from unittest.mock import patch, MagicMock
+from src.core.config import settings
+from src.core.database import get_db
+from src.models.user_model import User
+from src.services import google_oauth
+from main import app
+
+class _OAuthStandIn(ThreadingHTTPServer):
+    """Token and user info endpoints of a Google stand-in; codes name the user"""
+    daemon_threads = True
+
+    def __init__(self):
+        self.delay = 0.0
+        self.connections = 0
+        self.authorizations = []
+        super().__init__(("127.0.0.1", 0), _OAuthHandler)
+
+class _OAuthHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        time.sleep(self.server.delay)
+        code = form["code"][0]
+        if code == "bad" or form["client_secret"] != [settings.google_client_secret]:
+            self._reply(400, {"error": "invalid_grant"})
+        else:
+            self._reply(200, {"access_token": f"token-{code}", "token_type": "Bearer", "expires_in": 3600})
+
+    def do_GET(self):
+        authorization = self.headers["Authorization"]
+        self.server.authorizations.append(authorization)
+        code = authorization.removeprefix("Bearer token-")
+        self._reply(200, {"id": f"google_{code}", "email": f"{code}@example.com", "name": code.title()})
+
+@pytest.fixture
+def oauth_server(monkeypatch):
+    server = _OAuthStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    monkeypatch.setattr(settings, "google_token_url", f"http://{host}:{port}/token")
+    monkeypatch.setattr(settings, "google_userinfo_url", f"http://{host}:{port}/userinfo")
+    yield server
+    server.shutdown()
+    server.server_close()
 
 class TestAuth:
     
@@ -12,29 +78,55 @@ class TestAuth:
         assert "state" in data
         assert "accounts.google.com" in data["authorization_url"]
 
-    @patch('src.api.auth.httpx.AsyncClient')
-    @patch('src.api.auth.OAuth2Session')
-    def test_google_callback_new_user(self, mock_oauth, mock_httpx, client, db_session):
-        # Mock OAuth2Session
-        mock_oauth_instance = MagicMock()
-        mock_oauth.return_value = mock_oauth_instance
-        mock_oauth_instance.fetch_token.return_value = {"access_token": "fake_token"}
-        
-        # Mock httpx response
-        mock_client = MagicMock()
-        mock_httpx.return_value.__aenter__.return_value = mock_client
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "id": "google_user_123",
-            "email": "newuser@example.com",
-            "name": "New User",
-            "picture": "https://example.com/photo.jpg"
-        }
-        mock_client.get.return_value = mock_response
-        
-        response = client.get("/auth/google/callback?code=fake_code&state=fake_state")
+    def test_google_callback_new_user(self, client, db_session, oauth_server):
+        response = client.get("/auth/google/callback?code=alice&state=fake_state", follow_redirects=False)
         assert response.status_code == 302  # Redirect
         assert "localhost:3000" in response.headers["location"]
+        assert db_session.query(User).filter(User.google_id == "google_alice").one().email == "alice@example.com"
+
+        # The second login reuses the kept-alive connection of the shared client
+        response = client.get("/auth/google/callback?code=alice&state=fake_state", follow_redirects=False)
+        assert response.status_code == 302
+        assert oauth_server.connections == 1
+        assert oauth_server.authorizations == ["Bearer token-alice", "Bearer token-alice"]
+
+    def test_google_callback_rejected_code(self, client, oauth_server):
+        response = client.get("/auth/google/callback?code=bad&state=fake_state", follow_redirects=False)
+        assert response.status_code == 400
+        assert "Token exchange failed with HTTP 400" in response.json()["detail"]
+
+    def test_concurrent_logins_do_not_stall_other_routes(self, client, db_session, oauth_server):
+        oauth_server.delay = 1.0
+
+        # Handled on the event loop, so the logins never touch the session from two threads at once
+        async def shared_session():
+            yield db_session
+        app.dependency_overrides[get_db] = shared_session
+
+        async def burst():
+            google_oauth.get_http_client()  # created at startup, as the lifespan does
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                logins = [
+                    asyncio.ensure_future(http.get(f"/auth/google/callback?code=user{index}&state=s"))
+                    for index in range(5)
+                ]
+                await asyncio.sleep(0.1)
+                started = time.perf_counter()
+                health = await http.get("/health/live")
+                health_seconds = time.perf_counter() - started
+                responses = await asyncio.gather(*logins)
+            await google_oauth.close_http_client()
+            return health, health_seconds, responses
+
+        started = time.perf_counter()
+        health, health_seconds, responses = asyncio.run(burst())
+        assert health.status_code == 200
+        # A blocking token exchange would hold the health check until the exchanges finished
+        assert health_seconds < 0.5
+        assert [response.status_code for response in responses] == [302] * 5
+        # Exchanges overlap instead of running one after another
+        assert time.perf_counter() - started < 3
 
     def test_google_callback_missing_code(self, client):
         response = client.get("/auth/google/callback?state=fake_state")
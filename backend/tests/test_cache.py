@@ -0,0 +1,143 @@
+import socketserver
+import threading
+import time
+import pytest
+from src.core.cache import Cache, MemoryBackend, RedisBackend, SQLiteBackend, get_cache
+
+class _RespStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol for the cache backend"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+
+class _RespHandler(socketserver.StreamRequestHandler):
+
+    def _command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _bulk(self, value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _get(self, key):
+        value, expires = self.server.data.get(key, (None, None))
+        if expires is not None and expires < time.monotonic():
+            self.server.data.pop(key, None)
+            return None
+        return value
+
+    def handle(self):
+        while True:
+            args = self._command()
+            if args is None:
+                return
+            name = args[0].upper()
+            with self.server.lock:
+                if name == b"PING":
+                    reply = b"+PONG\r\n"
+                elif name == b"GET":
+                    reply = self._bulk(self._get(args[1]))
+                elif name == b"MGET":
+                    reply = b"*%d\r\n" % (len(args) - 1) + b"".join(self._bulk(self._get(key)) for key in args[1:])
+                elif name == b"SET":
+                    expires = time.monotonic() + int(args[4]) / 1000 if len(args) > 3 else None
+                    self.server.data[args[1]] = (args[2], expires)
+                    reply = b"+OK\r\n"
+                elif name == b"DEL":
+                    reply = b":%d\r\n" % (self.server.data.pop(args[1], None) is not None)
+                elif name == b"INCR":
+                    value = int(self._get(args[1]) or 0) + 1
+                    expires = self.server.data.get(args[1], (None, None))[1]
+                    self.server.data[args[1]] = (str(value).encode(), expires)
+                    reply = b":%d\r\n" % value
+                elif name == b"PEXPIRE":
+                    value = self._get(args[1])
+                    if value is not None:
+                        self.server.data[args[1]] = (value, time.monotonic() + int(args[2]) / 1000)
+                    reply = b":%d\r\n" % (value is not None)
+                elif name == b"FLUSHDB":
+                    self.server.data.clear()
+                    reply = b"+OK\r\n"
+                else:
+                    reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+@pytest.fixture
+def resp_server():
+    server = _RespStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend_pair(request, tmp_path):
+    """Two backends as two workers would see them; they share storage unless in-memory"""
+    if request.param == "memory":
+        backend = MemoryBackend()
+        return backend, backend
+    if request.param == "sqlite":
+        path = str(tmp_path / "cache.db")
+        return SQLiteBackend(path), SQLiteBackend(path)
+    server = request.getfixturevalue("resp_server")
+    host, port = server.server_address
+    return RedisBackend(host, port), RedisBackend.from_url(f"redis://{host}:{port}/0")
+
+class TestCache:
+
+    def test_backend_operations(self, backend_pair):
+        backend, _ = backend_pair
+        assert backend.get("missing") is None
+        backend.set("key", b"value", 60)
+        assert backend.get("key") == b"value"
+        assert backend.get_many(["key", "missing"]) == [b"value", None]
+        backend.set("short", b"value", 0.01)
+        time.sleep(0.03)
+        assert backend.get("short") is None
+        assert [backend.incr("counter") for _ in range(3)] == [1, 2, 3]
+        assert [backend.incr("window", 0.05) for _ in range(2)] == [1, 2]
+        time.sleep(0.08)
+        assert backend.incr("window", 0.05) == 1
+        backend.delete("key")
+        assert backend.get("key") is None
+
+    def test_invalidation_reaches_other_workers(self, backend_pair):
+        first, second = backend_pair
+        worker_a, worker_b = Cache(first), Cache(second)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return {"value": len(calls)}
+
+        assert worker_a.get_or_set("dashboard", "latest", factory, depends_on=("observations",)) == {"value": 1}
+        assert worker_b.get_or_set("dashboard", "latest", factory, depends_on=("observations",)) == {"value": 1}
+
+        worker_a.invalidate("observations")
+        assert worker_b.get_or_set("dashboard", "latest", factory, depends_on=("observations",)) == {"value": 2}
+        worker_b.invalidate("users")
+        assert worker_a.get_or_set("dashboard", "latest", factory, depends_on=("observations",)) == {"value": 2}
+
+    def test_unreachable_backend_falls_back_to_factory(self):
+        cache = Cache(RedisBackend("127.0.0.1", 1, timeout=0.1))
+        assert cache.get_or_set("dashboard", "latest", lambda: 42, depends_on=("observations",)) == 42
+
+    def test_dashboard_is_invalidated_by_writes(self, client, auth_headers):
+        client.post("/observations/", json={"observation_time": "2024-01-15T10:00:00", "temperature": 20.0}, headers=auth_headers)
+        assert client.get("/observations/dashboard", headers=auth_headers).json()["temperature"] == 20.0
+
+        versions = get_cache().backend.get("wm:version:observations")
+        client.post("/observations/", json={"observation_time": "2024-01-15T11:00:00", "temperature": 21.0}, headers=auth_headers)
+        assert get_cache().backend.get("wm:version:observations") != versions
+        assert client.get("/observations/dashboard", headers=auth_headers).json()["temperature"] == 21.0
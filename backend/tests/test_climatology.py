@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime
+from src.models.climatology_model import ClimatologyBaseline
+from src.models.observation_model import Observation
+from src.services import archive, climatology, maintenance, stations
+
+class TestClimatology:
+
+    @pytest.fixture
+    def history(self, db_session, test_user):
+        # 15 January, 10:00 station time, in three different years
+        db_session.add_all([
+            Observation(observation_time=datetime(2021, 1, 15, 2, 0), observer_id=test_user.id, temperature=10.0, precipitation=0.0),
+            Observation(observation_time=datetime(2022, 1, 15, 2, 0), observer_id=test_user.id, temperature=12.0, precipitation=4.0),
+            Observation(observation_time=datetime(2023, 1, 15, 2, 0), observer_id=test_user.id, temperature=14.0, precipitation=2.0),
+            Observation(observation_time=datetime(2023, 1, 16, 2, 0), observer_id=test_user.id, temperature=30.0),
+        ])
+        db_session.commit()
+
+    def test_day_of_year_uses_leap_year_calendar(self):
+        assert climatology.day_of_year(datetime(2023, 3, 1, 4, 0)) == 61
+        assert climatology.day_of_year(datetime(2024, 3, 1, 4, 0)) == 61
+        assert climatology.calendar_day(60).strftime("%m-%d") == "02-29"
+
+    def test_baselines_and_latest_ranking(self, client, auth_headers, db_session, history):
+        climatology.rebuild(db_session)
+
+        response = client.post(
+            "/observations/",
+            json={"observation_time": "2024-01-15T02:00:00", "temperature": 13.0, "precipitation": 1.0},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert db_session.query(ClimatologyBaseline).filter(ClimatologyBaseline.is_stale == True).count() == 2
+
+        # Reads serve the stored baselines until the maintenance job refreshes them
+        params = {"variable": "temperature", "start_day": 15, "end_day": 15}
+        response = client.get("/observations/climatology", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["days"][0]["sample_count"] == 3
+        assert maintenance.refresh_climatology(db_session) == 1
+
+        response = client.get("/observations/climatology", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+
+        assert len(data["days"]) == 1
+        day = data["days"][0]
+        assert (day["month"], day["day"], day["sample_count"]) == (1, 15, 4)
+        assert day["mean"] == 12.25
+        assert (day["minimum"], day["maximum"]) == (10.0, 14.0)
+
+        latest = data["latest"]
+        assert latest["day_of_year"] == 15
+        assert latest["temperature"] == 13.0
+        assert 50 < latest["temperature_percentile"] < 100
+        assert latest["precipitation_24h"] == 1.0
+        assert latest["precipitation_percentile"] is not None
+
+    def test_mark_stale_creates_missing_days_and_flags_existing_ones(self, db_session, history):
+        station_id = db_session.query(Observation.station_id).first()[0]
+        climatology.mark_stale(db_session, [(station_id, datetime(2024, 1, 15, 2, 0))])
+        climatology.mark_stale(db_session, [(station_id, datetime(2024, 1, 15, 4, 0)), (station_id, datetime(2024, 2, 1, 2, 0))])
+        db_session.commit()
+
+        stale = db_session.query(ClimatologyBaseline.variable, ClimatologyBaseline.day_of_year).filter(
+            ClimatologyBaseline.is_stale == True
+        )
+        assert sorted(stale) == [("precipitation", 15), ("precipitation", 32), ("temperature", 15), ("temperature", 32)]
+        assert climatology.refresh_stale(db_session) == 2
+        assert db_session.get(ClimatologyBaseline, (station_id, "temperature", 15)).sample_count == 3
+
+    def test_refresh_reads_archived_rows_across_utc_month_edges(self, db_session, test_user):
+        # 1 March station time; the 02:00 reading falls in February's UTC segment
+        db_session.add_all([
+            Observation(observation_time=datetime(2022, 3, 1, 2, 0), observer_id=test_user.id, temperature=10.0),
+            Observation(observation_time=datetime(2023, 2, 28, 18, 0), observer_id=test_user.id, temperature=20.0),
+        ])
+        db_session.commit()
+        archive.archive_observations(db_session, datetime(2024, 1, 1))
+        station_id = stations.default_station(db_session).id
+
+        climatology.rebuild(db_session)
+        rebuilt = db_session.get(ClimatologyBaseline, (station_id, "temperature", 61))
+        assert (rebuilt.sample_count, rebuilt.mean) == (2, 15.0)
+
+        climatology.mark_stale(db_session, [(station_id, datetime(2023, 2, 28, 18, 0))])
+        db_session.commit()
+        assert climatology.refresh_stale(db_session) == 1
+        db_session.expire_all()
+        refreshed = db_session.get(ClimatologyBaseline, (station_id, "temperature", 61))
+        assert (refreshed.sample_count, refreshed.mean) == (2, 15.0)
+
+    def test_wrapping_day_range(self, client, auth_headers, db_session, history):
+        climatology.rebuild(db_session)
+
+        response = client.get(
+            "/observations/climatology",
+            params={"variable": "precipitation", "start_day": 365, "end_day": 2},
+            headers=auth_headers,
+        )
+        assert [day["day_of_year"] for day in response.json()["days"]] == [1, 2, 365, 366]
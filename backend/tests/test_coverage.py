@@ -0,0 +1,65 @@
+from src.services import coverage
+
+# Naive times are UTC; the station's slots are 08:00, 14:00 and 20:00 in Asia/Taipei (UTC+8)
+def _create(client, headers, observation_time):
+    response = client.post("/observations/", json={"observation_time": observation_time, "temperature": 20.0}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["observer_id"]
+
+def _coverage(client, headers, start_date, end_date, **params):
+    response = client.get(
+        "/observations/coverage", params={"start_date": start_date, "end_date": end_date, **params}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+class TestCoverage:
+
+    def test_slots_by_day_and_observer(self, client, auth_headers, admin_headers):
+        observer = _create(client, auth_headers, "2024-01-01T00:10:00")  # 08:10
+        _create(client, auth_headers, "2024-01-01T12:40:00")  # 20:40 is outside the tolerance
+        _create(client, auth_headers, "2024-01-02T05:45:00")  # 13:45
+        admin = _create(client, admin_headers, "2024-01-02T06:05:00")  # 14:05, the same slot
+        _create(client, auth_headers, "2024-01-02T16:00:00")  # 00:00 on the 3rd is no slot
+
+        report = _coverage(client, auth_headers, "2024-01-01", "2024-01-03")
+        assert report["slots"] == ["08:00", "14:00", "20:00"]
+        assert (report["expected"], report["observed"]) == (9, 2)
+        assert [(day["date"], day["mask"]) for day in report["days"]] == [
+            ("2024-01-01", 0b001), ("2024-01-02", 0b010), ("2024-01-03", 0)
+        ]
+        assert report["days"][1]["observers"] == [
+            {"observer_id": observer, "mask": 0b010}, {"observer_id": admin, "mask": 0b010}
+        ]
+        assert [(entry["observer_id"], entry["slots"]) for entry in report["observers"]] == [(observer, 2), (admin, 1)]
+
+        wider = _coverage(client, auth_headers, "2024-01-01", "2024-01-01", slots="20:00,08:00", tolerance_minutes=45)
+        assert wider["slots"] == ["08:00", "20:00"]
+        assert wider["days"][0]["mask"] == 0b11
+
+    def test_closed_months_are_cached_until_they_change(self, client, auth_headers, monkeypatch):
+        computed = []
+        compute = coverage._compute
+        monkeypatch.setattr(coverage, "_compute", lambda db, station, first, last, *args: (
+            computed.append((first.isoformat(), last.isoformat())) or compute(db, station, first, last, *args)
+        ))
+        _create(client, auth_headers, "2024-01-05T00:00:00")
+
+        assert _coverage(client, auth_headers, "2024-01-01", "2024-02-10")["observed"] == 1
+        assert _coverage(client, auth_headers, "2024-01-01", "2024-02-10")["observed"] == 1
+        # January is cached after the first request; the partly covered February is not
+        assert computed == [("2024-01-01", "2024-01-31"), ("2024-02-01", "2024-02-10"), ("2024-02-01", "2024-02-10")]
+
+        computed.clear()
+        _create(client, auth_headers, "2024-01-06T06:00:00")
+        assert _coverage(client, auth_headers, "2024-01-01", "2024-01-31")["observed"] == 2
+        assert computed == [("2024-01-01", "2024-01-31")]
+
+    def test_invalid_requests(self, client, auth_headers):
+        for params in (
+            {"start_date": "2024-01-02", "end_date": "2024-01-01"},
+            {"start_date": "2020-01-01", "end_date": "2024-01-01"},
+            {"start_date": "2024-01-01", "end_date": "2024-01-01", "slots": "25:00"},
+            {"start_date": "2024-01-01", "end_date": "2024-01-01", "tolerance_minutes": -1},
+        ):
+            assert client.get("/observations/coverage", params=params, headers=auth_headers).status_code == 422
@@ -0,0 +1,34 @@
+import pytest
+
+READINGS = [
+    ("2024-01-01T11:00:00", None, 100.0),  # Just over 7 days before the latest reading
+    ("2024-01-01T13:00:00", None, 7.0),
+    ("2024-01-07T12:10:00", 15.0, 1.0),  # Same hour yesterday, within the tolerance
+    ("2024-01-07T13:00:00", 25.0, 2.0),
+    ("2024-01-08T06:30:00", 18.0, 3.0),
+    ("2024-01-08T10:00:00", None, 4.0),
+    ("2024-01-08T12:00:00", 20.0, 0.5),
+]
+
+@pytest.fixture
+def readings(client, auth_headers):
+    for observation_time, temperature, precipitation in READINGS:
+        body = {"observation_time": observation_time, "temperature": temperature, "precipitation": precipitation}
+        assert client.post("/observations/", json=body, headers=auth_headers).status_code == 200
+
+class TestDashboard:
+
+    def test_window_aggregates(self, client, auth_headers, readings):
+        data = client.get("/observations/dashboard", headers=auth_headers).json()
+        assert data["temperature"] == 20.0
+        assert [data[f"precipitation_{window}"] for window in ("1h", "3h", "6h", "24h", "7d")] == [
+            0.5, 4.5, 7.5, 10.5, 17.5
+        ]
+        assert (data["temperature_min_24h"], data["temperature_max_24h"]) == (15.0, 25.0)
+        assert data["temperature_change_24h"] == 5.0
+
+    def test_windows_are_one_statement(self, client, auth_headers, readings, statements):
+        assert client.get("/observations/dashboard", headers=auth_headers).status_code == 200
+        aggregates = [statement for statement in statements if "FROM observations" in statement and "sum(" in statement]
+        assert len(aggregates) == 1
+        assert aggregates[0].count("FILTER (WHERE") == 9
@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime
+from src.models.evaporation_model import EvaporationInterval, DailyEvaporation
+from src.services import archive, evaporation
+
+# 08:00 and 20:00 station time (Asia/Taipei) expressed in UTC
+READINGS = [
+    {"observation_time": "2024-01-15T00:00:00", "current_evaporation_level": 100.0},
+    {"observation_time": "2024-01-15T12:00:00", "current_evaporation_level": 96.0},
+    {
+        "observation_time": "2024-01-16T00:00:00",
+        "current_evaporation_level": 93.0,
+        "precipitation": 2.0,
+        "has_cleaned_evaporation_pan": True,
+        "cleaned_evaporation_level": 100.0,
+    },
+    {"observation_time": "2024-01-16T12:00:00", "current_evaporation_level": 97.0},
+]
+
+class TestEvaporation:
+
+    @pytest.fixture
+    def observation_ids(self, client, auth_headers):
+        # Submit out of order so inserts land between existing neighbours
+        ids = {}
+        for index in (0, 3, 1, 2):
+            response = client.post("/observations/", json=READINGS[index], headers=auth_headers)
+            assert response.status_code == 200
+            ids[index] = response.json()["id"]
+        return [ids[index] for index in range(len(READINGS))]
+
+    def _evaporation_by_end(self, db_session):
+        return {
+            interval.end_observation_id: interval.evaporation
+            for interval in db_session.query(EvaporationInterval).all()
+        }
+
+    def test_intervals_follow_inserts(self, client, auth_headers, db_session, observation_ids):
+        assert self._evaporation_by_end(db_session) == {
+            observation_ids[1]: 4.0,
+            observation_ids[2]: 5.0,
+            observation_ids[3]: 3.0,
+        }
+
+        response = client.get("/observations/evaporation/daily", headers=auth_headers)
+        assert response.status_code == 200
+        assert [(day["day"], day["evaporation"]) for day in response.json()] == [
+            ("2024-01-16", 8.0),
+            ("2024-01-15", 4.0),
+        ]
+
+    def test_edit_and_delete_recompute_neighbours(self, client, auth_headers, db_session, observation_ids):
+        response = client.put(
+            f"/observations/{observation_ids[1]}",
+            json={"current_evaporation_level": 95.0},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert self._evaporation_by_end(db_session)[observation_ids[2]] == 4.0
+
+        client.delete(f"/observations/{observation_ids[1]}", headers=auth_headers)
+        assert self._evaporation_by_end(db_session) == {
+            observation_ids[2]: 9.0,
+            observation_ids[3]: 3.0,
+        }
+        daily = {row.day.isoformat(): row.evaporation for row in db_session.query(DailyEvaporation).all()}
+        assert daily == {"2024-01-16": 12.0}
+
+    def test_rebuild_matches_incremental(self, db_session, observation_ids):
+        incremental = self._evaporation_by_end(db_session)
+
+        assert evaporation.rebuild(db_session) == 3
+        assert self._evaporation_by_end(db_session) == incremental
+
+    def test_neighbours_in_the_archive(self, client, auth_headers, db_session):
+        ids = {}
+        for index in (0, 1, 3):
+            response = client.post("/observations/", json=READINGS[index], headers=auth_headers)
+            ids[index] = response.json()["id"]
+        archive.archive_observations(db_session, datetime(2024, 1, 15, 18))
+
+        # Lands between the last archived observation and the first hot one
+        response = client.post("/observations/", json=READINGS[2], headers=auth_headers)
+        assert response.status_code == 200
+        ids[2] = response.json()["id"]
+        intervals = {
+            interval.end_observation_id: (interval.start_observation_id, interval.evaporation)
+            for interval in db_session.query(EvaporationInterval).filter(
+                EvaporationInterval.end_observation_id.in_([ids[2], ids[3]])
+            )
+        }
+        assert intervals == {ids[2]: (ids[1], 5.0), ids[3]: (ids[2], 3.0)}
+
+        incremental = self._evaporation_by_end(db_session)
+        evaporation.rebuild(db_session)
+        assert self._evaporation_by_end(db_session) == incremental
@@ -0,0 +1,209 @@
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import sessionmaker
+from src.core.config import settings
+from src.models.export_model import ExportJob
+from src.models.observation_model import Observation
+from src.models.user_model import User
+from src.services import exports, stations
+from src.services.exports import ExportWorkerPool, get_export_pool
+from main import app
+
+@pytest.fixture
+def export_pool(db_session):
+    pool = ExportWorkerPool(sessionmaker(bind=db_session.get_bind()), workers=1)
+    app.dependency_overrides[get_export_pool] = lambda: pool
+    yield pool
+    pool.shutdown()
+
+@pytest.fixture
+def observations(db_session, test_user):
+    for day in range(1, 11):
+        db_session.add(Observation(
+            observation_time=datetime(2024, 1, day, 8),
+            observer_id=test_user.id,
+            temperature=20.0 + day,
+            total_cloud_amount=day % 9,
+            notes=f"day {day}",
+        ))
+    db_session.commit()
+
+class TestExportJobs:
+
+    def test_job_produces_the_inline_export(self, client, auth_headers, export_pool, observations):
+        body = {"start_date": "2024-01-02T00:00:00", "end_date": "2024-01-08T00:00:00", "filters": ["total_cloud_amount:gte:4"]}
+        response = client.post("/observations/export/jobs/", json=body, headers=auth_headers)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        assert response.headers["location"] == f"/observations/export/jobs/{job_id}"
+
+        # Wait for the worker before touching the shared test connection again
+        export_pool.shutdown()
+        job = client.get(f"/observations/export/jobs/{job_id}", headers=auth_headers).json()
+        assert job["status"] == "succeeded"
+        assert job["row_count"] == 4
+        assert job["download_url"] == f"/observations/export/jobs/{job_id}/download"
+
+        download = client.get(job["download_url"], headers=auth_headers)
+        inline = client.get(
+            "/observations/export/csv",
+            params={"start_date": body["start_date"], "end_date": body["end_date"], "filter": body["filters"]},
+            headers=auth_headers,
+        )
+        assert download.status_code == 200
+        assert download.headers["accept-ranges"] == "bytes"
+        assert download.content == inline.content
+        assert "weather_observations_20240102_20240108.csv" in download.headers["content-disposition"]
+
+    def test_download_resumes_with_range(self, client, auth_headers, export_pool, observations):
+        job_id = client.post("/observations/export/jobs/", json={}, headers=auth_headers).json()["id"]
+        export_pool.shutdown()
+        url = f"/observations/export/jobs/{job_id}/download"
+        full = client.get(url, headers=auth_headers).content
+
+        first = client.get(url, headers={**auth_headers, "Range": "bytes=0-99"})
+        assert first.status_code == 206
+        assert first.headers["content-range"] == f"bytes 0-99/{len(full)}"
+        rest = client.get(url, headers={**auth_headers, "Range": "bytes=100-", "If-Range": first.headers["etag"]})
+        assert rest.status_code == 206
+        assert first.content + rest.content == full
+
+        # A changed file (stale validator) sends the whole body again
+        stale = client.get(url, headers={**auth_headers, "Range": "bytes=100-", "If-Range": '"stale"'})
+        assert stale.status_code == 200
+        assert client.get(url, headers={**auth_headers, "Range": f"bytes={len(full)}-"}).status_code == 416
+
+    def test_identical_pending_requests_share_a_job(self, db_session, test_user, export_pool):
+        station = stations.default_station(db_session)
+        first, created = exports.enqueue(db_session, test_user, station, datetime(2024, 1, 1), None, ["a:eq:1", "b:eq:2"])
+        # Filter order and an explicit UTC offset do not change the request
+        second, created_again = exports.enqueue(
+            db_session, test_user, station, datetime(2024, 1, 1, tzinfo=timezone.utc), None, ["b:eq:2", "a:eq:1"]
+        )
+        assert created and not created_again
+        assert second.id == first.id
+
+        first.status = "succeeded"
+        db_session.commit()
+        third, created = exports.enqueue(db_session, test_user, station, datetime(2024, 1, 1), None, ["a:eq:1", "b:eq:2"])
+        assert created and third.id != first.id
+
+    def test_not_ready_and_invalid_requests(self, client, auth_headers, db_session, test_user, export_pool):
+        job, _ = exports.enqueue(db_session, test_user, stations.default_station(db_session), None, None, [])
+        job_id = job.id
+        assert client.get(f"/observations/export/jobs/{job_id}/download", headers=auth_headers).status_code == 409
+        assert client.get("/observations/export/jobs/missing", headers=auth_headers).status_code == 404
+
+        response = client.post("/observations/export/jobs/", json={"filters": ["total_cloud_amount:xx:4"]}, headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_purge_expired(self, db_session, test_user, export_pool, observations):
+        station = stations.default_station(db_session)
+        job, _ = exports.enqueue(db_session, test_user, station, None, None, [])
+        job_id = job.id
+        assert exports.run_export(db_session, job_id) == "succeeded"
+        path = exports.file_path(job_id)
+        assert os.path.exists(path)
+
+        stuck, _ = exports.enqueue(db_session, test_user, station, datetime(2024, 1, 5), None, [])
+        stuck_id = stuck.id
+        later = datetime.now(timezone.utc) + timedelta(seconds=settings.export_job_timeout_seconds + 1)
+        assert exports.purge_expired(db_session, later) == 0
+        assert db_session.get(ExportJob, stuck_id).status == "failed"
+
+        much_later = later + timedelta(seconds=settings.export_ttl_seconds + 1)
+        assert exports.purge_expired(db_session, much_later) == 2
+        assert not os.path.exists(path)
+        assert db_session.query(ExportJob).count() == 0
+
+class TestExportSegments:
+
+    def _segments(self):
+        directory = os.path.join(settings.export_storage_dir, "segments")
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def _months(self, names):
+        return [name.split(".")[1] for name in names]
+
+    def _export(self, client, headers, **params):
+        response = client.get("/observations/export/csv", params=params, headers=headers)
+        assert response.status_code == 200
+        assert int(response.headers["content-length"]) == len(response.content)
+        return response.content.decode("utf-8-sig")
+
+    def test_months_are_cached_until_they_change(self, client, auth_headers, db_session, test_user):
+        for month in (1, 2, 3):
+            for day in (1, 15):
+                db_session.add(Observation(
+                    observation_time=datetime(2024, month, day, 8), observer_id=test_user.id, temperature=float(month)
+                ))
+        db_session.commit()
+        february = db_session.query(Observation).filter(Observation.observation_time == datetime(2024, 2, 15, 8)).one().id
+
+        first = self._export(client, auth_headers)
+        segments = self._segments()
+        assert self._months(segments) == ["2024-01", "2024-02", "2024-03"]
+        assert first.count("\n") == 7
+        assert self._export(client, auth_headers) == first
+        assert self._segments() == segments
+
+        response = client.put(f"/observations/{february}", json={"temperature": 9.5}, headers=auth_headers)
+        assert response.status_code == 200
+        changed = self._export(client, auth_headers)
+        assert "9.5" in changed
+        current = [name for name in self._segments() if name not in segments]
+        assert self._months(current) == ["2024-02"]
+
+        # Rebuilding every segment from scratch gives the same file
+        for name in self._segments():
+            os.remove(os.path.join(settings.export_storage_dir, "segments", name))
+        assert self._export(client, auth_headers) == changed
+
+        # Renaming an observer changes the rows of every month they appear in
+        db_session.query(User).update({User.formal_name: "Renamed Observer"})
+        db_session.commit()
+        assert self._export(client, auth_headers).count("Renamed Observer") == 6
+
+    def test_edge_months_are_generated_per_request(self, client, auth_headers, db_session, test_user):
+        for month, day in ((1, 10), (1, 20), (2, 10), (3, 10), (3, 20)):
+            db_session.add(Observation(observation_time=datetime(2024, month, day, 8), observer_id=test_user.id))
+        db_session.commit()
+
+        body = self._export(client, auth_headers, start_date="2024-01-15T00:00:00", end_date="2024-03-15T00:00:00")
+        assert [line[:10] for line in body.splitlines()[1:]] == ["2024-03-10", "2024-02-10", "2024-01-20"]
+        assert self._months(self._segments()) == ["2024-02"]
+
+    def test_writers_racing_on_a_new_month_both_bump_it(self, db_session):
+        station_id = stations.default_station(db_session).id
+        sessions = sessionmaker(bind=db_session.get_bind())
+        first, second = sessions(), sessions()
+        try:
+            # Neither sees the other's row when it decides to create the month
+            exports.mark_dirty(first, [(station_id, datetime(2024, 5, 3, 8))])
+            exports.mark_dirty(second, [(station_id, datetime(2024, 5, 20, 8))])
+            first.commit()
+            second.commit()
+        finally:
+            first.close()
+            second.close()
+        assert exports.month_versions(db_session, station_id, ["2024-05"]).startswith("2-")
+
+    def test_purge_segments(self, client, auth_headers, db_session, test_user):
+        db_session.add(Observation(observation_time=datetime(2024, 1, 10, 8), observer_id=test_user.id))
+        db_session.commit()
+        self._export(client, auth_headers)
+        outdated = self._segments()
+
+        exports.mark_dirty(db_session, [(stations.default_station(db_session).id, datetime(2024, 1, 10, 8))])
+        db_session.commit()
+        self._export(client, auth_headers)
+        assert len(self._segments()) == 2
+
+        # Outdated segments wait out the grace period; current ones stay until unused for the maximum age
+        assert exports.purge_segments(db_session) == 0
+        later = datetime.now(timezone.utc) + timedelta(hours=2)
+        assert exports.purge_segments(db_session, later) == 1
+        assert outdated[0] not in self._segments() and len(self._segments()) == 1
+        much_later = later + timedelta(days=settings.export_segment_max_age_days)
+        assert exports.purge_segments(db_session, much_later) == 1
@@ -0,0 +1,70 @@
+import pytest
+from src.models.user_model import User
+from src.services import exports, fieldsets, stations
+
+OBSERVATIONS = [
+    {"observation_time": "2024-01-01T08:00:00", "temperature": 20.0, "notes": "clear sky"},
+    {"observation_time": "2024-01-02T08:00:00", "temperature": 21.5, "notes": "light rain"},
+]
+
+@pytest.fixture
+def observation_ids(client, auth_headers):
+    ids = []
+    for observation in OBSERVATIONS:
+        response = client.post("/observations/", json=observation, headers=auth_headers)
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+    return ids
+
+class TestFieldsets:
+
+    def test_list_loads_only_requested_columns(self, client, auth_headers, observation_ids, statements):
+        response = client.get("/observations/", params={"fields": "temperature,observation_time"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == [
+            {"id": observation_ids[1], "observation_time": "2024-01-02T08:00:00", "temperature": 21.5},
+            {"id": observation_ids[0], "observation_time": "2024-01-01T08:00:00", "temperature": 20.0},
+        ]
+        selects = [statement for statement in statements if statement.startswith("SELECT") and "FROM observations" in statement]
+        assert selects and not any("notes" in statement or "wet_bulb" in statement for statement in selects)
+
+        full = client.get("/observations/", headers=auth_headers).json()
+        assert full[0]["notes"] == "light rain" and full[0]["observer_name"]
+
+    def test_detail_and_search_fields(self, client, auth_headers, observation_ids):
+        response = client.get(f"/observations/{observation_ids[0]}", params={"fields": "observer_name"}, headers=auth_headers)
+        assert response.json() == {"id": observation_ids[0], "observer_name": "Test Display"}
+
+        searched = client.get("/observations/", params={"q": "rain", "fields": "search_snippet"}, headers=auth_headers).json()
+        assert [set(row) for row in searched] == [{"id", "search_snippet"}]
+        assert "<mark>" in searched[0]["search_snippet"]
+
+        for params in ({"fields": "temperature,wind"}, {"fields": ","}):
+            assert client.get("/observations/", params=params, headers=auth_headers).status_code == 422
+
+    def test_export_columns(self, client, auth_headers, observation_ids):
+        params = {"fields": "temperature,observation_time"}
+        body = client.get("/observations/export/csv", params=params, headers=auth_headers).content.decode("utf-8-sig")
+        assert body.splitlines() == ["觀測時間,現在溫度 (°C)", "2024-01-02 08:00:00,21.5", "2024-01-01 08:00:00,20.0"]
+        assert client.get("/observations/export/csv", params={"fields": "id"}, headers=auth_headers).status_code == 422
+
+        full = client.get("/observations/export/csv", headers=auth_headers).content.decode("utf-8-sig")
+        assert full.splitlines()[0] == ",".join(exports.CSV_HEADER)
+
+    def test_response_models_are_cached_per_field_set(self):
+        fields = fieldsets.response_fields("temperature,observation_time")
+        assert fields == ("id", "observation_time", "temperature")
+        assert fieldsets.response_model(fields) is fieldsets.response_model(fieldsets.response_fields("observation_time,temperature"))
+
+    def test_export_job_columns(self, client, auth_headers, db_session, observation_ids):
+        user = db_session.query(User).one()
+        station = stations.default_station(db_session)
+        job, _ = exports.enqueue(db_session, user, station, None, None, [], ["temperature"])
+        job_id = job.id
+        other, created = exports.enqueue(db_session, user, station, None, None, [])
+        assert created and other.id != job_id
+
+        assert exports.run_export(db_session, job_id) == "succeeded"
+        with open(exports.file_path(job_id), encoding="utf-8-sig") as output:
+            assert output.read().splitlines() == ["現在溫度 (°C)", "21.5", "20.0"]
+        assert client.get(f"/observations/export/jobs/{job_id}", headers=auth_headers).json()["fields"] == ["temperature"]
@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime
+from src.models.observation_model import Observation
+from src.services import archive, filters
+
+class TestFilters:
+
+    @pytest.fixture
+    def observations(self, db_session, test_user):
+        rows = [
+            Observation(observation_time=datetime(2024, 1, 10), observer_id=test_user.id,
+                        total_cloud_amount=7, current_weather_code="61", low_cloud_type_code=9),
+            Observation(observation_time=datetime(2024, 1, 11), observer_id=test_user.id,
+                        total_cloud_amount=8, current_weather_code="80", low_cloud_type_code=7),
+            Observation(observation_time=datetime(2024, 1, 12), observer_id=test_user.id,
+                        total_cloud_amount=3, current_weather_code="02"),
+            Observation(observation_time=datetime(2024, 1, 13), observer_id=test_user.id,
+                        total_cloud_amount=6, current_weather_code="65", has_cleaned_evaporation_pan=True),
+        ]
+        db_session.add_all(rows)
+        db_session.commit()
+        return rows
+
+    def _days(self, client, auth_headers, *expressions):
+        response = client.get("/observations/", params={"filter": list(expressions)}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return [int(row["observation_time"][8:10]) for row in response.json()]
+
+    def test_filters_compose_into_one_query(self, client, auth_headers, observations):
+        assert self._days(client, auth_headers, "total_cloud_amount:gte:6", "current_weather_code:between:60..69") == [13, 10]
+        assert self._days(client, auth_headers, "low_cloud_type_code:eq:9") == [10]
+        assert self._days(client, auth_headers, "low_cloud_type_code:null") == [13, 12]
+        assert self._days(client, auth_headers, "current_weather_code:lt:10") == [12]
+        assert self._days(client, auth_headers, "low_cloud_type_code:in:7,8") == [11]
+        assert self._days(client, auth_headers, "has_cleaned_evaporation_pan:eq:true") == [13]
+
+    def test_invalid_filters_are_rejected(self, client, auth_headers, observations):
+        for expression in ("cloudiness:gte:6", "total_cloud_amount:like:6", "total_cloud_amount:gte:many",
+                           "total_cloud_amount:between:6", "notes:gt:a"):
+            response = client.get("/observations/", params={"filter": expression}, headers=auth_headers)
+            assert response.status_code == 422, expression
+
+    def test_validation_is_cached_per_shape(self):
+        filters._plan.cache_clear()
+        filters.compile_filters(["total_cloud_amount:gte:6"])
+        filters.compile_filters(["total_cloud_amount:gte:2"])
+        filters.compile_filters(["total_cloud_amount:lte:2"])
+        info = filters._plan.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+
+    def test_filters_apply_to_archive_and_export(self, client, auth_headers, db_session, test_user):
+        db_session.add_all([
+            Observation(observation_time=datetime(2020, 1, 10), observer_id=test_user.id, total_cloud_amount=8, current_weather_code="63"),
+            Observation(observation_time=datetime(2020, 1, 11), observer_id=test_user.id, total_cloud_amount=2),
+        ])
+        db_session.commit()
+        archive.archive_observations(db_session, datetime(2021, 1, 1))
+
+        assert self._days(client, auth_headers, "current_weather_code:between:60..69") == [10]
+
+        response = client.get("/observations/export/csv", params={"filter": "total_cloud_amount:lte:4"}, headers=auth_headers)
+        lines = response.content.decode("utf-8-sig").strip().splitlines()
+        assert len(lines) == 2
+        assert lines[1].startswith("2020-01-11")
+
+        response = client.get("/observations/export/csv", params={"filter": "total_cloud_amount:xx:4"}, headers=auth_headers)
+        assert response.status_code == 422
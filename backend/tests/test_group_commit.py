@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+from main import app
+from src.core import metrics
+from src.models.observation_model import Observation
+from src.services import group_commit
+
+class TestGroupCommit:
+
+    def _writer(self, db_session, window_ms=50, max_items=64):
+        return group_commit.GroupCommitWriter(sessionmaker(bind=db_session.get_bind()), window_ms, max_items)
+
+    def test_concurrent_creates_share_one_transaction(self, db_session, test_user):
+        writer = self._writer(db_session)
+        before = metrics.summary(group_commit.WINDOW_SIZE).count
+
+        async def burst():
+            rows = [
+                {"observation_time": datetime(2024, 1, 1, hour), "observer_id": test_user.id,
+                 "temperature": 25.0, "wet_bulb_temperature": 22.0, "notes": "午後雷雨"}
+                for hour in range(10)
+            ]
+            results = await asyncio.gather(*(writer.submit(row) for row in rows))
+            await writer.close()
+            return results
+
+        results = asyncio.run(burst())
+        assert [result["observation_time"].hour for result in results] == list(range(10))
+        assert len({result["id"] for result in results}) == 10
+        assert metrics.summary(group_commit.WINDOW_SIZE).count == before + 1
+
+        stored = db_session.query(Observation).order_by(Observation.id).all()
+        assert len(stored) == 10
+        assert stored[0].relative_humidity is not None
+        assert stored[0].notes_search == "午後 後雷 雷雨 午 後 雷 雨"
+
+    def test_failed_row_only_fails_its_caller(self, db_session, test_user):
+        writer = self._writer(db_session)
+
+        async def burst():
+            rows = [
+                {"observation_time": datetime(2024, 1, 1, 8), "observer_id": test_user.id},
+                {"observation_time": None, "observer_id": test_user.id},
+                {"observation_time": datetime(2024, 1, 1, 9), "observer_id": test_user.id},
+            ]
+            results = await asyncio.gather(*(writer.submit(row) for row in rows), return_exceptions=True)
+            await writer.close()
+            return results
+
+        first, failed, last = asyncio.run(burst())
+        assert isinstance(failed, Exception)
+        assert first["observation_time"].hour == 8 and last["observation_time"].hour == 9
+        assert db_session.query(Observation).count() == 2
+
+    def test_create_endpoint_uses_writer(self, client, auth_headers, admin_headers, db_session):
+        app.dependency_overrides[group_commit.get_group_writer] = lambda: self._writer(db_session, window_ms=1)
+        response = client.post("/observations/", json={"observation_time": "2024-01-15T10:00:00", "temperature": 25.5}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["temperature"] == 25.5
+        assert db_session.query(Observation).count() == 1
+
+        response = client.get("/admin/metrics", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["summaries"][group_commit.WINDOW_SIZE]["count"] >= 1
+        assert client.get("/admin/metrics", headers=auth_headers).status_code == 403
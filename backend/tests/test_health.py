@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import create_engine
+from src.core.config import settings
+from src.core.database import TimedQueuePool
+from src.core.health import LoopLagMonitor, ReadinessCheck, get_readiness
+from main import app
+
+class TestHealth:
+
+    @pytest.fixture
+    def probe(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "readiness_cache_seconds", 0)
+        monkeypatch.setattr(settings, "db_max_overflow", 0)
+        engine = create_engine(f"sqlite:///{tmp_path / 'ready.db'}", poolclass=TimedQueuePool, pool_size=1, max_overflow=0)
+        monitor = LoopLagMonitor(interval=1)
+        check = ReadinessCheck(engine, monitor)
+        app.dependency_overrides[get_readiness] = lambda: check
+        yield engine, monitor
+        engine.dispose()
+
+    def test_liveness_never_touches_the_database(self, client):
+        for path in ("/health", "/health/live"):
+            response = client.get(path)
+            assert response.status_code == 200
+            assert response.json()["status"] == "healthy"
+
+    def test_ready(self, client, probe):
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        report = response.json()
+        assert report["status"] == "ready"
+        assert report["database"]["ok"] is True
+        assert report["pool"]["size"] == 1 and report["pool"]["checked_out"] == 0
+
+    def test_saturated_pool_is_not_ready_and_not_pinged(self, client, probe):
+        engine, _ = probe
+        with engine.connect():
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            report = response.json()
+            assert report["reasons"] == ["connection pool saturated"]
+            assert report["database"]["ok"] is None
+            assert report["pool"]["utilization"] == 1.0
+        assert client.get("/health/ready").status_code == 200
+
+    def test_event_loop_lag_is_not_ready(self, client, probe):
+        _, monitor = probe
+        monitor.record(settings.readiness_max_loop_lag_seconds + 1)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["event loop lagging"]
+
+    def test_unreachable_database_is_not_ready(self, client, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'ready.db'}")
+        app.dependency_overrides[get_readiness] = lambda: ReadinessCheck(engine, LoopLagMonitor(interval=1))
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["database: OperationalError"]
+
+    def test_result_is_reused_within_the_cache_window(self, client, probe, monkeypatch):
+        monkeypatch.setattr(settings, "readiness_cache_seconds", 60)
+        first = client.get("/health/ready").json()
+        engine, _ = probe
+        with engine.connect():
+            second = client.get("/health/ready")
+        assert second.status_code == 200
+        assert second.json()["checked_at"] == first["checked_at"]
@@ -0,0 +1,146 @@
+import asyncio
+import gzip
+import threading
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+from src.models.sensor_model import SensorReading
+from src.services import ingestion
+from src.services.ingestion import IngestBuffer, IngestBusy, get_ingest_buffer
+from main import app
+
+LINES = "\n".join([
+    "weather,site=roof temperature=21.5,relative_humidity=80i,precipitation=0.5 1704067200",
+    "# comment lines and blanks are skipped",
+    "",
+    "weather temperature=22.0,pressure=1008.2,precipitation=1.0 1704067260",
+])
+
+@pytest.fixture
+def ingest_buffer(client, db_session):
+    buffer = IngestBuffer(sessionmaker(bind=db_session.get_bind()), 10, 1000, 100, 0.1)
+    app.dependency_overrides[get_ingest_buffer] = lambda: buffer
+    yield buffer
+    client.portal.call(buffer.close)
+
+@pytest.fixture
+def device(client, admin_headers):
+    response = client.post("/ingest/devices", json={"name": "Roof AWS"}, headers=admin_headers)
+    assert response.status_code == 200
+    return response.json()
+
+def _post(client, device, body, content_type="text/plain", **headers):
+    return client.post(
+        "/ingest/readings",
+        content=body,
+        headers={"Authorization": f"Bearer {device['token']}", "Content-Type": content_type, **headers},
+    )
+
+class TestParsing:
+
+    def test_line_protocol(self):
+        readings = ingestion.parse_line_protocol(LINES)
+        assert [reading["time"] for reading in readings] == [datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 1)]
+        assert readings[0]["relative_humidity"] == 80.0 and readings[0]["pressure"] is None
+        assert ingestion.parse_line_protocol("w temperature=1 1704067200000", "ms")[0]["time"] == datetime(2024, 1, 1)
+
+        for bad in ("w temperature=warm 1", "w wind=3 1", "w temperature=1 soon", "w temperature=1 1704067200000"):
+            with pytest.raises(ingestion.IngestError):
+                ingestion.parse_line_protocol(bad)
+
+    def test_ndjson(self):
+        readings = ingestion.parse_ndjson(
+            '{"time": "2024-01-01T08:00:00+08:00", "temperature": 20}\n{"time": 1704067260, "pressure": 1000.5}\n'
+        )
+        assert [reading["time"] for reading in readings] == [datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 1)]
+
+        for bad in ('{"temperature": "20"}', '[1, 2]', '{"time": true, "temperature": 1}', '{"time": "2024-01-01"}'):
+            with pytest.raises(ingestion.IngestError):
+                ingestion.parse_ndjson(bad)
+
+class TestIngestion:
+
+    def test_batches_are_stored_once(self, client, db_session, ingest_buffer, device):
+        response = _post(client, device, LINES)
+        assert response.status_code == 200
+        assert response.json() == {"received": 2, "accepted": 2}
+
+        # A device re-sending a batch after a lost response does not duplicate it
+        response = _post(client, device, gzip.compress(LINES.encode()), **{"Content-Encoding": "gzip"})
+        assert response.json() == {"received": 2, "accepted": 0}
+
+        response = _post(client, device, '{"time": 1704067320, "temperature": 22.5}\n', "application/x-ndjson")
+        assert response.json() == {"received": 1, "accepted": 1}
+        assert db_session.query(SensorReading).count() == 3
+
+    def test_readings_merge_with_observations(self, client, auth_headers, ingest_buffer, device):
+        observation = {"observation_time": "2024-01-01T00:00:30", "temperature": 21.0}
+        assert client.post("/observations/", json=observation, headers=auth_headers).status_code == 200
+        assert client.get("/observations/dashboard", headers=auth_headers).json()["sensor"] is None
+
+        _post(client, device, LINES)
+        sensor = client.get("/observations/dashboard", headers=auth_headers).json()["sensor"]
+        assert sensor["temperature"] == 22.0
+        assert sensor["pressure"] == 1008.2
+        assert sensor["precipitation_24h"] == 1.5
+
+        def series(**params):
+            response = client.get("/observations/series", params={"field": "temperature", **params}, headers=auth_headers)
+            assert response.status_code == 200
+            return response.json()["values"]
+
+        assert series() == [21.0]
+        assert series(source="sensor") == [21.5, 22.0]
+        assert series(source="all") == [21.5, 21.0, 22.0]
+        assert series(field="pressure", source="all") == [1008.2]
+        assert client.get("/observations/series", params={"field": "pressure"}, headers=auth_headers).status_code == 422
+
+    def test_rejected_requests(self, client, admin_headers, db_session, ingest_buffer, device):
+        assert _post(client, {"token": "dev_wrong"}, LINES).status_code == 401
+        assert _post(client, device, LINES, "application/json").status_code == 415
+        response = _post(client, device, "weather temperature=1\nweather wind=3")
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("line 2:")
+        assert _post(client, device, b"not gzip", **{"Content-Encoding": "gzip"}).status_code == 400
+
+        oversized = "\n".join(f"w temperature=1 {1704067200 + minute * 60}" for minute in range(101))
+        assert _post(client, device, oversized).status_code == 413
+        assert db_session.query(SensorReading).count() == 0
+
+        response = client.put(f"/ingest/devices/{device['id']}", json={"is_active": False}, headers=admin_headers)
+        assert response.status_code == 200
+        assert _post(client, device, LINES).status_code == 401
+
+    def test_device_management_is_admin_only(self, client, auth_headers, admin_headers, device):
+        assert client.post("/ingest/devices", json={"name": "x"}, headers=auth_headers).status_code == 403
+        listed = client.get("/ingest/devices", headers=admin_headers).json()
+        assert [(entry["name"], entry["token_prefix"]) for entry in listed] == [("Roof AWS", device["token"][:12])]
+        assert "token" not in listed[0]
+
+class TestIngestBuffer:
+
+    def test_full_buffer_refuses_after_timeout(self):
+        release = threading.Event()
+        written = []
+
+        class BlockedBuffer(IngestBuffer):
+            def _write(self, rows):
+                release.wait(5)
+                written.extend(rows)
+                return {(row["device_id"], row["time"]) for row in rows}
+
+        async def scenario():
+            buffer = BlockedBuffer(None, 10, 1000, 3, 0.05)
+            batch = [{"device_id": 1, "time": datetime(2024, 1, 1, 0, minute)} for minute in range(2)]
+            first = asyncio.ensure_future(buffer.submit(batch))
+            await asyncio.sleep(0.05)
+            # The first batch is still being written, so there is no room for another
+            with pytest.raises(IngestBusy):
+                await buffer.submit(batch)
+            release.set()
+            assert await first == 2
+            assert await buffer.submit(batch) == 2
+            await buffer.close()
+
+        asyncio.run(scenario())
+        assert len(written) == 4
@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime
+from src.models.observation_model import Observation
+from src.services import observation_writes, psychrometrics
+
+class TestObservationWrites:
+
+    @pytest.fixture
+    def observation(self, db_session, test_user):
+        observation = Observation(
+            observation_time=datetime(2024, 1, 15, 10, 0),
+            observer_id=test_user.id,
+            temperature=25.0,
+            wet_bulb_temperature=22.0,
+            notes="晴"
+        )
+        db_session.add(observation)
+        db_session.commit()
+        return observation.id
+
+    @pytest.fixture
+    def writes(self, statements, test_user, admin_user, observation, monkeypatch):
+        """SQL statements issued by the write itself, hooks excluded, and the changes it reported"""
+        for user in (test_user, admin_user):
+            user.is_admin  # load expired attributes before counting
+        changes = []
+        monkeypatch.setattr(observation_writes, "observations_changed", lambda db, items: changes.extend(items))
+        statements.clear()
+        return statements, changes
+
+    def test_update_is_one_statement(self, db_session, test_user, observation, writes):
+        executed, changes = writes
+        row = observation_writes.update_observation(db_session, observation, test_user, {"temperature": 27.0, "notes": "多雲"})
+
+        assert len(executed) == 1
+        assert row.observer_name == "Test Display"
+        assert row.temperature == 27.0
+        assert row.notes_search == "多雲 多 雲"
+        expected = psychrometrics.derive_rows([27.0], [22.0])[0]
+        assert row.relative_humidity == pytest.approx(expected["relative_humidity"])
+        assert row.dew_point == pytest.approx(expected["dew_point"])
+        assert changes[0].old_time == changes[0].new_time
+
+    def test_moving_an_observation_is_two_statements(self, db_session, test_user, observation, writes):
+        executed, changes = writes
+        row = observation_writes.update_observation(
+            db_session, observation, test_user, {"observation_time": datetime(2024, 1, 16, 10, 0)}
+        )
+
+        assert len(executed) == 2
+        assert row.relative_humidity is not None
+        assert changes[0].old_time.day == 15 and changes[0].new_time.day == 16
+
+    def test_delete_is_one_statement(self, db_session, test_user, observation, writes):
+        executed, changes = writes
+        assert observation_writes.delete_observation(db_session, observation, test_user)
+
+        assert len(executed) == 1
+        assert changes[0].old_time.day == 15 and changes[0].new_time is None
+
+    def test_guarded_writes_skip_other_users_rows(self, db_session, admin_user, test_user, observation, writes):
+        executed, changes = writes
+        other = type(test_user)(id=test_user.id + 100, is_admin=False)
+        assert observation_writes.update_observation(db_session, observation, other, {"temperature": 1.0}) is None
+        assert not observation_writes.delete_observation(db_session, observation, other)
+        assert len(executed) == 2 and not changes
+
+        assert observation_writes.update_observation(db_session, observation, admin_user, {"temperature": 1.0}).temperature == 1.0
+
+    def test_api_keeps_404_and_403(self, client, auth_headers, admin_user, db_session):
+        observation = Observation(observation_time=datetime(2024, 1, 15, 10, 0), observer_id=admin_user.id)
+        db_session.add(observation)
+        db_session.commit()
+        observation_id = observation.id
+
+        assert client.put(f"/observations/{observation_id}", json={"temperature": 1.0}, headers=auth_headers).status_code == 403
+        assert client.delete(f"/observations/{observation_id}", headers=auth_headers).status_code == 403
+        assert client.put("/observations/9999", json={"temperature": 1.0}, headers=auth_headers).status_code == 404
+        assert client.delete("/observations/9999", headers=auth_headers).status_code == 404
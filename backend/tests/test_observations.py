@@ -120,11 +120,12 @@ class TestObservations:
         db_session.commit()
         db_session.refresh(observation)
         
-        response = client.delete(f"/observations/{observation.id}", headers=auth_headers)
+        observation_id = observation.id
+        response = client.delete(f"/observations/{observation_id}", headers=auth_headers)
         assert response.status_code == 200
         
         # Verify deletion
-        response = client.get(f"/observations/{observation.id}", headers=auth_headers)
+        response = client.get(f"/observations/{observation_id}", headers=auth_headers)
         assert response.status_code == 404
 
     def test_access_other_user_observation_forbidden(self, client, auth_headers, admin_user, db_session):
@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+from datetime import datetime
+from src.models.observation_model import Observation
+from src.services import psychrometrics
+
+class TestPsychrometrics:
+
+    def test_derive_matches_psychrometric_tables(self):
+        derived = psychrometrics.derive([25.0, 30.0], [22.0, 25.0], pressure=1013.25)
+
+        assert derived["relative_humidity"].tolist() == pytest.approx([77.0, 66.6], abs=0.5)
+        assert derived["dew_point"].tolist() == pytest.approx([20.7, 23.1], abs=0.2)
+        assert derived["vapour_pressure"].tolist() == pytest.approx([24.4, 28.2], abs=0.2)
+
+    def test_derive_handles_missing_readings(self):
+        derived = psychrometrics.derive([25.0, None], [None, 20.0])
+
+        assert np.isnan(derived["relative_humidity"]).all()
+        assert psychrometrics.to_optional(derived["dew_point"]) == [None, None]
+
+    def test_cached_columns_follow_readings(self, db_session, test_user):
+        observation = Observation(
+            observation_time=datetime(2024, 1, 15, 10, 0),
+            observer_id=test_user.id,
+            temperature=25.0,
+            wet_bulb_temperature=22.0
+        )
+        db_session.add(observation)
+        db_session.commit()
+        assert observation.relative_humidity == pytest.approx(77.0, abs=0.5)
+
+        observation.wet_bulb_temperature = 25.0
+        db_session.commit()
+        assert observation.relative_humidity == 100.0
+
+    def test_filter_and_export_humidity(self, client, auth_headers, test_user, db_session):
+        db_session.add_all([
+            Observation(observation_time=datetime(2024, 1, 15, 8, 0), observer_id=test_user.id, temperature=25.0, wet_bulb_temperature=22.0),
+            Observation(observation_time=datetime(2024, 1, 15, 14, 0), observer_id=test_user.id, temperature=30.0, wet_bulb_temperature=20.0),
+        ])
+        db_session.commit()
+
+        response = client.get("/observations/", params={"min_humidity": 60}, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["relative_humidity"] == pytest.approx(77.0, abs=0.5)
+        assert data[0]["dew_point"] is not None
+
+        response = client.get("/observations/export/csv", headers=auth_headers)
+        header = response.content.decode("utf-8-sig").splitlines()[0]
+        assert header.endswith("相對濕度 (%),露點溫度 (°C),水氣壓 (hPa)")
@@ -0,0 +1,112 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from src.models.observation_model import Observation
+from src.models.quality_model import QCFlag
+from src.models.user_model import User
+from src.services import quality, stations
+
+def _create(client, headers, hour, **values):
+    body = {"observation_time": f"2024-01-01T{hour:02d}:00:00", **values}
+    response = client.post("/observations/", json=body, headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def _flags(client, headers, **params):
+    response = client.get("/observations/qc/flags", params=params, headers=headers)
+    assert response.status_code == 200
+    return {(flag["observation_id"], flag["rule"]) for flag in response.json()}
+
+class TestQualityRules:
+
+    def test_rules_flag_observations_on_write(self, client, auth_headers):
+        clean = _create(client, auth_headers, 0, temperature=20.0, wet_bulb_temperature=18.0,
+                        total_cloud_amount=6, low_cloud_amount=4)
+        wet_bulb = _create(client, auth_headers, 1, temperature=20.0, wet_bulb_temperature=21.5)
+        clouds = _create(client, auth_headers, 2, total_cloud_amount=3, high_cloud_amount=5, low_cloud_amount=2)
+        evaporation = _create(client, auth_headers, 3, has_added_evaporation_water=True)
+        spike = _create(client, auth_headers, 4, temperature=35.0)
+        # Twelve hours after the last reading is outside the spike window
+        _create(client, auth_headers, 16, temperature=10.0)
+
+        assert _flags(client, auth_headers) == {
+            (wet_bulb, quality.WET_BULB_ABOVE_DRY_BULB),
+            (clouds, quality.CLOUD_AMOUNT_EXCEEDS_TOTAL),
+            (evaporation, quality.EVAPORATION_LEVEL_MISSING),
+            (spike, quality.TEMPERATURE_SPIKE),
+        }
+        assert clean not in {observation_id for observation_id, _ in _flags(client, auth_headers)}
+        response = client.get("/observations/qc/flags", params={"rule": "temperature_spike"}, headers=auth_headers)
+        assert response.json()[0]["detail"] == "temperature changed 15.0 °C in 3.0 h"
+
+    def test_edits_and_deletes_recheck_neighbours(self, client, auth_headers):
+        first = _create(client, auth_headers, 0, temperature=20.0)
+        second = _create(client, auth_headers, 1, temperature=32.0)
+        third = _create(client, auth_headers, 2, temperature=21.0)
+        assert _flags(client, auth_headers) == {
+            (second, quality.TEMPERATURE_SPIKE), (third, quality.TEMPERATURE_SPIKE)
+        }
+
+        # Fixing the outlier clears its flag and the one on the reading after it
+        client.put(f"/observations/{second}", json={"temperature": 20.5}, headers=auth_headers)
+        assert _flags(client, auth_headers) == set()
+
+        client.put(f"/observations/{first}", json={"wet_bulb_temperature": 25.0}, headers=auth_headers)
+        client.put(f"/observations/{second}", json={"temperature": 5.0}, headers=auth_headers)
+        assert _flags(client, auth_headers) == {
+            (first, quality.WET_BULB_ABOVE_DRY_BULB),
+            (second, quality.TEMPERATURE_SPIKE),
+            (third, quality.TEMPERATURE_SPIKE),
+        }
+        client.delete(f"/observations/{second}", headers=auth_headers)
+        assert _flags(client, auth_headers) == {(first, quality.WET_BULB_ABOVE_DRY_BULB)}
+
+    def test_observations_filter_by_flag(self, client, auth_headers):
+        _create(client, auth_headers, 0, temperature=20.0)
+        flagged = _create(client, auth_headers, 1, temperature=20.0, wet_bulb_temperature=22.0)
+
+        def listed(qc_flag):
+            response = client.get("/observations/", params={"qc_flag": qc_flag}, headers=auth_headers)
+            assert response.status_code == 200
+            return [observation["id"] for observation in response.json()]
+
+        assert listed("any") == [flagged]
+        assert listed(quality.WET_BULB_ABOVE_DRY_BULB) == [flagged]
+        assert listed(quality.TEMPERATURE_SPIKE) == []
+        assert client.get("/observations/", params={"qc_flag": "odd"}, headers=auth_headers).status_code == 422
+        assert client.get("/observations/qc/flags", params={"rule": "odd"}, headers=auth_headers).status_code == 422
+
+class TestQualityScan:
+
+    def test_scan_is_admin_only_and_replaces_flags(self, client, auth_headers, admin_headers, db_session):
+        flagged = _create(client, auth_headers, 0, temperature=20.0, wet_bulb_temperature=22.0)
+        db_session.query(QCFlag).delete()
+        db_session.commit()
+
+        assert client.post("/observations/qc/scan", headers=auth_headers).status_code == 403
+        response = client.post("/observations/qc/scan", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["scanned"] == 1
+        assert response.json()["flagged"] == {quality.WET_BULB_ABOVE_DRY_BULB: 1}
+        assert _flags(client, auth_headers) == {(flagged, quality.WET_BULB_ABOVE_DRY_BULB)}
+        assert client.post("/observations/qc/scan", params={"station_id": 999}, headers=admin_headers).status_code == 404
+
+    def test_bulk_scan_is_vectorized(self, db_session, test_user, monkeypatch):
+        monkeypatch.setattr(quality.settings, "qc_scan_chunk_rows", 1000)
+        observer_id = db_session.query(User).one().id
+        station_id = stations.default_station(db_session).id
+        start = datetime(2020, 1, 1)
+        rows = [
+            dict(observation_time=start + timedelta(hours=hour), observer_id=observer_id, station_id=station_id,
+                 temperature=40.0 if hour % 1000 == 500 else 20.0 + (hour % 24) / 4)
+            for hour in range(20000)
+        ]
+        db_session.execute(insert(Observation.__table__), rows)
+        db_session.commit()
+
+        started = time.perf_counter()
+        result = quality.scan(db_session)
+        assert time.perf_counter() - started < 10
+        # Each outlier is a spike, and so is the return to normal after it, across chunk boundaries too
+        assert result["scanned"] == 20000
+        assert result["flagged"] == {quality.TEMPERATURE_SPIKE: 40}
@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy.orm import sessionmaker
+from src.core import metrics
+from src.core.scheduler import CronSchedule, IntervalSchedule, Job, Scheduler
+from src.models.job_model import ScheduledJobRun
+
+UTC = timezone.utc
+
+class TestScheduler:
+
+    def test_cron_schedule_in_station_time(self):
+        # 03:30 Asia/Taipei is 19:30 UTC the day before
+        schedule = CronSchedule("30 3 * * *", "Asia/Taipei")
+        assert schedule.next_after(datetime(2024, 1, 15, 12, 0, tzinfo=UTC)) == datetime(2024, 1, 15, 19, 30, tzinfo=UTC)
+        assert schedule.next_after(datetime(2024, 1, 15, 19, 30, tzinfo=UTC)) == datetime(2024, 1, 16, 19, 30, tzinfo=UTC)
+
+        every_ten = CronSchedule("*/10 * * * *", "UTC")
+        assert every_ten.next_after(datetime(2024, 1, 15, 12, 3, tzinfo=UTC)) == datetime(2024, 1, 15, 12, 10, tzinfo=UTC)
+
+        sundays = CronSchedule("0 4 * * 0", "UTC")
+        assert sundays.next_after(datetime(2024, 1, 15, tzinfo=UTC)) == datetime(2024, 1, 21, 4, 0, tzinfo=UTC)
+
+        leap_day = CronSchedule("0 0 29 2 *", "UTC")
+        assert leap_day.next_after(datetime(2025, 1, 1, tzinfo=UTC)) == datetime(2028, 2, 29, tzinfo=UTC)
+
+        with pytest.raises(ValueError):
+            CronSchedule("61 * * * *")
+
+    def test_interval_ticks_are_aligned(self):
+        schedule = IntervalSchedule(600)
+        assert schedule.next_after(datetime(2024, 1, 15, 12, 3, 20, tzinfo=UTC)) == datetime(2024, 1, 15, 12, 10, tzinfo=UTC)
+        assert schedule.next_after(datetime(2024, 1, 15, 12, 10, tzinfo=UTC)) == datetime(2024, 1, 15, 12, 20, tzinfo=UTC)
+
+    def test_each_tick_runs_once(self, db_session):
+        calls = []
+        job = Job("count", lambda db: calls.append(1), IntervalSchedule(60))
+        # Two schedulers stand in for two replicas sharing the database
+        replicas = [Scheduler(sessionmaker(bind=db_session.get_bind()), [job]) for _ in range(2)]
+        tick = datetime(2024, 1, 15, 12, 0, tzinfo=UTC)
+
+        assert replicas[0].run_job(job, tick) == "succeeded"
+        assert replicas[1].run_job(job, tick) == "skipped"
+        assert replicas[1].run_job(job, datetime(2024, 1, 15, 12, 1, tzinfo=UTC)) == "succeeded"
+        assert len(calls) == 2
+        assert metrics.summary("scheduler.count.seconds").count >= 2
+
+    def test_failures_are_recorded(self, db_session):
+        def broken(db):
+            raise RuntimeError("disk full")
+
+        job = Job("broken", broken, IntervalSchedule(60))
+        scheduler = Scheduler(sessionmaker(bind=db_session.get_bind()), [job])
+        before = metrics.counter("scheduler.broken.failures")
+
+        assert scheduler.run_job(job, datetime(2024, 1, 15, 12, 0, tzinfo=UTC)) == "failed"
+        assert metrics.counter("scheduler.broken.failures") == before + 1
+        run = db_session.get(ScheduledJobRun, "broken")
+        assert run.error == "RuntimeError: disk full"
+        assert run.failure_count == 1
+
+    def test_jobs_endpoint(self, client, admin_headers, auth_headers):
+        response = client.get("/admin/jobs", headers=admin_headers)
+        assert response.status_code == 200
+        names = [job["name"] for job in response.json()]
+        assert "refresh_climatology" in names and "archive_old_months" in names
+        assert client.get("/admin/jobs", headers=auth_headers).status_code == 403
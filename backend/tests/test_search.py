@@ -0,0 +1,54 @@
+from datetime import datetime
+from src.models.observation_model import Observation
+from src.services import archive, search
+
+class TestSearch:
+
+    def _add(self, db_session, observer_id, day, notes):
+        observation = Observation(observation_time=datetime(2024, 1, day, 0, 0), observer_id=observer_id, notes=notes)
+        db_session.add(observation)
+        db_session.commit()
+        return observation
+
+    def test_tokens_split_chinese_into_bigrams(self):
+        assert search.tokens("午後雷雨 Fog") == ["午後", "後雷", "雷雨", "fog"]
+        assert "霧" in search.index_tokens("早上有霧")
+
+    def test_search_ranks_and_highlights(self, client, auth_headers, test_user, db_session):
+        self._add(db_session, test_user.id, 10, "早上有霧，能見度差")
+        self._add(db_session, test_user.id, 11, "午後雷雨，雷雨持續一小時")
+        self._add(db_session, test_user.id, 12, "晴朗")
+
+        response = client.get("/observations/", params={"q": "雷雨"}, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["search_snippet"] == "午後<mark>雷雨</mark>，<mark>雷雨</mark>持續一小時"
+        assert data[0]["search_rank"] > 0
+
+        response = client.get("/observations/", params={"q": "霧"}, headers=auth_headers)
+        assert [row["notes"] for row in response.json()] == ["早上有霧，能見度差"]
+
+    def test_search_combines_with_filters_and_edits(self, client, auth_headers, test_user, admin_user, db_session):
+        own_id = self._add(db_session, test_user.id, 10, "Instrument fault: wet bulb wick dry").id
+        self._add(db_session, admin_user.id, 11, "instrument replaced")
+
+        response = client.get("/observations/", params={"q": "instrument", "observer_id": admin_user.id}, headers=auth_headers)
+        assert [row["notes"] for row in response.json()] == ["instrument replaced"]
+
+        client.put(f"/observations/{own_id}", json={"notes": "wick replaced"}, headers=auth_headers)
+        response = client.get("/observations/", params={"q": "fault"}, headers=auth_headers)
+        assert response.json() == []
+
+    def test_query_without_words_is_rejected(self, client, auth_headers):
+        for q in ("!!", " ", "，。"):
+            response = client.get("/observations/", params={"q": q}, headers=auth_headers)
+            assert response.status_code == 422
+
+    def test_search_reads_archived_notes(self, client, auth_headers, test_user, db_session):
+        db_session.add(Observation(observation_time=datetime(2020, 1, 10), observer_id=test_user.id, notes="濃霧"))
+        db_session.commit()
+        archive.archive_observations(db_session, datetime(2021, 1, 1))
+
+        response = client.get("/observations/", params={"q": "濃霧"}, headers=auth_headers)
+        assert [row["search_snippet"] for row in response.json()] == ["<mark>濃霧</mark>"]
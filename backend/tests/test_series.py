@@ -0,0 +1,52 @@
+import math
+from datetime import datetime, timedelta
+from src.models.observation_model import Observation
+from src.services import archive
+
+class TestSeries:
+
+    def _add_hourly(self, db_session, observer_id, start, count):
+        db_session.add_all([
+            Observation(
+                observation_time=start + timedelta(hours=hour),
+                observer_id=observer_id,
+                temperature=20 + 5 * math.sin(hour / 12),
+            )
+            for hour in range(count)
+        ])
+        db_session.commit()
+
+    def test_series_is_downsampled(self, client, auth_headers, test_user, db_session):
+        self._add_hourly(db_session, test_user.id, datetime(2024, 1, 1), 300)
+
+        response = client.get("/observations/series", params={"field": "temperature", "points": 50}, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["source_points"] == 300
+        assert len(data["times"]) == len(data["values"]) == 50
+        assert data["times"][0] == "2024-01-01T00:00:00"
+        assert data["times"][-1] == "2024-01-13T11:00:00"
+        assert data["times"] == sorted(data["times"])
+
+    def test_short_series_is_returned_whole(self, client, auth_headers, test_user, db_session):
+        self._add_hourly(db_session, test_user.id, datetime(2024, 1, 1), 10)
+
+        response = client.get(
+            "/observations/series",
+            params={"field": "temperature", "start_date": "2024-01-01T05:00:00"},
+            headers=auth_headers,
+        )
+        assert len(response.json()["values"]) == 5
+
+    def test_series_reads_archived_history(self, client, auth_headers, test_user, db_session):
+        self._add_hourly(db_session, test_user.id, datetime(2020, 1, 1), 10)
+        self._add_hourly(db_session, test_user.id, datetime(2024, 1, 1), 10)
+        archive.archive_observations(db_session, datetime(2021, 1, 1))
+
+        response = client.get("/observations/series", params={"field": "temperature"}, headers=auth_headers)
+        assert response.json()["source_points"] == 20
+
+    def test_unknown_field_rejected(self, client, auth_headers):
+        response = client.get("/observations/series", params={"field": "notes"}, headers=auth_headers)
+        assert response.status_code == 422
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+from src.core import slow_queries
+from src.core.config import settings
+from src.core.slow_queries import SlowQueryLog
+
+class TestSlowQueries:
+
+    @pytest.fixture
+    def record_everything(self, db_session, monkeypatch):
+        slow_queries.install(db_session.get_bind())
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+        slow_queries.get_log().clear()
+        yield
+        slow_queries.get_log().clear()
+
+    def test_records_route_and_redacted_parameters(self, client, admin_headers, record_everything):
+        response = client.post(
+            "/observations/",
+            json={"observation_time": "2024-01-15T00:00:00", "temperature": 21.5, "notes": "secret note"},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+
+        response = client.get("/admin/slow-queries", params={"limit": 1000}, headers=admin_headers)
+        assert response.status_code == 200
+        assert "secret note" not in response.text
+        inserts = [record for record in response.json() if record["statement"].startswith("INSERT INTO observations")]
+        assert len(inserts) == 1
+        assert inserts[0]["route"] == "POST /observations/"
+        assert inserts[0]["plan"] is None
+        parameters = inserts[0]["parameters"]
+        assert 21.5 in parameters and "<str len=11>" in parameters
+
+    def test_admin_only(self, client, auth_headers):
+        assert client.get("/admin/slow-queries", headers=auth_headers).status_code == 403
+
+    def test_threshold_and_buffer_bound(self, db_session, record_everything, monkeypatch):
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 10_000)
+        db_session.execute(text("SELECT 1"))
+        assert slow_queries.get_log().recent() == []
+
+        log = SlowQueryLog(2)
+        for index in range(3):
+            log.add({"duration_ms": index})
+        assert [record["duration_ms"] for record in log.recent()] == [2, 1]
+
+    def test_redact(self):
+        when = datetime(2024, 1, 15, 8)
+        assert slow_queries.redact({"a": 1, "b": "abc", "c": [when, None, b"xy"]}) == {
+            "a": 1, "b": "<str len=3>", "c": ["2024-01-15T08:00:00", None, "<bytes len=2>"],
+        }
+
+    def test_explain_never_runs_the_query(self):
+        executed = []
+
+        class Cursor:
+            def execute(self, statement, parameters=None):
+                executed.append(statement)
+
+            def fetchone(self):
+                return ([{"Plan": {"Node Type": "Result"}}],)
+
+            def close(self):
+                pass
+
+        class Connection:
+            class connection:
+                class dbapi_connection:
+                    cursor = Cursor
+
+        plan = slow_queries._explain(Connection, None, "SELECT pg_try_advisory_lock(%(key)s)", {"key": 1})
+        assert plan == [{"Plan": {"Node Type": "Result"}}]
+        explains = [statement for statement in executed if statement.startswith("EXPLAIN")]
+        assert explains == ["EXPLAIN (FORMAT JSON) SELECT pg_try_advisory_lock(%(key)s)"]
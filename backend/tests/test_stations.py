@@ -0,0 +1,68 @@
+import pytest
+from src.models.station_model import Station
+from src.services import stations
+
+READINGS = [
+    {"observation_time": "2024-01-15T00:00:00", "temperature": 20.0, "current_evaporation_level": 100.0},
+    {"observation_time": "2024-01-15T12:00:00", "temperature": 24.0, "current_evaporation_level": 96.0},
+]
+
+class TestStations:
+
+    @pytest.fixture
+    def second_station(self, client, admin_headers):
+        response = client.post("/stations/", json={"code": "hill", "name": "Hill station"}, headers=admin_headers)
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    def test_default_station_is_used_when_none_is_named(self, client, auth_headers, db_session):
+        default_id = stations.default_station(db_session).id
+        response = client.post("/observations/", json=READINGS[0], headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["station_id"] == default_id
+
+        listed = client.get("/observations/", headers=auth_headers).json()
+        assert [observation["station_id"] for observation in listed] == [default_id]
+
+    def test_stations_are_isolated(self, client, auth_headers, second_station):
+        for reading in READINGS:
+            response = client.post("/observations/", json={**reading, "station_id": second_station}, headers=auth_headers)
+            assert response.status_code == 200
+        client.post("/observations/", json={"observation_time": "2024-01-16T00:00:00", "temperature": 5.0}, headers=auth_headers)
+
+        scoped = {"station_id": second_station}
+        listed = client.get("/observations/", params=scoped, headers=auth_headers).json()
+        assert [observation["temperature"] for observation in listed] == [24.0, 20.0]
+        assert len(client.get("/observations/", headers=auth_headers).json()) == 1
+
+        assert client.get("/observations/dashboard", params=scoped, headers=auth_headers).json()["temperature"] == 24.0
+        assert client.get("/observations/dashboard", headers=auth_headers).json()["temperature"] == 5.0
+
+        export = client.get("/observations/export/csv", params=scoped, headers=auth_headers).content.decode("utf-8-sig")
+        assert export.count("\n") == 3
+
+        daily = client.get("/observations/evaporation/daily", params=scoped, headers=auth_headers).json()
+        assert [(day["day"], day["evaporation"]) for day in daily] == [("2024-01-15", 4.0)]
+        assert client.get("/observations/evaporation/daily", headers=auth_headers).json() == []
+
+    def test_unknown_and_inactive_stations(self, client, auth_headers, admin_headers, db_session, second_station):
+        assert client.get("/observations/", params={"station_id": 999}, headers=auth_headers).status_code == 404
+        response = client.post("/observations/", json={**READINGS[0], "station_id": 999}, headers=auth_headers)
+        assert response.status_code == 404
+
+        client.put(f"/stations/{second_station}", json={"is_active": False}, headers=admin_headers)
+        response = client.post("/observations/", json={**READINGS[0], "station_id": second_station}, headers=auth_headers)
+        assert response.status_code == 400
+        assert [station["code"] for station in client.get("/stations/", headers=auth_headers).json()] == ["main"]
+
+        default_id = stations.default_station(db_session).id
+        response = client.put(f"/stations/{default_id}", json={"is_active": False}, headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_station_management_is_admin_only(self, client, auth_headers, admin_headers, db_session):
+        response = client.post("/stations/", json={"code": "hill", "name": "Hill station"}, headers=auth_headers)
+        assert response.status_code == 403
+        client.post("/stations/", json={"code": "hill", "name": "Hill station"}, headers=admin_headers)
+        response = client.post("/stations/", json={"code": "hill", "name": "Another hill"}, headers=admin_headers)
+        assert response.status_code == 400
+        assert db_session.query(Station).count() == 2
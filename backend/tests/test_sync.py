@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+from src.models.archive_model import ArchiveSegment
+from src.models.observation_model import Observation
+from src.services import archive, sync
+
+def _create(client, headers, day, temperature=20.0):
+    body = {"observation_time": f"2024-01-{day:02d}T08:00:00", "temperature": temperature}
+    response = client.post("/observations/", json=body, headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def _changes(client, headers, since=None, **params):
+    if since is not None:
+        params["since"] = since
+    response = client.get("/observations/changes", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+class TestObservationChanges:
+
+    def test_incremental_sync(self, client, auth_headers):
+        ids = [_create(client, auth_headers, day) for day in (1, 2, 3)]
+        full = _changes(client, auth_headers)
+        assert [row["id"] for row in full["changed"]] == ids
+        assert full["deleted"] == [] and not full["has_more"]
+
+        # Nothing new: the same token comes back
+        assert _changes(client, auth_headers, full["next_token"]) == {
+            "changed": [], "deleted": [], "next_token": full["next_token"], "has_more": False
+        }
+
+        client.put(f"/observations/{ids[0]}", json={"temperature": 25.0}, headers=auth_headers)
+        client.delete(f"/observations/{ids[1]}", headers=auth_headers)
+        delta = _changes(client, auth_headers, full["next_token"])
+        assert [(row["id"], row["temperature"]) for row in delta["changed"]] == [(ids[0], 25.0)]
+        assert [(row["id"], row["observation_time"][:10]) for row in delta["deleted"]] == [(ids[1], "2024-01-02")]
+        assert _changes(client, auth_headers, delta["next_token"])["changed"] == []
+
+    def test_pages_resume_inside_one_change(self, client, auth_headers, admin_headers):
+        ids = [_create(client, auth_headers, day) for day in range(1, 6)]
+        client.delete(f"/observations/{ids[4]}", headers=auth_headers)
+        # A bulk recompute marks every row changed under a single number
+        client.post("/observations/derived/recompute", headers=admin_headers)
+
+        seen, deleted, token = [], [], None
+        while True:
+            page = _changes(client, auth_headers, token, limit=2)
+            assert len(page["changed"]) + len(page["deleted"]) <= 2
+            seen += [row["id"] for row in page["changed"]]
+            deleted += [row["id"] for row in page["deleted"]]
+            token = page["next_token"]
+            if not page["has_more"]:
+                break
+        assert deleted == [ids[4]]
+        assert seen == ids[:4]
+
+    def test_invalid_and_expired_tokens(self, client, auth_headers, db_session):
+        observation_id = _create(client, auth_headers, 1)
+        token = _changes(client, auth_headers)["next_token"]
+        client.delete(f"/observations/{observation_id}", headers=auth_headers)
+
+        for bad in ("abc", "1.2.3", "-1"):
+            assert client.get("/observations/changes", params={"since": bad}, headers=auth_headers).status_code == 400
+
+        later = datetime.now(timezone.utc) + timedelta(days=365)
+        assert sync.purge_tombstones(db_session) == 0
+        assert sync.purge_tombstones(db_session, later) == 1
+        assert client.get("/observations/changes", params={"since": token}, headers=auth_headers).status_code == 410
+        assert _changes(client, auth_headers)["changed"] == []
+
+    def test_change_numbers_leave_updated_at_alone(self, client, auth_headers, admin_headers):
+        observation_id = _create(client, auth_headers, 1)
+        created = client.get(f"/observations/{observation_id}", headers=auth_headers).json()
+        assert created["updated_at"] is None
+
+        assert client.post("/observations/derived/recompute", headers=admin_headers).status_code == 200
+        recomputed = client.get(f"/observations/{observation_id}", headers=auth_headers).json()
+        assert recomputed["updated_at"] is None
+        assert [row["id"] for row in _changes(client, auth_headers)["changed"]] == [observation_id]
+
+        # A real edit still stamps it
+        edited = client.put(f"/observations/{observation_id}", json={"temperature": 21.0}, headers=auth_headers).json()
+        assert edited["updated_at"] is not None
+
+
+    def test_restored_rows_come_back_as_changes(self, client, auth_headers, admin_headers, db_session):
+        ids = [_create(client, auth_headers, day) for day in (1, 2)]
+        # Rows archived before change numbers existed carry none
+        db_session.query(Observation).filter(Observation.id == ids[0]).update({Observation.change_seq: None})
+        db_session.commit()
+        archive.archive_observations(db_session, datetime(2024, 2, 1))
+
+        # Archived rows are outside the feed, even for a full sync
+        full = _changes(client, auth_headers)
+        assert full["changed"] == [] and full["deleted"] == []
+
+        segment_id = db_session.query(ArchiveSegment.id).scalar()
+        response = client.post(f"/observations/archive/segments/{segment_id}/restore", headers=admin_headers)
+        assert response.status_code == 200
+        delta = _changes(client, auth_headers, full["next_token"])
+        assert sorted(row["id"] for row in delta["changed"]) == ids
+        assert _changes(client, auth_headers, delta["next_token"])["changed"] == []
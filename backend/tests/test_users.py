@@ -1,4 +1,7 @@
 import pytest
+from datetime import datetime
+from src.models.user_model import User
+from src.services import archive
 
 class TestUsers:
     
@@ -79,4 +82,76 @@ class TestUsers:
 
     def test_cannot_remove_admin_from_self(self, client, admin_headers, admin_user):
         response = client.delete(f"/users/{admin_user.id}/remove-admin", headers=admin_headers)
-        assert response.status_code == 400
\ No newline at end of file
+        assert response.status_code == 400
+
+    def test_get_users_paginates_with_cursor(self, client, admin_headers, admin_user, db_session):
+        db_session.add_all([
+            User(google_id=f"g{index}", email=f"user{index}@example.com", google_name=f"User {index}")
+            for index in range(5)
+        ])
+        db_session.commit()
+
+        seen = []
+        params = {"limit": 2}
+        for _ in range(5):
+            response = client.get("/users/", params=params, headers=admin_headers)
+            assert response.status_code == 200
+            seen.extend(user["id"] for user in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 2, "cursor": cursor}
+        assert sorted(seen) == sorted({*seen}) and len(seen) == 6
+
+        response = client.get("/users/", params={"q": "user3"}, headers=admin_headers)
+        assert [user["email"] for user in response.json()] == ["user3@example.com"]
+        assert client.get("/users/", params={"cursor": "bogus"}, headers=admin_headers).status_code == 400
+
+    def test_observation_counters_follow_writes(self, client, auth_headers, admin_headers, test_user):
+        email = test_user.email
+
+        def stats():
+            users = client.get("/users/", params={"q": email}, headers=admin_headers).json()
+            return {
+                "observation_count": users[0]["observation_count"],
+                # SQLite hands the times back without their UTC offset
+                "first_observation_at": users[0]["first_observation_at"][:19],
+                "last_observation_at": users[0]["last_observation_at"][:19],
+            }
+
+        ids = [
+            client.post("/observations/", json={"observation_time": f"2024-01-{day}T10:00:00"}, headers=auth_headers).json()["id"]
+            for day in (10, 12, 14)
+        ]
+        assert stats() == {"observation_count": 3, "first_observation_at": "2024-01-10T10:00:00",
+                           "last_observation_at": "2024-01-14T10:00:00"}
+
+        client.put(f"/observations/{ids[0]}", json={"observation_time": "2024-01-11T10:00:00"}, headers=auth_headers)
+        client.delete(f"/observations/{ids[2]}", headers=auth_headers)
+        assert stats() == {"observation_count": 2, "first_observation_at": "2024-01-11T10:00:00",
+                           "last_observation_at": "2024-01-12T10:00:00"}
+
+    def test_observation_bounds_fall_back_to_the_archive(self, client, auth_headers, admin_headers, db_session, test_user):
+        email = test_user.email
+
+        def stats():
+            user = client.get("/users/", params={"q": email}, headers=admin_headers).json()[0]
+            bounds = [value[:19] if value else None for value in (user["first_observation_at"], user["last_observation_at"])]
+            return [user["observation_count"], *bounds]
+
+        def create(moment):
+            return client.post("/observations/", json={"observation_time": moment}, headers=auth_headers).json()["id"]
+
+        for day in (10, 12):
+            create(f"2024-01-{day}T10:00:00")
+        archive.archive_observations(db_session, datetime(2024, 2, 1))
+        # Back-filled after the archive run, so older than the archived rows
+        backfilled = create("2023-12-01T10:00:00")
+        latest = create("2024-03-01T10:00:00")
+        assert stats() == [4, "2023-12-01T10:00:00", "2024-03-01T10:00:00"]
+
+        client.delete(f"/observations/{backfilled}", headers=auth_headers)
+        assert stats() == [3, "2024-01-10T10:00:00", "2024-03-01T10:00:00"]
+        # Only archived rows remain
+        client.delete(f"/observations/{latest}", headers=auth_headers)
+        assert stats() == [2, "2024-01-10T10:00:00", "2024-01-12T10:00:00"]
@@ -50,8 +50,15 @@ const AdminPanel = () => {
   const fetchUsers = async () => {
     try {
       setLoading(true);
-      const response = await userAPI.getUsers();
-      setUsers(response.data);
+      // The list is paged; follow X-Next-Cursor until the last page
+      const allUsers = [];
+      let cursor;
+      do {
+        const response = await userAPI.getUsers({ limit: 500, cursor });
+        allUsers.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      setUsers(allUsers);
     } catch (error) {
       console.error('Error fetching users:', error);
       setError(error.response?.data?.detail || '載入使用者列表失敗');
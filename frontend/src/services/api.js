@@ -51,7 +51,7 @@ export const authAPI = {
 export const userAPI = {
   getCurrentUser: () => api.get('/users/me'),
   updateUserSettings: (settingsData) => api.put('/users/me/settings', settingsData),
-  getUsers: () => api.get('/users/'),
+  getUsers: (params) => api.get('/users/', { params }),
   getUser: (userId) => api.get(`/users/${userId}`),
   updateUser: (userId, userData) => api.put(`/users/${userId}`, userData),
   deactivateUser: (userId) => api.delete(`/users/${userId}`),